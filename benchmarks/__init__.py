@@ -0,0 +1,13 @@
+"""Benchmarks for farcy.
+
+Each module can be run directly, e.g. ``python -m benchmarks.handle_pr``:
+
+* ``exclude_paths``: Compiled ``exclude_paths`` matching compared to
+  ``fnmatch``.
+* ``grouping``: ErrorTracker grouping compared to the previous implementation.
+* ``handle_pr``: End-to-end reviews of synthetic pull requests.
+* ``micro``: Per-file helpers and linter output parsers, with an offline
+  threshold check (``--check``).
+* ``replay``: Offline replays of archives recorded with ``--record``.
+
+"""
@@ -0,0 +1,80 @@
+"""Benchmark matching pull request files against ``exclude_paths``.
+
+Compares the compiled PathMatcher against calling ``fnmatch`` with each
+pattern, as ``_compute_pfile_stats`` used to.
+
+Usage: exclude_paths.py [options]
+
+Options:
+
+  -h, --help                  Show this screen.
+  -f COUNT, --files=COUNT     Number of file paths [default: 10000].
+  -p COUNT, --patterns=COUNT  Number of exclude patterns [default: 500].
+
+"""
+
+from __future__ import print_function
+from docopt import docopt
+from fnmatch import fnmatch
+from random import Random
+from timeit import default_timer
+from farcy.objects import PathMatcher
+
+EXTENSIONS = ['.js', '.min.js', '.pb.go', '.py', '.rb', '.scss']
+
+
+def synthetic_paths(count, seed=0):
+    """Return a list of ``count`` file paths from a synthetic monorepo."""
+    random = Random(seed)
+    return ['{0}/pkg{1}/module{2}/file{3}{4}'.format(
+        random.choice(['app', 'lib', 'services', 'vendor', 'web']),
+        random.randrange(100), random.randrange(20), index,
+        random.choice(EXTENSIONS)) for index in range(count)]
+
+
+def synthetic_patterns(count, seed=0):
+    """Return ``count`` exclude patterns of the common shapes."""
+    random = Random(seed)
+    shapes = ['vendor/pkg{0}/*', 'services/pkg{0}/module{1}/file{2}.py',
+              '*.min.js', '*/pkg{0}/generated/*', 'lib/pkg{0}/*.pb.go',
+              'web/pkg{0}/module?/*', '*/module{1}/file{2}.[jt]s']
+    return [random.choice(shapes).format(
+        random.randrange(100), random.randrange(20), random.randrange(10000))
+        for _ in range(count)]
+
+
+def timed(function, *args):
+    """Return a tuple containing (seconds, result) of calling function."""
+    start = default_timer()
+    result = function(*args)
+    return default_timer() - start, result
+
+
+def main():
+    """Run the exclude_paths benchmark and output the results."""
+    args = docopt(__doc__)
+    paths = synthetic_paths(int(args['--files']))
+    patterns = synthetic_patterns(int(args['--patterns']))
+
+    def legacy():
+        return [any(fnmatch(path, pattern) for pattern in patterns)
+                for path in paths]
+
+    def current():
+        matcher = PathMatcher(patterns)
+        return [matcher(path) for path in paths]
+
+    legacy_time, expected = timed(legacy)
+    current_time, actual = timed(current)
+    assert expected == actual, 'Matching results differ'
+
+    print('{0} files, {1} patterns, {2} excluded'
+          .format(len(paths), len(patterns), sum(actual)))
+    print('{0:>8}: {1:8.3f}s'.format('fnmatch', legacy_time))
+    print('{0:>8}: {1:8.3f}s'.format('compiled', current_time))
+    print('{0:>8}: {1:8.1f}x'.format(
+        'speedup', legacy_time / max(current_time, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark ErrorMessage and ErrorTracker grouping.
+
+Compares the grouping engine against the previous implementation, which
+re-sorted every tracked line each time messages were requested. Each engine
+tracks the issues and requests the errors once, as a review does for each
+file, and the combined time is reported.
+
+Usage: grouping.py [options]
+
+Options:
+
+  -h, --help             Show this screen.
+  -n HITS, --hits=HITS   Number of issues to track [default: 50000].
+  -m COUNT, --messages=COUNT  Number of distinct messages [default: 20].
+  -r COUNT, --repeat=COUNT    Number of times to request the errors of each
+                              tracker [default: 1].
+  --no-numpy             Group lines without NumPy even when installed.
+
+"""
+
+from __future__ import print_function
+from docopt import docopt
+from random import Random
+from timeit import default_timer
+import gc
+from farcy import objects
+from farcy.objects import ErrorTracker
+
+
+class LegacyErrorMessage(object):
+    """The lines of an error message, as ErrorMessage used to track them."""
+
+    def __init__(self, message, group_threshold):
+        """Initialize a LegacyErrorMessage object."""
+        self.group_threshold = group_threshold
+        self.groups = set()
+        self.lines = {}  # Value is true when it's on github
+        self.message = message
+
+    def messages(self):
+        """Yield (line, message) tuples as ErrorMessage.messages used to."""
+        def output(start, count, span):
+            if count > 1:
+                return (start, '{0} <sub>{1}x spanning {2} lines</sub>'
+                        .format(self.message, count, span + 1))
+            return (start, self.message)
+
+        start = last = None
+        count = 0
+        for line, skip in sorted(self.lines.items()):
+            if skip:
+                continue
+            if start is None:
+                start = last = line
+            if line - last > self.group_threshold:
+                if (start, count) not in self.groups:
+                    yield output(start, count, last - start)
+                count = 0
+                start = line
+            count += 1
+            last = line
+        if start and (start, count) not in self.groups:
+            yield output(start, count, last - start)
+
+    def track(self, line, on_github=False):
+        """Track the line and return self."""
+        self.lines[line] = self.lines.get(line, False) or on_github
+        return self
+
+
+class LegacyErrorTracker(object):
+    """Tracks issues across files, as ErrorTracker used to."""
+
+    def __init__(self, group_threshold):
+        """Initialize a LegacyErrorTracker object."""
+        self.by_file = {}
+        self.group_threshold = group_threshold
+
+    def errors(self, filename):
+        """Generate tuples containing (line, [errors...])."""
+        by_line = {}
+        for error in self.by_file.get(filename, {}).values():
+            for line, message in error.messages():
+                by_line.setdefault(line, []).append(message)
+        for line in sorted(by_line):
+            yield (line, sorted(by_line[line]))
+
+    def track(self, message, filename, line):
+        """Track message in filename on line."""
+        parts = ErrorTracker.GROUP_MATCH.match(message)
+        if parts:
+            message = parts.group(1)
+        error_message = self.by_file.setdefault(filename, {}).setdefault(
+            message, LegacyErrorMessage(message, self.group_threshold))
+        if parts:
+            error_message.groups.add((line, int(parts.group(2))))
+        else:
+            error_message.track(line)
+
+
+def synthetic_hits(hits, messages, seed=0):
+    """Return a list of (message, line) tuples in linter output order."""
+    random = Random(seed)
+    return [('Synthetic issue {0}'.format(random.randrange(messages)),
+             random.randrange(1, hits * 2)) for _ in range(hits)]
+
+
+def main():
+    """Run the grouping benchmark and output the results."""
+    args = docopt(__doc__)
+    if args['--no-numpy']:
+        objects.numpy = None
+    hits = synthetic_hits(int(args['--hits']), int(args['--messages']))
+    repeat = int(args['--repeat'])
+
+    def review(tracker):
+        """Return (track seconds, total seconds, errors) of a review.
+
+        As with ``timeit``, garbage collection is disabled while timing so
+        that one engine is not charged for collecting the other's objects.
+
+        """
+        gc.collect()
+        gc.disable()
+        try:
+            start = default_timer()
+            for message, line in hits:
+                tracker.track(message, 'generated.py', line)
+            track_time = default_timer() - start
+            for _ in range(repeat):
+                errors = list(tracker.errors('generated.py'))
+            return track_time, default_timer() - start, errors
+        finally:
+            gc.enable()
+
+    legacy_track, legacy_time, legacy = review(LegacyErrorTracker(3))
+    track, current_time, current = review(ErrorTracker([], 3))
+    assert legacy == current, 'Grouping results differ'
+
+    print('{0} issues, {1} groups, errors() requested {2} time{3}, {4}'
+          .format(len(hits), len(current), repeat, '' if repeat == 1 else 's',
+                  'with NumPy' if objects.numpy else 'without NumPy'))
+    print('{0:>16}: {1:8.3f}s ({2:.3f}s tracking)'.format(
+        'legacy', legacy_time, legacy_track))
+    print('{0:>16}: {1:8.3f}s ({2:.3f}s tracking)'.format(
+        'current', current_time, track))
+    print('{0:>16}: {1:8.1f}x'.format(
+        'speedup', legacy_time / max(current_time, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark Farcy.handle_pr end-to-end on synthetic pull requests.
+
+GitHub is replaced by in-memory stand-ins with optional simulated latency.
+Unless --real-handlers is given, python files are linted by a synthetic
+handler that reports issues on a fixed fraction of lines.
+
+Usage: handle_pr.py [options]
+
+Options:
+
+  -h, --help                  Show this screen.
+  -f COUNT, --files=COUNT     Number of files per pull request [default: 100].
+  -l COUNT, --lines=COUNT     Number of added lines per file [default: 200].
+  -d RATE, --density=RATE     Fraction of lines with an issue [default: 0.05].
+  -c COUNT, --comments=COUNT  Number of existing farcy comments [default: 0].
+  -n COUNT, --runs=COUNT      Number of pull requests to review [default: 3].
+  --latency=SECONDS           Simulated latency per API call [default: 0].
+  -w COUNT, --lint-workers=COUNT  Number of threads linting the files of a
+                                  pull request [default: 1].
+  --real-handlers             Lint using the installed handlers.
+  --save=PATH                 Save the results as JSON to PATH.
+  --compare=PATH              Compare the results to those saved at PATH.
+
+"""
+
+from __future__ import print_function
+from collections import defaultdict
+from datetime import datetime
+from docopt import docopt
+from functools import wraps
+from timeit import default_timer
+import json
+import logging
+import os
+import sys
+import tracemalloc
+import farcy
+from farcy import Config, Farcy
+from farcy.const import __version__
+from .synthetic import (SyntheticHandler, SyntheticPullRequest,
+                        SyntheticRepository, SyntheticSession)
+
+Config.PATH = os.devnull  # Don't allow the system config file to load.
+
+
+class StageTimer(object):
+    """Accumulate the wall clock time spent in each benchmarked stage."""
+
+    def __init__(self):
+        """Initialize a StageTimer."""
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def wrap(self, stage, function):
+        """Return ``function`` wrapped to accumulate its time in ``stage``."""
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.calls[stage] += 1
+                self.seconds[stage] += default_timer() - start
+        return wrapper
+
+
+def build_farcy(args, pull_requests, timer):
+    """Return a Farcy instance reviewing the synthetic pull requests."""
+    config = Config('synthetic/synthetic', debug=False,
+                    lint_workers=args['--lint-workers'], log_level='CRITICAL')
+    config._session = SyntheticSession(SyntheticRepository(pull_requests))
+    instance = Farcy(config)
+    if not args['--real-handlers']:
+        instance._ext_to_handler = {
+            '.py': [SyntheticHandler(float(args['--density']))]}
+    instance._compute_pfile_stats = timer.wrap(
+        'file stats', instance._compute_pfile_stats)
+    instance.get_issues = timer.wrap('fetch and lint', instance.get_issues)
+    for pr in pull_requests:
+        pr.create_review_comment = timer.wrap(
+            'create comments', pr.create_review_comment)
+    return instance
+
+
+def compare(results, path):
+    """Output the change of each measurement relative to those at path."""
+    with open(path) as fp:
+        previous = json.load(fp)
+    print('\nCompared to farcy v{0} ({1}):'
+          .format(previous['version'], previous['timestamp']))
+    rows = [('peak memory', previous['peak_memory'], results['peak_memory'])]
+    for stage, seconds in sorted(results['stages'].items()):
+        if stage in previous['stages']:
+            rows.append((stage, previous['stages'][stage]['seconds'],
+                         seconds['seconds']))
+    for name, before, after in rows:
+        change = (after - before) / before * 100 if before else 0
+        print('{0:>16}: {1:+7.1f}%'.format(name, change))
+
+
+def run(args):
+    """Return the results of benchmarking handle_pr."""
+    pull_requests = [
+        SyntheticPullRequest(number, int(args['--files']),
+                             int(args['--lines']), int(args['--comments']),
+                             float(args['--latency']), seed=number)
+        for number in range(1, int(args['--runs']) + 1)]
+    timer = StageTimer()
+    instance = build_farcy(args, pull_requests, timer)
+    error_tracker = farcy.ErrorTracker
+    farcy.ErrorTracker = type('ErrorTracker', (error_tracker,), {
+        '__init__': timer.wrap('load comments', error_tracker.__init__)})
+
+    tracemalloc.start()
+    try:
+        total = default_timer()
+        for pr in pull_requests:
+            timer.wrap('total', instance.handle_pr)(pr)
+        total = default_timer() - total
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        farcy.ErrorTracker = error_tracker
+
+    stages = {stage: {'calls': timer.calls[stage], 'seconds': seconds}
+              for stage, seconds in timer.seconds.items()}
+    stages['other'] = {'calls': 0, 'seconds': max(0, total - sum(
+        seconds for stage, seconds in timer.seconds.items()
+        if stage != 'total'))}
+    return {'comments': sum(pr.created_comments for pr in pull_requests),
+            'parameters': {key.lstrip('-'): value for key, value
+                           in args.items() if key not in
+                           ('--compare', '--help', '--save')},
+            'peak_memory': peak_memory,
+            'stages': stages,
+            'timestamp': datetime.utcnow().isoformat(),
+            'version': __version__}
+
+
+def main():
+    """Run the benchmark and output the results."""
+    args = docopt(__doc__)
+    logging.disable(logging.CRITICAL)
+    results = run(args)
+
+    runs = int(args['--runs'])
+    print('{0} pull requests of {1} files, {2} comments created'
+          .format(runs, args['--files'], results['comments']))
+    for stage, values in sorted(results['stages'].items(),
+                                key=lambda item: -item[1]['seconds']):
+        print('{0:>16}: {1:8.3f}s {2:8.3f}s/PR'.format(
+            stage, values['seconds'], values['seconds'] / runs))
+    print('{0:>16}: {1:8.1f}MiB'.format('peak memory',
+                                        results['peak_memory'] / 2 ** 20))
+
+    if args['--save']:
+        with open(args['--save'], 'w') as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+    if args['--compare']:
+        compare(results, args['--compare'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
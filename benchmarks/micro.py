@@ -0,0 +1,162 @@
+"""Microbenchmarks of farcy's per-file helpers and parsers.
+
+Inputs are representative linter outputs, patches and review comments from
+the ``fixtures`` directory, repeated ``--scale`` times. The linters
+themselves are never executed, so the benchmarks can run offline.
+
+Usage: micro.py [options] [BENCHMARK...]
+
+Options:
+
+  -h, --help                Show this screen.
+  -s COUNT, --scale=COUNT   Times to repeat each fixture [default: 10].
+  -r COUNT, --repeat=COUNT  Times to repeat each measurement [default: 5].
+  --check                   Exit with status 1 when a benchmark is slower
+                            than its threshold.
+  --update                  Save thresholds of 3x the measured times.
+  --thresholds=PATH         The thresholds file
+                            [default: benchmarks/micro_thresholds.json].
+
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+from docopt import docopt
+from timeit import default_timer
+import json
+import os
+import sys
+from farcy import handlers
+from farcy.helpers import added_lines
+from farcy.objects import ErrorMessage, ErrorTracker
+from .synthetic import Struct
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture(name):
+    """Return the contents of the fixture file ``name``."""
+    with open(os.path.join(FIXTURES, name)) as fp:
+        return fp.read()
+
+
+def offline_handler(cls, output):
+    """Return a handler instance whose binary always outputs ``output``."""
+    handler = cls.__new__(cls)
+    handler._plugin_ready = True
+    handler.config_file_path = None
+    handler.name = cls.__name__
+    handler.execute = lambda *args, **kwargs: output
+    handler.iter_output = lambda *args, **kwargs: iter(
+        output.splitlines(True))
+    return handler
+
+
+def scaled_json(name, scale):
+    """Return the JSON output of a linter with ``scale`` times the offenses."""
+    data = json.loads(fixture(name))
+    if name == 'eslint.json':
+        data[0]['messages'] *= scale
+    elif name == 'rubocop.json':
+        data['files'][0]['offenses'] *= scale
+    else:
+        for path in data:
+            data[path] *= scale
+    return json.dumps(data)
+
+
+def benchmarks(scale):
+    """Return an OrderedDict mapping benchmark names to functions."""
+    patch = '\n'.join([fixture('patch.diff')] * scale)
+    flake8 = offline_handler(handlers.Flake8, fixture('flake8.txt') * scale)
+    pep257 = offline_handler(handlers.Pep257, fixture('pep257.txt') * scale)
+    eslint = offline_handler(handlers.ESLint,
+                             scaled_json('eslint.json', scale))
+    rubocop = offline_handler(handlers.Rubocop,
+                              scaled_json('rubocop.json', scale))
+    scsslint = offline_handler(handlers.SCSSLint,
+                               scaled_json('scsslint.json', scale))
+    comments = [Struct(**comment) for comment in
+                json.loads(fixture('review_comments.json')) * scale]
+    lines = [line + 100000 * index for index in range(scale)
+             for line in sorted(added_lines(fixture('patch.diff')))]
+    changed = set(lines[:len(lines) // 10])
+
+    def error_message_messages():
+        message = ErrorMessage('Metrics/LineLength: Line is too long.', 3)
+        for line in lines:
+            message.track(line)
+        return list(message.messages())
+
+    return OrderedDict([
+        ('added_lines', lambda: added_lines(patch)),
+        ('flake8_regex_parse', lambda: flake8._process('a.py')),
+        ('flake8_regex_parse_lines',
+         lambda: flake8._process('a.py', changed)),
+        ('pep257_regex_parse', lambda: pep257._process('a.py')),
+        ('eslint_process', lambda: eslint._process('a.js')),
+        ('eslint_process_lines', lambda: eslint._process('a.js', changed)),
+        ('rubocop_process', lambda: rubocop._process('a.rb')),
+        ('scsslint_process', lambda: scsslint._process('a.scss')),
+        ('from_github_comments', lambda: ErrorTracker(comments, 3)),
+        ('error_message_messages', error_message_messages)])
+
+
+def measure(function, repeat):
+    """Return the fastest of ``repeat`` timings of ``function``."""
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        function()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Run the microbenchmarks and output the results."""
+    args = docopt(__doc__)
+    scale = int(args['--scale'])
+    available = benchmarks(scale)
+    names = args['BENCHMARK'] or list(available)
+    unknown = set(names) - set(available)
+    if unknown:
+        sys.stderr.write('Unknown benchmark(s): {0}\n'
+                         .format(', '.join(sorted(unknown))))
+        return 2
+
+    thresholds = {}
+    if os.path.isfile(args['--thresholds']):
+        with open(args['--thresholds']) as fp:
+            thresholds = json.load(fp).get(str(scale), {})
+
+    slow = []
+    results = {}
+    for name in names:
+        results[name] = measure(available[name], int(args['--repeat']))
+        limit = thresholds.get(name)
+        flag = ''
+        if limit is not None and results[name] > limit:
+            slow.append(name)
+            flag = ' SLOWER than {0:.2f}ms'.format(limit * 1000)
+        print('{0:>24}: {1:9.3f}ms{2}'
+              .format(name, results[name] * 1000, flag))
+
+    if args['--update']:
+        saved = {}
+        if os.path.isfile(args['--thresholds']):
+            with open(args['--thresholds']) as fp:
+                saved = json.load(fp)
+        saved.setdefault(str(scale), {}).update(
+            {name: round(seconds * 3, 6) for name, seconds
+             in results.items()})
+        with open(args['--thresholds'], 'w') as fp:
+            json.dump(saved, fp, indent=2, sort_keys=True)
+            fp.write('\n')
+    if args['--check'] and slow:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
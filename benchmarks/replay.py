@@ -0,0 +1,107 @@
+"""Replay an archive recorded with ``farcy --record=PATH`` through Farcy.run.
+
+GitHub is replaced by the recorded responses, so no requests leave the
+machine, and writes such as statuses and review comments are answered from
+the archive rather than sent. The installed handlers lint the files.
+
+Usage: replay.py [options] ARCHIVE
+
+Options:
+
+  -h, --help             Show this screen.
+  -s FACTOR, --speed=FACTOR  Poll for events FACTOR times faster than
+                             recorded, or as fast as possible when 0
+                             [default: 1].
+
+"""
+
+from __future__ import print_function
+from dateutil.parser import parse
+from docopt import docopt
+from github3 import GitHub
+from timeit import default_timer
+import logging
+import os
+import sys
+import tracemalloc
+from farcy import Config, Farcy
+from farcy.exceptions import ReplayFinished
+from farcy.recording import ReplayAdapter, load_archive
+
+Config.PATH = os.devnull  # Don't allow the system config file to load.
+
+
+def percentile(values, fraction):
+    """Return the ``fraction`` percentile of the sorted ``values``."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def replay(path, speed):
+    """Return a dictionary of the results of replaying the archive."""
+    start, responses = load_archive(path)
+    adapter = ReplayAdapter(responses, speed)
+    session = GitHub()
+    session.session.mount('https://', adapter)
+    config = Config(start['repository'], log_level='CRITICAL')
+    config._session = session
+    instance = Farcy(config)
+    instance.last_event_id = start['last_event_id']
+    instance.start_time = start['start_time'] and parse(start['start_time'])
+
+    latencies = []
+    events = instance.events
+    dispatch = instance._dispatch
+    arrivals = {}
+
+    def timed_events():
+        for event in events():
+            arrivals[event.id] = adapter.events_served_at
+            yield event
+
+    def timed_dispatch(event, *args, **kwargs):
+        try:
+            return dispatch(event, *args, **kwargs)
+        finally:
+            latencies.append(default_timer() - arrivals.pop(event.id))
+
+    instance.events = timed_events
+    instance._dispatch = timed_dispatch
+    tracemalloc.start()
+    try:
+        total = default_timer()
+        try:
+            instance.run()
+        except ReplayFinished:
+            pass
+        total = default_timer() - total
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'events': len(latencies), 'latencies': sorted(latencies),
+            'peak_memory': peak_memory, 'seconds': total}
+
+
+def main():
+    """Replay the archive and output the results."""
+    args = docopt(__doc__)
+    logging.disable(logging.CRITICAL)
+    results = replay(args['ARCHIVE'], float(args['--speed']))
+    latencies = results['latencies']
+
+    print('{0} events in {1:.3f}s'.format(results['events'],
+                                          results['seconds']))
+    print('{0:>12}: {1:8.3f} events/s'.format(
+        'throughput', results['events'] / max(results['seconds'], 1e-9)))
+    for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99),
+                           ('max', 1.0)):
+        print('{0:>12}: {1:8.3f}s'.format(
+            '{0} latency'.format(name), percentile(latencies, fraction)))
+    print('{0:>12}: {1:8.1f}MiB'.format('peak memory',
+                                        results['peak_memory'] / 2 ** 20))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Synthetic pull requests and GitHub stand-ins for benchmarking farcy."""
+
+from __future__ import print_function
+from random import Random
+import time
+import zlib
+from farcy.const import FARCY_COMMENT_START
+from farcy.handlers import ExtHandler
+
+
+class Struct(object):
+    """A dynamic class with attributes based on keyword arguments."""
+
+    def __init__(self, **attrs):
+        """Create an instance of the Struct class."""
+        self.__dict__.update(attrs)
+
+
+class SyntheticContents(object):
+    """Stands in for the contents of a file on GitHub."""
+
+    def __init__(self, decoded, latency):
+        """Initialize a SyntheticContents object."""
+        self._decoded = decoded
+        self._latency = latency
+
+    @property
+    def decoded(self):
+        """Return the file's contents after the simulated API latency."""
+        time.sleep(self._latency)
+        return self._decoded
+
+
+class SyntheticFile(object):
+    """Stands in for a file of a GitHub pull request."""
+
+    def __init__(self, filename, lines, latency):
+        """Initialize a SyntheticFile with ``lines`` added lines."""
+        self.filename = filename
+        self.status = 'added'
+        self.additions_count = self.changes_count = lines
+        self.patch = '@@ -0,0 +1,{0} @@\n'.format(lines) + '\n'.join(
+            '+value_{0} = {0}'.format(line) for line in range(lines))
+        self._contents = SyntheticContents(
+            ''.join('value_{0} = {0}\n'.format(line)
+                    for line in range(lines)).encode('utf-8'), latency)
+
+    def contents(self):
+        """Return the file's contents."""
+        return self._contents
+
+
+class SyntheticPullRequest(object):
+    """Stands in for a GitHub pull request."""
+
+    def __init__(self, number=1, files=100, lines=200, comments=0,
+                 latency=0.0, seed=0):
+        """Initialize a SyntheticPullRequest.
+
+        :param number: The pull request number.
+        :param files: The number of added python files.
+        :param lines: The number of lines added to each file.
+        :param comments: The number of farcy comments already on the pull
+            request.
+        :param latency: Seconds of simulated latency for each API call.
+        :param seed: The seed used to place the existing comments.
+
+        """
+        random = Random(seed)
+        self.api_calls = 0
+        self.body = 'A synthetic pull request.'
+        self.changed_files = files
+        self.created_comments = 0
+        self.head = Struct(ref='synthetic', sha='0' * 40)
+        self.latency = latency
+        self.number = number
+        self.state = 'open'
+        self.user = Struct(login='synthetic')
+        self._files = [SyntheticFile('module_{0}/file_{0}.py'.format(index),
+                                     lines, latency)
+                       for index in range(files)]
+        self._comments = [
+            Struct(body='{0}\n* Existing issue {1}'
+                   .format(FARCY_COMMENT_START, index),
+                   path=random.choice(self._files).filename,
+                   position=random.randrange(1, lines + 1))
+            for index in range(comments)]
+
+    def _api_call(self):
+        self.api_calls += 1
+        time.sleep(self.latency)
+
+    def commits(self):
+        """Return the pull request's commits."""
+        self._api_call()
+        return [Struct(sha=self.head.sha)]
+
+    def create_review_comment(self, body, commit_id, path, position):
+        """Pretend to create a review comment."""
+        self._api_call()
+        self.created_comments += 1
+        return Struct(html_url='https://github.com/synthetic')
+
+    def files(self):
+        """Return the files of the pull request."""
+        self._api_call()
+        return iter(self._files)
+
+    def refresh(self):
+        """Pretend to refresh the pull request."""
+        self._api_call()
+        return self
+
+    def review_comments(self):
+        """Return the review comments on the pull request."""
+        self._api_call()
+        return iter(self._comments)
+
+
+class SyntheticRepository(object):
+    """Stands in for a GitHub repository."""
+
+    html_url = 'https://github.com/synthetic/synthetic'
+    url = 'https://api.github.com/repos/synthetic/synthetic'
+
+    def __init__(self, pull_requests=None):
+        """Initialize a repository containing ``pull_requests``."""
+        self.pull_requests_by_number = {pr.number: pr for pr
+                                        in pull_requests or []}
+        self.session = Struct(hooks={'response': []})
+        self.statuses = []
+
+    def create_status(self, sha, state, **kwargs):
+        """Record the status."""
+        self.statuses.append((sha, state))
+
+    def file_contents(self, path, ref=None):
+        """Return empty contents for any ``path``."""
+        return SyntheticContents(b'', 0)
+
+    def pull_request(self, number):
+        """Return the pull request with the given number."""
+        return self.pull_requests_by_number[number]
+
+    def pull_requests(self, state=None):
+        """Return the pull requests."""
+        return iter(self.pull_requests_by_number.values())
+
+
+class SyntheticSession(object):
+    """Stands in for a GitHub session."""
+
+    def __init__(self, repository):
+        """Initialize a session that always returns ``repository``."""
+        self._repository = repository
+
+    def repository(self, owner, name):
+        """Return the synthetic repository."""
+        return self._repository
+
+
+class SyntheticHandler(ExtHandler):
+    """A handler reporting issues on a deterministic fraction of lines."""
+
+    BINARY = 'synthetic'
+    EXTENSIONS = ['.py']
+
+    def __init__(self, density=0.05, cost=0.0):
+        """Initialize a SyntheticHandler.
+
+        :param density: The fraction of lines with an issue.
+        :param cost: Seconds of simulated linting time per file.
+
+        """
+        self.cost = cost
+        self.density = density
+        super(SyntheticHandler, self).__init__()
+
+    def _prepare_directory(self, temp_dir, repo, pr):
+        return
+
+    def _process(self, filename, lines=None):
+        time.sleep(self.cost)
+        retval = {}
+        with open(filename) as fp:
+            for lineno, line in enumerate(fp, 1):
+                bucket = zlib.crc32(line.encode('utf-8')) % 1000
+                if bucket < self.density * 1000 and \
+                        (lines is None or lineno in lines):
+                    retval[lineno] = ['Synthetic issue {0}'
+                                      .format(lineno % 7)]
+        return retval
+
+    def assert_usable(self):
+        """Synthetic handlers are always usable."""
+        return
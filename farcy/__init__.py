@@ -3,11 +3,21 @@
 Usage: farcy.py [-D | --logging=LEVEL] [--comments-per-pr=LIMIT]
                 [--exclude-path=PATTERN...]
                 [--limit-user=USER...] [options] [REPOSITORY]
+       farcy.py local [-D | --logging=LEVEL] [--exclude-path=PATTERN...]
+                [options] RANGE
+
+Run ``farcy local BASE..HEAD`` within a git repository to print the issues
+found on the lines changed between the commits BASE and HEAD, without
+contacting GitHub.
 
 Options:
 
   -s ID, --start=ID  The event id to start handling events from.
   -p ID, --pr=ID     Process only the provided pull request(s).
+  -a, --all-open     Review the open pull requests in the background while
+                     handling events.
+  --updated-since=DATE  With --all-open, review only the pull requests
+                        updated since DATE.
   -D, --debug        Enable debugging mode. Enables all logging output
                      and prevents the posting of comments.
   --logging=LEVEL    Specify the log level* to output.
@@ -22,6 +32,8 @@ Options:
                                       list of users.
   -C LIMIT, --comments-per-pr=LIMIT   Maximum number of comments added by
                                       Farcy per pull request.
+  --record=PATH                       Record the GitHub API responses to
+                                      the archive PATH for replay.
 
 * Available log levels:
     https://docs.python.org/3/library/logging.html#logging-levels
@@ -29,26 +41,50 @@ Options:
 """
 
 from __future__ import print_function
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
 from datetime import datetime
+from dateutil.parser import parse
 from docopt import docopt
-from fnmatch import fnmatch
 from github3.exceptions import (
-    ConnectionError, ServerError, UnprocessableEntity
+    ConnectionError, GitHubError, NotFoundError, ServerError,
+    UnprocessableEntity
 )
 from random import choice
+from requests.exceptions import RequestException
 from shutil import rmtree
 from tempfile import mkdtemp
 from timeit import default_timer
+import json
 import logging
 import os
 import sys
+import threading
 import time
-from .const import (__version__, APPROVAL_PHRASES, FARCY_COMMENT_START,
-                    STATUS_CONTEXT)
-from .exceptions import FarcyException, HandlerException
-from .helpers import added_lines, plural
-from .objects import Config, ErrorTracker, UTC
+from . import logs, metrics, tracing
+from .backfill import Backfill
+from .const import (__version__, APPROVAL_PHRASES, DIFF_MEDIA_TYPE,
+                    FARCY_COMMENT_START, GENERATED_RE,
+                    GITATTRIBUTES_CACHE_SIZE, MINIFIED_RE,
+                    PR_METADATA_MAX_AGE, STATUS_CONTEXT, STDIN_DIR)
+from .costs import CostModel
+from .exceptions import (FarcyException, HandlerException,
+                         HandlerLimitExceeded, MirrorException)
+from .helpers import added_lines, decode_lines, diff_files, plural
+from .http_cache import CachingAdapter, HttpCache
+from .jobs import ReviewQueue
+from .mirror import GitMirror
+from .objects import (Config, DiffFile, ErrorTracker, FileWatcher,
+                      GitAttributes, MirroredFile, UTC)
+from .recording import Recorder
+from .timing import (ReviewProfile, count_api_call, current_profile,
+                     profiling, timed)
+from .tracing import span
+
+try:
+    from queue import Empty, Queue  # PY3
+except ImportError:
+    from Queue import Empty, Queue  # PY2
 
 
 def no_handler_debug_factory(duration=3600):
@@ -58,7 +94,7 @@ def no_handler_debug_factory(duration=3600):
     def log(obj, ext):
         now = default_timer()
         if now - last_logged.get(ext, 0) > duration:
-            obj.log.debug('No handlers for extension {0}'.format(ext))
+            obj.log.debug('No handlers for extension %s', ext)
         last_logged[ext] = now
     return log
 
@@ -70,17 +106,8 @@ class Farcy(object):
 
     def __init__(self, config):
         """Initialize an instance of Farcy that monitors owner/repository."""
-        # Configure logging
         self.config = config
-        self.log = logging.getLogger(__name__)
-        self.log.setLevel(config.log_level_int)
-
-        # Prepare logging
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter(
-            '%(asctime)s %(levelname)8s %(message)s', '%Y/%m/%d %H:%M:%S'))
-        self.log.addHandler(handler)
-        self.log.info('Logging enabled at level {0}'.format(config.log_level))
+        self._configure_logging()
 
         if config.start_event:
             self.start_time = None
@@ -90,6 +117,21 @@ class Farcy(object):
             self.last_event_id = None
 
         self._load_handlers()
+        self._config_watcher = FileWatcher(
+            [Config.PATH] + [handler.config_path for handler in self.handlers])
+        tracing.configure(config.trace_file)
+
+        self.http_cache = None
+        if config.http_cache_file:
+            self.http_cache = HttpCache(config.http_cache_file)
+            config.session.session.mount('https://',
+                                         CachingAdapter(self.http_cache))
+
+        self.recorder = None
+        if config.record_file:
+            self.recorder = Recorder(config.record_file, config.repository,
+                                     self.start_time, self.last_event_id)
+            config.session.session.hooks['response'].append(self.recorder)
 
         # Initialize the repository to monitor
         self.repo = config.session.repository(
@@ -97,23 +139,99 @@ class Farcy(object):
         if self.repo is None:
             raise FarcyException('Invalid owner or repository name: {0}'
                                  .format(self.config.repository))
-        # Keep track of open pull requests
+        self.repo.session.hooks['response'].extend(
+            [count_api_call, metrics.observe_api_response,
+             tracing.record_api_response])
+        self.mirror = None
+        if config.git_mirror_dir:
+            self.mirror = GitMirror(os.path.join(
+                config.git_mirror_dir, config.repository + '.git'),
+                self.repo.clone_url)
+            self.mirror.ensure()
+        self._gitattributes_cache = OrderedDict()
+        self.queue = None
+        if config.queue_file and not config.debug:
+            self.queue = ReviewQueue(config.queue_file)
+        # Keep track of open pull requests, and when they were fetched. The
+        # listed pull requests lack fields, so they are refreshed when used.
         self.open_prs = {}
+        self._pr_fetched = {}
         for pr in self.repo.pull_requests(state='open'):
             self.open_prs[pr.head.ref] = pr
 
+        self.metrics_server = None
+        if config.metrics_port is not None:
+            self.metrics_server = metrics.start_server(config.metrics_port)
+            self.log.info('Serving metrics on port %s',
+                          self.metrics_server.server_port)
+        self.backfill = None
+        self._events_idle = threading.Event()
+        self._events_idle.set()
+        self._pr_locks = defaultdict(threading.Lock)
+        self._pr_locks_lock = threading.Lock()
         self.running = False
 
-    def _compute_pfile_stats(self, pfile, stats):
+    def _backfill_open_prs(self):
+        """Review the open pull requests in the background.
+
+        The pull requests updated most recently are reviewed first. Reviews
+        wait while an event is handled.
+
+        """
+        since = self.config.updated_since
+        if since is not None:
+            since = parse(since)
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=UTC())
+        prs = {pr.number: pr for pr in self.open_prs.values()
+               if since is None or pr.updated_at >= since}
+        numbers = sorted(prs, key=lambda number: prs[number].updated_at,
+                         reverse=True)
+        if self.queue is not None:
+            for number in numbers:
+                self.queue.add(self.config.repository, number,
+                               prs[number].head.sha)
+        self.log.info('Backfilling %s', plural(len(numbers), 'pull request'))
+        self.backfill = Backfill(lambda number: self.handle_pr(prs[number]),
+                                 numbers, self.config.backfill_workers,
+                                 ready=self._events_idle, log=self.log)
+        self.backfill.start()
+
+    def _compute_pfile_stats(self, pfile, stats, sha=None, blobs=None):
+        """Return the added lines of the file, or None to skip the file.
+
+        Files are skipped based only on their metadata and patch, and on the
+        ``.gitattributes`` of ``sha`` when provided, so skipped files are
+        never fetched. The ``.gitattributes`` are read from the BlobReader
+        ``blobs`` when given.
+
+        """
         added = None
-        if self.config.exclude_paths is not None and \
-                any(fnmatch(pfile.filename, pattern) for pattern
-                    in self.config.exclude_paths):
+        exclude_matcher = self.config.exclude_matcher
+        if exclude_matcher is not None and exclude_matcher(pfile.filename):
             stats['blacklisted_files'] += 1
         elif pfile.status == 'removed':  # Ignore deleted files
             stats['deleted_files'] += 1
+        elif self.config.skip_generated and \
+                MINIFIED_RE.search(pfile.filename):
+            stats['minified_files'] += 1
+        elif self.config.skip_generated and (
+                GENERATED_RE.search(pfile.filename) or sha and
+                self._gitattributes(sha, blobs).get(pfile.filename,
+                                                    'linguist-generated')):
+            stats['generated_files'] += 1
+        elif self.config.skip_generated and sha and \
+                self._gitattributes(sha, blobs).get(pfile.filename,
+                                                    'linguist-vendored'):
+            stats['vendored_files'] += 1
         elif pfile.patch is None:  # Ignore files without changes
             stats['unchanged_files'] += 1
+        elif self.config.max_patch_size is not None and \
+                len(pfile.patch) > self.config.max_patch_size:
+            stats['large_patch_files'] += 1
+        elif self.config.max_file_changes is not None and \
+                pfile.changes_count > self.config.max_file_changes:
+            stats['large_change_files'] += 1
         elif pfile.status in ('modified', 'renamed'):
             # Only report issues on the changed lines
             added = added_lines(pfile.patch)
@@ -124,10 +242,39 @@ class Farcy(object):
             stats['added_files'] += 1
             stats['added_lines'] += len(added)
         else:
-            self.log.critical('Unexpected file status {0} on {1}'
-                              .format(pfile.status, pfile.filename))
+            self.log.critical('Unexpected file status %s on %s',
+                              pfile.status, pfile.filename)
         return added
 
+    def _configure_logging(self):
+        self.log = logging.getLogger(__name__)
+        self.log.setLevel(self.config.log_level_int)
+        logs.configure(self.log, json_output=self.config.log_json)
+        self.log.info('Logging enabled at level %s', self.config.log_level)
+        self.perf_log = logging.getLogger(__name__ + '.perf')
+        if self.config.perf_log:
+            self.perf_log.setLevel(logging.INFO)
+        else:  # Rather than inheriting the level of the farcy logger
+            self.perf_log.setLevel(logging.CRITICAL + 1)
+
+    def _dispatch(self, event, attempts=3):
+        """Call the event's callback retrying up to ``attempts`` times."""
+        remaining = attempts
+        while remaining > 0:
+            if remaining < attempts:  # Sleep only on subsequent attempts.
+                time.sleep(4 ** (attempts - remaining))
+            try:
+                getattr(self, event.type)(event)
+                remaining = 0
+            except Exception as exc:
+                remaining -= 1
+                message = 'Error with event ({0}): {1}'.format(event, exc)
+                if remaining > 0:
+                    self.log.error(message)
+                    self.log.info('Retrying %s more time(s).', remaining)
+                else:
+                    self.log.exception(message)
+
     def _event_loop(self, itr, events):
         newest_id = None
         for event in itr:
@@ -136,10 +283,10 @@ class Farcy(object):
                or self.start_time and event.created_at < self.start_time:
                 break
 
-            self.log.debug('EVENT {eid} {time} {etype} {user}'.format(
-                eid=event.id, time=event.created_at, etype=event.type,
-                user=event.actor.login))
+            self.log.debug('EVENT %s %s %s %s', event.id, event.created_at,
+                           event.type, event.actor.login)
             newest_id = newest_id or int(event.id)
+            metrics.EVENTS.labels(event.type).inc()
 
             # Add relevent events in reverse order
             if event.type in self.EVENTS:
@@ -153,7 +300,6 @@ class Farcy(object):
                 .format(pr.number, pr.user.login))
 
     def _fail_closed(self, pr):
-        pr.refresh()
         if pr.state == 'open':
             return None
         return ('Skipping PR#{0}: invalid state ({1})'
@@ -165,24 +311,93 @@ class Farcy(object):
                 pr.number)
         return None
 
-    def _get_state(self, issues, exception):
+    def _get_state(self, issues, exception, unexamined=0):
         if exception:
             return 'error', 'encountered an exception in handler. Check log.'
+        if issues > 0 and unexamined:
+            return 'failure', 'found {0} ({1} not examined)'.format(
+                plural(issues, 'issue'), plural(unexamined, 'file'))
         if issues > 0:
             return 'failure', 'found {0}'.format(plural(issues, 'issue'))
         return 'success', 'approves! {0}!'.format(choice(APPROVAL_PHRASES))
 
-    def _handle_pr_file(self, pfile, pr, sha, data):
-        """Return whether or not an exception occured."""
-        added = self._compute_pfile_stats(pfile, data['stats'])
-        if added is None:
-            return False
+    def _gitattributes(self, sha, blobs=None):
+        """Return the GitAttributes of the repository at commit ``sha``.
+
+        The ``.gitattributes`` file is read from the BlobReader ``blobs`` of
+        the git mirror when given and the commit is in the mirror, and is
+        otherwise fetched with the contents API. The attributes of the most
+        recent commits are cached, so the file is read once per commit.
+
+        """
+        attributes = self._gitattributes_cache.get(sha)
+        if attributes is not None:
+            return attributes
+        text = ''
+        if blobs is not None and blobs.exists(sha):
+            text = (blobs.read(sha, '.gitattributes') or b'').decode(
+                'utf-8', 'replace')
+        else:
+            try:
+                with timed('fetch_gitattributes'):
+                    contents = self.repo.file_contents('.gitattributes',
+                                                       ref=sha)
+                text = contents.decoded.decode('utf-8', 'replace')
+            except NotFoundError:
+                pass
+            except GitHubError as exc:
+                self.log.warning('Unable to fetch .gitattributes at %s: %s',
+                                 sha, exc)
+        attributes = self._gitattributes_cache[sha] = GitAttributes(text)
+        while len(self._gitattributes_cache) > GITATTRIBUTES_CACHE_SIZE:
+            self._gitattributes_cache.popitem(last=False)
+        return attributes
+
+    def _handle_pr(self, pr, force):
+        profile = ReviewProfile(self.config.repository, pr.number)
+        with profiling(profile), span('handle_pr', pr=pr.number):
+            if not force:
+                pr = self._refresh_stale_pr(pr)
+            failure = not force and (self._fail_allowed(pr) or
+                                     self._fail_closed(pr) or
+                                     self._fail_ignore(pr))
+            if failure:
+                self.log.debug(failure)
+                return
+
+            sha = pr.head.sha
+            job = (self.config.repository, pr.number, sha)
+            if self.queue is not None:
+                if force:
+                    self.queue.start(*job)
+                elif not self.queue.claim(*job):
+                    self.log.debug('PR#%s already reviewed at %s', pr.number,
+                                   sha)
+                    return
 
-        try:
-            file_issues = self.get_issues(pfile, pr)
-        except Exception:
-            self.log.exception('Failure with get_issues for {0}'
-                               .format(pfile.filename))
+            try:
+                state, stats = self._review_pr(pr, sha)
+            except Exception:
+                if self.queue is not None:  # Let a retry claim the job
+                    self.queue.release(*job)
+                raise
+            if self.queue is not None:
+                self.queue.finish(*job, state=state)
+            metrics.REVIEWS_FINISHED.labels(state).inc()
+            metrics.REVIEW_SECONDS.observe(profile.elapsed())
+
+        if self.perf_log.isEnabledFor(logging.INFO):
+            self.perf_log.info(json.dumps(profile.record(
+                sha=sha, state=state, stats=dict(stats)), sort_keys=True))
+
+    def _handle_pr_file(self, pfile, pr, sha, added, file_issues, data):
+        """Comment the issues of a linted file.
+
+        Return whether or not an exception occured. ``file_issues`` is None
+        when linting the file failed.
+
+        """
+        if file_issues is None:
             return True
 
         for line, messages in file_issues.items():
@@ -200,20 +415,20 @@ class Farcy(object):
             if self.config.debug:
                 # Only log each issue if we're in debugging mode because we
                 # don't want the logs in non-debugging mode to be noisy.
-                self.log.info('PR#{0} ({1}:{2}): {3}"'.format(
-                    pr.number, pfile.filename, line, violations))
+                self.log.info('PR#%s (%s:%s): %s"', pr.number, pfile.filename,
+                              line, violations)
             else:
                 msg = '\n'.join(
                     [FARCY_COMMENT_START] + ['* {}'.format(violation)
                                              for violation in violations])
                 try:
-                    pr.create_review_comment(msg, sha, pfile.filename,
-                                             line).html_url
+                    with timed('create_review_comment'):
+                        pr.create_review_comment(msg, sha, pfile.filename,
+                                                 line).html_url
                 except UnprocessableEntity as exc:
                     self.log.exception('Failure with create_review_comment for'
-                                       ' {0} on line {1}'
-                                       .format(pfile.filename, line))
-                    self.log.exception(str(exc))
+                                       ' %s on line %s', pfile.filename, line)
+                    self.log.exception('%s', exc)
                     exception_occurred = True
 
             # `data['comments']` is misleading when in debug mode.  What
@@ -222,28 +437,331 @@ class Farcy(object):
             data['comments'] += 1
         return exception_occurred
 
+    def _lint_file(self, pfile, pr, stats, added):
+        """Return the issues of the file, or None when linting failed.
+
+        Linting fails when a handler exceeds a resource limit, so that the
+        file is not reported as free of issues.
+
+        """
+        try:
+            with timed('get_issues'), span('get_issues'):
+                return self.get_issues(pfile, pr, stats, added)
+        except HandlerLimitExceeded as exc:
+            self.log.warning('Unable to lint %s: %s', pfile.filename, exc)
+            return None
+        except Exception:
+            self.log.exception('Failure with get_issues for %s',
+                               pfile.filename)
+            return None
+
+    def _lint_files(self, files, pr, stats):
+        """Yield (pfile, added, file_issues) for each (pfile, added).
+
+        The files are yielded in order. With more than one ``lint_workers``,
+        worker threads lint the files ahead, starting with the files whose
+        handlers are predicted to take the longest, so the review takes about
+        as long as its slowest file. Files not yet linted when the generator
+        is closed are not linted.
+
+        """
+        workers = min(self.config.lint_workers or 1, len(files))
+        if workers <= 1:
+            for pfile, added in files:
+                yield pfile, added, self._lint_file(pfile, pr, stats, added)
+            return
+
+        def cost(index):
+            pfile = files[index][0]
+            handlers = self._ext_to_handler.get(
+                os.path.splitext(pfile.filename)[1], ())
+            return self.costs.predict([handler.name for handler in handlers],
+                                      len(pfile.patch))
+
+        pending = Queue()
+        for index in sorted(range(len(files)), key=cost, reverse=True):
+            pending.put(index)
+        linted = [threading.Event() for _ in files]
+        parent = tracing.current_span()
+        profile = current_profile()
+        results = [None] * len(files)
+
+        def work():
+            with profiling(profile), tracing.within(parent):
+                while True:
+                    try:
+                        index = pending.get_nowait()
+                    except Empty:
+                        return
+                    pfile, added = files[index]
+                    file_stats = Counter()
+                    results[index] = (self._lint_file(pfile, pr, file_stats,
+                                                      added), file_stats)
+                    linted[index].set()
+
+        threads = [threading.Thread(target=work, name='farcy-lint-{0}'
+                                    .format(number))
+                   for number in range(workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for index, (pfile, added) in enumerate(files):
+                linted[index].wait()
+                file_issues, file_stats = results[index]
+                stats.update(file_stats)
+                yield pfile, added, file_issues
+        finally:
+            while True:  # Stop the workers after their current file
+                try:
+                    pending.get_nowait()
+                except Empty:
+                    break
+            for thread in threads:
+                thread.join()
+
     def _load_handlers(self):
         from . import handlers
+        self.costs = CostModel(self.config.handler_costs_file, log=self.log)
         self._ext_to_handler = defaultdict(list)
-        active = []
+        self.handlers = []
         for handler in (handlers.ESLint, handlers.Flake8, handlers.Pep257,
                         handlers.Rubocop, handlers.SCSSLint):
             try:
                 handler_inst = handler()
             except HandlerException:
                 continue
+            self._set_handler_limits(handler_inst)
             for ext in handler.EXTENSIONS:
                 self._ext_to_handler[ext].append(handler_inst)
-            active.append(handler_inst.name)
-        if active:
-            self.log.info('Active handlers: %s', ', '.join(active))
+            self.handlers.append(handler_inst)
+        if self.handlers:
+            self.log.info('Active handlers: %s', ', '.join(
+                handler.name for handler in self.handlers))
         else:
             self.log.warning('No active handlers')
 
+    @contextmanager
+    def _pr_blobs(self, pr):
+        """Yield a BlobReader of the pull request's files, or None.
+
+        None is yielded when no git mirror is configured, or the pull
+        request's head cannot be fetched into it.
+
+        """
+        reader = None
+        if self.mirror is not None:
+            try:
+                with timed('fetch_mirror'):
+                    self.mirror.fetch_pull_request(pr.number)
+                reader = self.mirror.reader()
+            except MirrorException as exc:
+                self.log.warning('PR#%s mirror fetch failed: %s', pr.number,
+                                 exc)
+        try:
+            yield reader
+        finally:
+            if reader is not None:
+                reader.close()
+
+    def _pr_lock(self, number):
+        with self._pr_locks_lock:
+            return self._pr_locks[number]
+
+    def _pr_diff_files(self, pr, sha):
+        """Return a list of the DiffFiles of large pull requests.
+
+        The pull request's unified diff is streamed in a single request
+        rather than paging through ``pr.files()``, whose patches are possibly
+        truncated. None is returned when the pull request is not large, or
+        the diff cannot be fetched.
+
+        """
+        threshold = self.config.large_pr_threshold
+        if threshold is None or pr.changed_files < threshold:
+            return None
+        try:
+            response = self.repo.session.get(
+                pr.url, headers={'Accept': DIFF_MEDIA_TYPE}, stream=True)
+        except RequestException as exc:
+            self.log.warning('PR#%s diff failed: %s', pr.number, exc)
+            return None
+        try:
+            if response.status_code != 200:
+                self.log.warning('PR#%s diff unavailable (%s)', pr.number,
+                                 response.status_code)
+                return None
+            return [DiffFile(filename, patch, status, self.repo, sha)
+                    for filename, status, patch in diff_files(decode_lines(
+                        response.iter_content(chunk_size=65536)))]
+        except RequestException as exc:
+            self.log.warning('PR#%s diff failed: %s', pr.number, exc)
+            return None
+        finally:
+            response.close()
+
+    def _refresh_stale_pr(self, pr):
+        """Return ``pr``, refreshed unless fetched within PR_METADATA_MAX_AGE.
+
+        Pull requests from a listing, which lack fields such as
+        ``changed_files``, are always refreshed. Refreshing them returns a new
+        object, which replaces ``pr`` in ``open_prs``.
+
+        """
+        fetched = self._pr_fetched.get(pr.number)
+        if fetched is None or time.time() - fetched > PR_METADATA_MAX_AGE \
+                or not hasattr(pr, 'changed_files'):
+            refreshed = self._track_pr(pr.refresh())
+            if refreshed is not pr and \
+                    self.open_prs.get(refreshed.head.ref) is pr:
+                self.open_prs[refreshed.head.ref] = refreshed
+            pr = refreshed
+        return pr
+
+    def _reload_config(self):
+        """Swap in the configuration if any of its files changed.
+
+        Attributes only read on start-up keep their values, and the current
+        configuration is kept when the new one is invalid. Return True when
+        the configuration was reloaded.
+
+        """
+        changed = self._config_watcher.changed()
+        if not changed:
+            return False
+        try:
+            config = self.config.reloaded()
+        except FarcyException as exc:
+            self.log.error('Keeping the current configuration: %s', exc)
+            return False
+        for attr in sorted(Config.STARTUP_ATTRS):
+            if getattr(config, attr) != getattr(self.config, attr):
+                self.log.warning('Restart farcy to change %s', attr)
+                setattr(config, attr, getattr(self.config, attr))
+        self.config = config
+        self._configure_logging()
+        for handler in self.handlers:
+            handler.load_config_file()
+            self._set_handler_limits(handler)
+        self.log.info('Reloaded configuration after changes to %s',
+                      ', '.join(changed))
+        return True
+
+    def _resume_reviews(self):
+        """Review the pull requests of the queue's unfinished jobs.
+
+        Jobs whose commit is no longer the head of the pull request, or whose
+        pull request no longer needs a review or no longer exists, are marked
+        superseded. The fetched pull request is not refreshed again.
+
+        """
+        for job in self.queue.unfinished(self.config.repository):
+            self.log.info('Resuming review of PR#%s at %s', job[1], job[2])
+            try:
+                pr = self.repo.pull_request(job[1])
+                if pr is not None:
+                    self.handle_pr(self._track_pr(pr))
+            except Exception:
+                self.log.exception('Failure resuming review of PR#%s',
+                                   job[1])
+                continue
+            if not self.queue.is_reviewed(*job):
+                self.queue.finish(*job, state='superseded')
+
+    def _review_pr(self, pr, sha):
+        """Review the files of ``pr`` at ``sha`` and set its status.
+
+        Return the state of the status and the statistics of the review.
+
+        """
+        metrics.REVIEWS_STARTED.inc()
+        self._set_status(sha, 'pending', 'started investigation')
+        self.log.info('Handling PR#%s by %s', pr.number, pr.user.login)
+
+        exception = False
+        with timed('fetch_comments'):
+            error_tracker = ErrorTracker(
+                pr.review_comments(), self.config.comment_group_threshold)
+        handle_data = {'comments': error_tracker.github_message_count,
+                       'errors': error_tracker,
+                       'stats': Counter()}
+        with timed('fetch_diff'):
+            pfiles = self._pr_diff_files(pr, sha)
+        with self._pr_blobs(pr) as blobs:
+            files = []
+            for pfile in pr.files() if pfiles is None else pfiles:
+                if blobs is not None:
+                    pfile = MirroredFile(pfile, blobs, sha)
+                added = self._compute_pfile_stats(
+                    pfile, handle_data['stats'], sha, blobs)
+                if added is not None:
+                    files.append((pfile, added))
+            if self.config.stop_at_comment_limit:
+                # Lint the files most likely to have issues first
+                files.sort(key=lambda x: len(x[1]), reverse=True)
+            linted = self._lint_files(files, pr, handle_data['stats'])
+            for examined, (pfile, added, file_issues) in enumerate(
+                    linted, 1):
+                with span('_handle_pr_file', file=pfile.filename):
+                    exception = self._handle_pr_file(
+                        pfile, pr, sha, added, file_issues,
+                        handle_data) or exception
+                if self.config.stop_at_comment_limit and \
+                        error_tracker.new_issue_count and \
+                        handle_data['comments'] >= \
+                        self.config.pr_issue_report_limit:
+                    # The status is settled, and nothing more is shown
+                    handle_data['stats']['unexamined_files'] = \
+                        len(files) - examined
+                    linted.close()
+                    break
+        self.costs.save()
+
+        stats = handle_data['stats']
+        stats['issues'] += error_tracker.new_issue_count
+        stats['hidden'] += error_tracker.hidden_issue_count
+
+        # Log the statistics for the PR
+        for key, count in sorted(stats.items()):
+            metrics.REVIEW_STATS.labels(key).inc(count)
+            if count > 0:
+                self.log.debug('PR#%s %16s: %s', pr.number, key, count)
+
+        state, message = self._get_state(
+            stats['issues'], exception, stats['unexamined_files'])
+        self._set_status(sha, state, message)
+        self.log.info('PR#%s STATUS: %s', pr.number, message)
+        return state, stats
+
+    def _set_handler_limits(self, handler):
+        def limit(name):
+            return self.config.handler_limit(handler.name, name)
+        memory = limit('memory_limit')
+        handler.set_limits(
+            concurrency=limit('concurrency'), cpu=limit('cpu_limit'),
+            memory=memory and memory * 2 ** 20, niceness=limit('niceness'),
+            open_files=limit('open_files'), output=limit('output_limit'),
+            timeout=limit('timeout'))
+
     def _set_status(self, sha, status, description):
         if not self.config.debug:
-            self.repo.create_status(sha, status, context=STATUS_CONTEXT,
-                                    description=description)
+            with timed('set_status'):
+                self.repo.create_status(sha, status, context=STATUS_CONTEXT,
+                                        description=description)
+
+    def _track_pr(self, pr):
+        """Record that the metadata of ``pr`` was just fetched."""
+        self._pr_fetched[pr.number] = time.time()
+        return pr
+
+    def _write_contents(self, tmpdir, filename, contents):
+        """Write the file's contents at its path under tmpdir."""
+        full_dir = os.path.join(tmpdir, os.path.dirname(filename))
+        os.makedirs(full_dir, exist_ok=True)
+        filepath = os.path.join(full_dir, os.path.basename(filename))
+        with open(filepath, 'wb') as fp:
+            fp.write(contents)
+        return filepath
 
     def events(self):
         """Yield repository events in order."""
@@ -256,6 +774,7 @@ class Farcy(object):
         while self.running:
             if sleep_time:  # Only sleep before we're about to make requests.
                 time.sleep(sleep_time)
+            self._reload_config()
 
             # Fetch events
             events = []
@@ -263,8 +782,8 @@ class Farcy(object):
             try:
                 newest_id = self._event_loop(itr, events)
             except (ConnectionError, ServerError) as exc:
-                self.log.exception('Error in event generation loop: {0}'
-                                   .format(exc))
+                self.log.exception('Error in event generation loop: %s',
+                                   exc)
                 sleep_time = 1
                 continue
 
@@ -272,14 +791,28 @@ class Farcy(object):
             self.last_event_id = newest_id or self.last_event_id
 
             # Yield events from oldest to newest
-            for event in events:
+            for index, event in enumerate(events):
+                metrics.EVENT_QUEUE_DEPTH.set(len(events) - index)
                 yield event
+            metrics.EVENT_QUEUE_DEPTH.set(0)
 
             sleep_time = int(itr.last_response.headers.get('X-Poll-Interval',
                                                            sleep_time))
 
-    def get_issues(self, pfile, pr):
-        """Return a dictionary of issues for the file."""
+    def get_issues(self, pfile, pr, stats=None, lines=None):
+        """Return a dictionary of issues for the file.
+
+        Handlers exceeding a resource limit are counted in ``stats`` as
+        ``handler_limit_LIMIT``, e.g., ``handler_limit_timeout``, and their
+        HandlerLimitExceeded exception is raised. The contents
+        are piped to handlers that support it, and only written to a
+        temporary directory for the others. The piped contents are named by
+        the file's path under ``STDIN_DIR``, so that the linter resolves its
+        configuration and ignore files as it does for a written copy, not
+        from farcy's working directory. When ``lines`` is given, only the
+        issues on those line numbers are returned.
+
+        """
         ext = os.path.splitext(pfile.filename)[1]
         handlers = self._ext_to_handler.get(ext)
         if not handlers:  # Do nothing if there are no handlers
@@ -287,59 +820,44 @@ class Farcy(object):
             return {}
         retval = {}
 
+        with timed('fetch_contents'):
+            contents = pfile.contents().decoded
+        filepath = tmpdir = None
         try:
-            tmpdir = mkdtemp()
-            path_in_repo = os.path.dirname(pfile.filename)
-            full_dir = os.path.join(tmpdir, path_in_repo)
-            os.makedirs(full_dir, exist_ok=True)
-            filepath = os.path.join(full_dir, os.path.basename(pfile.filename))
-            with open(filepath, 'wb') as fp:
-                fp.write(pfile.contents().decoded)
             for handler in handlers:
-                handler.prepare_directory(tmpdir, self.repo, pr)
-                retval.update(handler.process(fp.name))
+                if handler.stdin:
+                    args = (os.path.join(STDIN_DIR, pfile.filename), contents)
+                else:
+                    if tmpdir is None:
+                        tmpdir = mkdtemp()
+                        filepath = self._write_contents(
+                            tmpdir, pfile.filename, contents)
+                    handler.prepare_directory(tmpdir, self.repo, pr)
+                    args = (filepath,)
+                try:
+                    start = default_timer()
+                    retval.update(handler.process(*args, lines=lines))
+                    self.costs.observe(handler.name, len(pfile.patch or ''),
+                                       default_timer() - start)
+                except HandlerLimitExceeded as exc:
+                    if stats is not None:
+                        stats['handler_limit_{0}'.format(exc.limit)] += 1
+                    raise
         finally:
-            rmtree(tmpdir)
+            if tmpdir is not None:
+                rmtree(tmpdir)
 
         return retval
 
     def handle_pr(self, pr, force=False):
-        """Provide code review on pull request."""
-        failure = not force and (self._fail_allowed(pr) or
-                                 self._fail_closed(pr) or
-                                 self._fail_ignore(pr))
-        if failure:
-            self.log.debug(failure)
-            return
+        """Provide code review on pull request.
 
-        sha = list(pr.commits())[-1].sha
-        self._set_status(sha, 'pending', 'started investigation')
-        self.log.info('Handling PR#{0} by {1}'
-                      .format(pr.number, pr.user.login))
+        Reviews of the same pull request, such as those of an event and of a
+        backfill worker, run one at a time.
 
-        exception = False
-        error_tracker = ErrorTracker(pr.review_comments(),
-                                     self.config.comment_group_threshold)
-        handle_data = {'comments': error_tracker.github_message_count,
-                       'errors': error_tracker,
-                       'stats': Counter()}
-        for pfile in pr.files():
-            exception = self._handle_pr_file(
-                pfile, pr, sha, handle_data) or exception
-
-        handle_data['stats']['issues'] += error_tracker.new_issue_count
-        handle_data['stats']['hidden'] += error_tracker.hidden_issue_count
-
-        # Log the statistics for the PR
-        for key, count in sorted(handle_data['stats'].items()):
-            if count > 0:
-                self.log.debug('PR#{0} {1:>16}: {2}'
-                               .format(pr.number, key, count))
-
-        state, message = self._get_state(handle_data['stats']['issues'],
-                                         exception)
-        self._set_status(sha, state, message)
-        self.log.info('PR#{0} STATUS: {1}'.format(pr.number, message))
+        """
+        with self._pr_lock(pr.number):
+            self._handle_pr(pr, force)
 
     no_handler_debug = no_handler_debug_factory()
 
@@ -348,22 +866,21 @@ class Farcy(object):
         pr = event.payload['pull_request']
         action = event.payload['action']
         branch = pr.head['ref']
-        self.log.debug('PullRequest #{num} {action} on branch {branch}'
-                       .format(action=action, branch=branch,
-                               num=pr.number))
+        self.log.debug('PullRequest #%s %s on branch %s', pr.number, action,
+                       branch)
         if action == 'closed':
+            self._pr_fetched.pop(pr.number, None)
             if branch in self.open_prs:
                 del self.open_prs[branch]
             else:
-                self.log.warning('open_prs did not contain {0}'
-                                 .format(branch))
+                self.log.warning('open_prs did not contain %s', branch)
             return
 
-        pr = pr.refresh()
+        pr = self._track_pr(pr.refresh())
         if action == 'opened':
             self.open_prs[branch] = pr
             self.handle_pr(pr)
-        elif action == 'reopened':
+        elif action == 'reopened' or branch in self.open_prs:
             self.open_prs[branch] = pr
 
     def PushEvent(self, event):
@@ -372,45 +889,65 @@ class Farcy(object):
         assert ref.startswith('refs/heads/')
         pull_request = self.open_prs.get(ref.rsplit('/', 1)[1])
         if pull_request:
+            if event.payload.get('head'):  # Update the head in place
+                pull_request.head.sha = event.payload['head']
             self.handle_pr(pull_request)
 
     def run(self):
         """Run the bot until ctrl+c is received."""
         if self.config.pull_requests is not None:
-            for number in sorted(int(x) for x in self.config.pull_requests):
-                self.handle_pr(self.repo.pull_request(number), force=True)
+            self.backfill = Backfill(
+                lambda number: self.handle_pr(self.repo.pull_request(number),
+                                              force=True),
+                sorted(int(x) for x in self.config.pull_requests),
+                self.config.backfill_workers, log=self.log)
+            self.backfill.start()
+            self.backfill.join()
             return
 
-        self.log.info('Monitoring {0}'.format(self.repo.html_url))
+        if self.queue is not None:
+            self._resume_reviews()
+        if self.config.all_open:
+            self._backfill_open_prs()
+        self.log.info('Monitoring %s', self.repo.html_url)
         for event in self.events():
-            attempts = 3
-            while attempts > 0:
-                if attempts < 3:  # Sleep only on subsequent attempts.
-                    time.sleep(4 ** (3 - attempts))
-                try:
-                    getattr(self, event.type)(event)
-                    attempts = 0
-                except Exception as exc:
-                    attempts -= 1
-                    message = 'Error with event ({0}): {1}'.format(event, exc)
-                    if attempts > 0:
-                        self.log.error(message)
-                        self.log.info('Retrying {0} more time(s).'
-                                      .format(attempts))
-                    else:
-                        self.log.exception(message)
+            self._events_idle.clear()
+            try:
+                with span('event', event_id=event.id, event_type=event.type):
+                    self._dispatch(event)
+            finally:
+                self._events_idle.set()
+
+
+def local_main(args):
+    """Review a range of commits of the current repository."""
+    from .local import EXIT_STATUSES, LocalReview
+    config = Config(None, debug=args['--debug'],
+                    exclude_paths=args['--exclude-path'],
+                    log_level=args['--logging'])
+    try:
+        state = LocalReview(config).review(args['RANGE'])
+    except FarcyException as exc:
+        sys.stderr.write('{0}\n'.format(exc))
+        return 2
+    return EXIT_STATUSES[state]
 
 
 def main():
     """Provide an entry point into Farcy."""
     args = docopt(__doc__, version='farcy v{0}'.format(__version__))
-    config = Config(args['REPOSITORY'], debug=args['--debug'],
+    if args['local']:
+        return local_main(args)
+    config = Config(args['REPOSITORY'], all_open=args['--all-open'],
+                    debug=args['--debug'],
                     exclude_paths=args['--exclude-path'],
                     limit_users=args['--limit-user'],
                     log_level=args['--logging'],
                     pr_issue_report_limit=args['--comments-per-pr'],
                     pull_requests=args['--pr'],
-                    start_event=args['--start'])
+                    record_file=args['--record'],
+                    start_event=args['--start'],
+                    updated_since=args['--updated-since'])
     if config.repository is None:
         sys.stderr.write('No repository specified\n')
         return 2
@@ -0,0 +1,101 @@
+"""Review many pull requests with a pool of worker threads."""
+
+from timeit import default_timer
+import logging
+import threading
+
+try:
+    from queue import Empty, Queue  # PY3
+except ImportError:
+    from Queue import Empty, Queue  # PY2
+
+
+class Backfill(object):
+    """Reviews pull requests by number with a pool of worker threads.
+
+    Each review is logged along with the progress so far, and the number of
+    reviews per second is logged once every review finished. When ``ready``
+    is given, workers wait for it to be set before each review, so that the
+    reviews can yield to more urgent work.
+
+    """
+
+    def __init__(self, review, numbers, workers=1, ready=None, log=None):
+        """Initialize a Backfill object.
+
+        :param review: The function called with each number to review.
+        :param numbers: The numbers of the pull requests to review.
+        :param workers: The number of worker threads.
+        :param ready: A threading.Event to wait for before each review.
+        :param log: The logger of the progress.
+
+        """
+        self._numbers = Queue()
+        for number in numbers:
+            self._numbers.put(number)
+        self._lock = threading.Lock()
+        self._ready = ready
+        self._review = review
+        self._start = None
+        self._threads = [
+            threading.Thread(target=self._work,
+                             name='farcy-backfill-{0}'.format(index))
+            for index in range(max(1, workers))]
+        self.failed = 0
+        self.finished = threading.Event()
+        self.log = log or logging.getLogger(__name__)
+        self.reviewed = 0
+        self.seconds = None
+        self.total = self._numbers.qsize()
+        if not self.total:
+            self.seconds = 0.0
+            self.finished.set()
+
+    def _work(self):
+        while True:
+            try:
+                number = self._numbers.get_nowait()
+            except Empty:
+                return
+            if self._ready is not None:
+                self._ready.wait()
+            failed = False
+            try:
+                self._review(number)
+            except Exception:
+                self.log.exception('Backfill failed to review PR#%s', number)
+                failed = True
+            with self._lock:
+                self.failed += failed
+                self.reviewed += 1
+                done = self.reviewed
+                elapsed = default_timer() - self._start
+                if done == self.total:
+                    self.seconds = elapsed
+            self.log.info('Backfill %s/%s: PR#%s reviewed (%.2f/s)', done,
+                          self.total, number, done / elapsed)
+            if done == self.total:
+                self.log.info('%s', self.summary())
+                self.finished.set()
+
+    def join(self):
+        """Wait for the worker threads to exit."""
+        for thread in self._threads:
+            thread.join()
+
+    def start(self):
+        """Start reviewing with daemon worker threads."""
+        self._start = default_timer()
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def summary(self):
+        """Return a description of the throughput of the reviews."""
+        seconds = self.seconds
+        if seconds is None:
+            seconds = default_timer() - self._start
+        return ('Backfill reviewed {0} of {1} in {2:.1f}s ({3:.2f}/s), {4} '
+                'failed'.format(self.reviewed, self.total, seconds,
+                                self.reviewed / max(seconds, 1e-9),
+                                self.failed))
@@ -1,6 +1,7 @@
 """Constants used throughout Farcy."""
 import os
 import re
+from tempfile import gettempdir
 
 __version__ = '1.3.0'
 
@@ -13,6 +14,33 @@ FARCY_COMMENT_START = '_{0}_'.format(MD_VERSION_STR)
 
 NUMBER_RE = re.compile(r'(\d+)')
 
+HUNK_RE = re.compile(r'@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@')
+
+SHA_RE = re.compile(r'^[0-9a-f]{40}$')
+
+# A path quoted by git, and the escapes within it
+QUOTED_PATH_RE = re.compile(r'"(?:[^"\\]|\\.)*"$')
+QUOTED_ESCAPE_RE = re.compile(br'\\([0-7]{1,3}|.)')
+
+DIFF_MEDIA_TYPE = 'application/vnd.github.v3.diff'
+
+# Files that are generated, or minified, judging by their names alone
+GENERATED_RE = re.compile(r'(?:^|/)(?:Gemfile\.lock|package-lock\.json|'
+                          r'yarn\.lock)$|_pb2(?:_grpc)?\.py$|\.pb\.go$|'
+                          r'_pb\.(?:js|rb)$')
+GITATTRIBUTES_CACHE_SIZE = 64
+
+# The directory that the contents piped to handlers are named to be in. It
+# is never created, and like the temporary directories of the files written
+# for the other handlers it is outside of farcy's working directory.
+STDIN_DIR = os.path.join(gettempdir(), 'farcy-stdin')
+
+MINIFIED_RE = re.compile(r'[.-]min\.(?:css|js)$|\.bundle\.js$')
+
+# Seconds until the metadata of a pull request is fetched again. Events keep
+# it current in the meantime.
+PR_METADATA_MAX_AGE = 600
+
 APPROVAL_PHRASES = [x.strip() for x in """
 Amazing
 Bravo
@@ -0,0 +1,96 @@
+"""A model of the runtime of handlers by the size of the patches they lint."""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+
+# The weight of older observations is multiplied by DECAY with each new one
+DECAY = 0.95
+# Predicted seconds for a handler without observations
+DEFAULT_OVERHEAD = 0.5
+DEFAULT_SECONDS_PER_BYTE = 1e-5
+
+
+class CostModel(object):
+    """Predicts handler runtimes from their observed runtimes.
+
+    The runtime of each handler is modelled as a fixed overhead plus a cost
+    per byte of the linted file's patch, fit by least squares over the
+    decayed observations. The patch size is known before the file is fetched,
+    so the same measure is observed and predicted from. The model can be
+    shared by threads.
+
+    """
+
+    def __init__(self, path=None, log=None):
+        """Initialize a CostModel object.
+
+        :param path: The JSON file to load the observations from, if any.
+        :param log: The logger to report failed saves to.
+
+        """
+        self._lock = threading.Lock()
+        self._sums = {}
+        self.log = log or logging.getLogger(__name__)
+        self.path = path
+        if path and os.path.isfile(path):
+            with open(path) as fp:
+                self._sums = {handler: sums for handler, sums
+                              in json.load(fp).get('handlers', {}).items()
+                              if len(sums) == 5}
+
+    def coefficients(self, handler):
+        """Return a tuple containing (overhead, seconds_per_byte)."""
+        with self._lock:
+            sums = self._sums.get(handler)
+        if sums is None:
+            return DEFAULT_OVERHEAD, DEFAULT_SECONDS_PER_BYTE
+        weight, size, seconds, size_sq, size_seconds = sums
+        variance = weight * size_sq - size * size
+        if variance <= 1e-6 * weight * size_sq:  # All of about the same size
+            return seconds / weight, 0.0
+        per_byte = max(0.0, (weight * size_seconds - size * seconds) /
+                       variance)
+        return max(0.0, (seconds - per_byte * size) / weight), per_byte
+
+    def observe(self, handler, size, seconds):
+        """Record that ``handler`` took ``seconds`` on ``size`` bytes."""
+        with self._lock:
+            sums = self._sums.get(handler) or [0.0] * 5
+            self._sums[handler] = [
+                DECAY * total + value for total, value in zip(
+                    sums, (1.0, size, seconds, size * size, size * seconds))]
+
+    def predict(self, handlers, size):
+        """Return the seconds ``handlers`` are expected to take together."""
+        total = 0.0
+        for handler in handlers:
+            overhead, per_byte = self.coefficients(handler)
+            total += overhead + per_byte * size
+        return total
+
+    def save(self):
+        """Write the observations to ``path`` when set.
+
+        Each save writes a temporary file of its own and renames it over
+        ``path`` while holding the lock, so concurrent saves do not collide.
+        A failed save is logged, as the observations are only a hint.
+
+        """
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({'handlers': self._sums}, sort_keys=True)
+            temporary = None
+            try:
+                fd, temporary = tempfile.mkstemp(
+                    dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+                with os.fdopen(fd, 'w') as fp:
+                    fp.write(data)
+                os.rename(temporary, self.path)
+            except (IOError, OSError) as exc:
+                self.log.warning('Could not save the handler costs: %s', exc)
+                if temporary and os.path.exists(temporary):
+                    os.remove(temporary)
@@ -16,3 +16,29 @@ class HandlerException(FarcyException):
 
 class HandlerNotReady(HandlerException):
     """Exception indicating that a handler is not ready for use."""
+
+
+class HandlerLimitExceeded(HandlerException):
+    """Exception indicating that a handler exceeded a resource limit."""
+
+    def __init__(self, message, limit):
+        """Initialize the exception.
+
+        :param message: The exception message.
+        :param limit: The name of the exceeded limit, e.g., ``timeout``.
+
+        """
+        super(HandlerLimitExceeded, self).__init__(message)
+        self.limit = limit
+
+
+class MirrorException(FarcyException):
+    """Exception indicating that a git mirror operation failed."""
+
+
+class ReplayException(FarcyException):
+    """Exception indicating that a request was not found in a recording."""
+
+
+class ReplayFinished(ReplayException):
+    """Exception indicating that the recorded events were all replayed."""
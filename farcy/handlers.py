@@ -3,14 +3,21 @@
 from __future__ import print_function
 from base64 import b64decode
 from collections import defaultdict
-from subprocess import CalledProcessError, STDOUT, check_output
+from itertools import islice
+from subprocess import PIPE, Popen, STDOUT, check_output
 from update_checker import parse_version
+import errno
 import json
 import logging
 import os
 import re
+import signal
+import threading
 from .const import CONFIG_DIR
-from .exceptions import HandlerException, HandlerNotReady
+from .exceptions import HandlerException, HandlerLimitExceeded, HandlerNotReady
+from .metrics import HANDLER_FAILURES
+from .timing import add_child_cpu, timed
+from .tracing import span
 
 
 # src: http://stackoverflow.com/a/11270665/176978
@@ -19,6 +26,18 @@ try:
 except ImportError:
     DEVNULL = open(os.devnull, 'wb')
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# The number of output lines that ExtHandler._regex_parse matches at once
+PARSE_LINES = 1024
+
+# Return codes of a process terminated at its soft or hard CPU time limit
+CPU_LIMIT_SIGNALS = (-getattr(signal, 'SIGXCPU', signal.SIGTERM),
+                     -signal.SIGKILL)
+
 
 class ExtHandler(object):
     """An abstract class that provides the file handler interface.
@@ -28,6 +47,15 @@ class ExtHandler(object):
 
     ``BINARY`` is the name of an executable binary to look for.
     ``BINARY_VERSION`` is version of the binary expected.
+    ``RE_LINES`` is the number of output lines a match of ``RE`` can span.
+    ``OUTPUT_LIMIT`` and ``TIMEOUT`` are the default number of output bytes
+    and wall clock seconds allowed for each execution of the binary. Other
+    resource limits are unset unless provided to ``set_limits``.
+    ``STDIN_VERSION`` is the first version of the binary that lints contents
+    piped to its standard input. Handlers setting it implement
+    ``_process_stdin``, which ``process`` uses when given the contents.
+    Handlers given the changed ``lines`` discard the issues on other lines
+    as they parse the output of the binary.
 
     """
 
@@ -35,14 +63,120 @@ class ExtHandler(object):
     BINARY_VERSION = None
     EXTENSIONS = []
     OUTPUT = 'stdout'
+    OUTPUT_LIMIT = 16 * 2 ** 20
+    RE_LINES = 1
+    STDIN_VERSION = None
+    TIMEOUT = 300
 
     @staticmethod
-    def execute(args, stderr=DEVNULL):
+    def _kill(process):
+        """Kill the process along with any processes it started."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+
+    @staticmethod
+    def _reap(process):
+        """Wait for the process and return the CPU seconds it used.
+
+        The process is reaped with ``os.wait4`` so that its CPU time is
+        measured apart from the processes of concurrent handlers. Without
+        ``os.wait4`` the CPU time is not measured.
+
+        """
+        if not hasattr(os, 'wait4'):  # Not available on Windows
+            process.wait()
+            return 0.0
+        status, usage = os.wait4(process.pid, 0)[1:]
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+        return usage.ru_utime + usage.ru_stime
+
+    @staticmethod
+    def _write(fp, data):
+        """Write data to the pipe and close it, ignoring a closed pipe."""
+        try:
+            with fp:
+                fp.write(data)
+        except (IOError, OSError):  # The process exited without reading
+            pass
+
+    @property
+    def config_path(self):
+        """Return where the handler's config file is, if it exists."""
+        return os.path.join(
+            CONFIG_DIR, 'handler_{0}.conf'.format(self.name.lower()))
+
+    def execute(self, args, stderr=DEVNULL, stdin=None):
         """Return output of argument execution ignoring status code."""
+        return ''.join(self.iter_output(args, stderr=stderr, stdin=stdin))
+
+    def iter_output(self, args, stderr=DEVNULL, stdin=None):
+        """Yield the output lines of argument execution ignoring status code.
+
+        The process runs with the limits from ``set_limits``. It is killed,
+        and HandlerLimitExceeded raised, when it runs longer than
+        ``self.timeout`` seconds, outputs more than ``self.output_limit``
+        bytes, or is terminated for exceeding its CPU time limit. When given,
+        the ``stdin`` bytes are written to the process's standard input. The
+        CPU time of the process is added to the handler's timed stage.
+
+        """
+        slots = self._slots  # The limits may be set again meanwhile
+        if slots is not None:
+            slots.acquire()
+        process = None
+        timed_out = threading.Event()
         try:
-            return check_output(args, stderr=stderr).decode('utf-8')
-        except CalledProcessError as exc:
-            return exc.output.decode('utf-8')
+            process = Popen(args, stdin=None if stdin is None else PIPE,
+                            stdout=PIPE, stderr=stderr,
+                            start_new_session=True)
+            self._apply_limits(process.pid)
+            if stdin is not None:  # Write from a thread to not block output
+                writer = threading.Thread(target=self._write,
+                                          args=(process.stdin, stdin))
+                writer.daemon = True
+                writer.start()
+
+            def expire():
+                timed_out.set()
+                self._kill(process)
+
+            timer = threading.Timer(self.timeout, expire)
+            timer.daemon = True
+            timer.start()
+            size = 0
+            try:
+                for line in process.stdout:
+                    size += len(line)
+                    if size > self.output_limit:
+                        raise HandlerLimitExceeded(
+                            '{0} exceeded its output limit of {1} bytes'
+                            .format(self.name, self.output_limit), 'output')
+                    yield line.decode('utf-8', 'replace')
+                add_child_cpu(self._reap(process))
+            finally:
+                timer.cancel()
+        finally:
+            if process is not None:
+                if process.returncode is None:
+                    self._kill(process)
+                    add_child_cpu(self._reap(process))
+                process.stdout.close()
+            if slots is not None:
+                slots.release()
+        if timed_out.is_set():
+            raise HandlerLimitExceeded(
+                '{0} exceeded its time limit of {1} seconds'
+                .format(self.name, self.timeout), 'timeout')
+        if self.cpu_limit is not None and \
+                process.returncode in CPU_LIMIT_SIGNALS:
+            raise HandlerLimitExceeded(
+                '{0} exceeded its CPU limit of {1} seconds'
+                .format(self.name, self.cpu_limit), 'cpu')
 
     @classmethod
     def verify_version(cls, installed, exact=False):
@@ -77,26 +211,76 @@ class ExtHandler(object):
         """
         self._logger = logging.getLogger(__name__)
         self.name = type(self).__name__
+        self.set_limits()
+        self.stdin = False
         try:
             self.assert_usable()
             self._plugin_ready = True
         except HandlerNotReady as exc:
             if on_demand:
-                self._logger.warning('{0} is not ready: {1}'
-                                     .format(self.name, str(exc)))
+                self._logger.warning('%s is not ready: %s', self.name, exc)
             else:
                 raise
             self._plugin_ready = False
-        path = os.path.join(
-            CONFIG_DIR, 'handler_{0}.conf'.format(self.name.lower()))
-        self.config_file_path = path if os.path.isfile(path) else None
+        self.load_config_file()
+
+    def _apply_limits(self, pid):
+        """Apply the limits from ``set_limits`` to the running process ``pid``.
+
+        The limits are applied after the process is spawned, as a
+        ``preexec_fn`` is not safe to run in a threaded program. Resource
+        limits require ``resource.prlimit``, which is only available on Linux.
+
+        """
+        try:
+            if getattr(resource, 'prlimit', None) is not None:
+                for which, value in ((resource.RLIMIT_AS, self.memory_limit),
+                                     (resource.RLIMIT_CPU, self.cpu_limit),
+                                     (resource.RLIMIT_NOFILE,
+                                      self.open_files)):
+                    if value is None:
+                        continue
+                    hard = resource.getrlimit(which)[1]
+                    if which == resource.RLIMIT_CPU:
+                        # Send SIGXCPU first, and SIGKILL a second later
+                        soft, value = value, value + 1
+                    else:
+                        soft = value
+                    if hard != resource.RLIM_INFINITY:
+                        soft, value = min(soft, hard), min(value, hard)
+                    resource.prlimit(pid, which, (soft, value))
+            if self.niceness and hasattr(os, 'setpriority'):
+                os.setpriority(os.PRIO_PROCESS, pid, self.niceness +
+                               os.getpriority(os.PRIO_PROCESS, pid))
+        except OSError as exc:
+            if exc.errno != errno.ESRCH:  # Unless the process already exited
+                raise
+
+    def _regex_parse(self, binary_args, stderr=None, stdin=None, lines=None):
+        """Use the sublcasses RE value to parse the returned data.
 
-    def _regex_parse(self, binary_args, stderr=None):
-        """Use the sublcasses RE value to parse the returned data."""
+        The output is parsed as it is produced, ``PARSE_LINES`` lines at a
+        time. The last ``RE_LINES - 1`` lines following the final match of a
+        chunk are kept for the next one, as a match of ``RE`` may continue
+        there. Only the issues on ``lines`` are kept if given.
+
+        """
         retval = defaultdict(list)
-        for (lineno, msg) in self.RE.findall(self.execute(
-                [self.BINARY] + binary_args, stderr=stderr)):
-            retval[int(lineno)].append(msg)
+        output = self.iter_output([self.BINARY] + binary_args, stderr=stderr,
+                                  stdin=stdin)
+        carried = ''
+        for chunk in iter(lambda: list(islice(output, PARSE_LINES)), []):
+            text = carried + ''.join(chunk)
+            end = 0
+            for match in self.RE.finditer(text):
+                lineno, msg = match.groups()
+                lineno = int(lineno)
+                if lines is None or lineno in lines:
+                    retval[lineno].append(msg)
+                end = match.end()
+            if self.RE_LINES > 1:
+                carried = ''.join(
+                    text[end:].splitlines(True)[1 - self.RE_LINES:])
         return retval
 
     def assert_usable(self):
@@ -117,7 +301,15 @@ class ExtHandler(object):
                 raise HandlerException('{0} cannot be executed.'
                                        .format(self.BINARY))
             raise  # Unexpected and unhandled exception
-        self.verify_version(self.version_callback(version))
+        installed = self.version_callback(version)
+        self.verify_version(installed)
+        self.stdin = self.STDIN_VERSION is not None and \
+            parse_version(installed) >= parse_version(self.STDIN_VERSION)
+
+    def load_config_file(self):
+        """Use the handler's config file if it exists."""
+        path = self.config_path
+        self.config_file_path = path if os.path.isfile(path) else None
 
     def prepare_directory(self, temp_dir, repo, pr):
         """Perform any preprocessing before linting.
@@ -137,14 +329,16 @@ class ExtHandler(object):
                 self.assert_usable()
                 self._plugin_ready = True
             except HandlerNotReady as exc:
-                self._logger.warning('{0} is not ready: {1}'
-                                     .format(self.name, exc.message))
+                self._logger.warning('%s is not ready: %s', self.name,
+                                     exc.message)
                 return
 
-        self._prepare_directory(temp_dir, repo, pr)
+        with timed('prepare_directory', self.name), \
+                span('prepare_directory', handler=self.name):
+            self._prepare_directory(temp_dir, repo, pr)
         return
 
-    def process(self, filename):
+    def process(self, filename, contents=None, lines=None):
         """Return a dictionary mapping line numbers to errors.
 
         The value for each line number in the dictionary should be a list where
@@ -152,6 +346,10 @@ class ExtHandler(object):
         the line.
 
         :param filename: The filename to analyze.
+        :param contents: The bytes to analyze, piped to the binary as the
+            contents of ``filename`` instead of reading it. Only given when
+            ``self.stdin`` is true.
+        :param lines: The line numbers to return issues for, or None for all.
 
         """
         # This method should not be implemented by a subclass. Use _process
@@ -161,10 +359,40 @@ class ExtHandler(object):
                 self.assert_usable()
                 self._plugin_ready = True
             except HandlerNotReady as exc:
-                self._logger.warning('{0} is not ready: {1}'
-                                     .format(self.name, exc.message))
+                self._logger.warning('%s is not ready: %s', self.name,
+                                     exc.message)
                 return {}
-        return self._process(filename)
+        with timed('process', self.name), \
+                span('process', handler=self.name, file=filename):
+            try:
+                if contents is not None:
+                    return self._process_stdin(filename, contents, lines)
+                return self._process(filename, lines)
+            except Exception:
+                HANDLER_FAILURES.labels(self.name).inc()
+                raise
+
+    def set_limits(self, concurrency=None, cpu=None, memory=None,
+                   niceness=None, open_files=None, output=None, timeout=None):
+        """Set the resource limits applied to each execution of the binary.
+
+        :param concurrency: The maximum number of simultaneous executions.
+        :param cpu: The CPU time limit in seconds.
+        :param memory: The address space limit in bytes.
+        :param niceness: The increment to the niceness of the process.
+        :param open_files: The maximum number of open file descriptors.
+        :param output: The output limit in bytes (default ``OUTPUT_LIMIT``).
+        :param timeout: The wall clock limit in seconds (default ``TIMEOUT``).
+
+        """
+        self._slots = None if concurrency is None \
+            else threading.BoundedSemaphore(concurrency)
+        self.cpu_limit = cpu
+        self.memory_limit = memory
+        self.niceness = niceness
+        self.open_files = open_files
+        self.output_limit = self.OUTPUT_LIMIT if output is None else output
+        self.timeout = self.TIMEOUT if timeout is None else timeout
 
     def version_callback(self, version):
         """Return a parsed version string for the binary version."""
@@ -177,26 +405,39 @@ class ESLint(ExtHandler):
     BINARY = 'eslint'
     BINARY_VERSION = '1.1.0'
     EXTENSIONS = ['.js', '.jsx']
+    STDIN_VERSION = '2.0.0'
 
-    def _prepare_directory(self, temp_dir, repo, pr):
-        return
-
-    def _process(self, filename):
+    def _command(self):
         command = [self.BINARY, '--format', 'json']
         config_path = self.config_file_path
         if config_path:
             command += ['--config', config_path]
+        return command
 
-        data = json.loads(self.execute(command + [filename]))[0]
+    def _parse(self, output, lines):
+        data = json.loads(output)[0]
         retval = defaultdict(list)
 
         for offense in data['messages']:
+            if lines is not None and offense['line'] not in lines:
+                continue
             message = offense['message']
             if offense.get('ruleId'):
                 message += ' ({})'.format(offense['ruleId'])
             retval[offense['line']].append(message)
         return retval
 
+    def _prepare_directory(self, temp_dir, repo, pr):
+        return
+
+    def _process(self, filename, lines=None):
+        return self._parse(self.execute(self._command() + [filename]), lines)
+
+    def _process_stdin(self, filename, contents, lines=None):
+        return self._parse(self.execute(
+            self._command() + ['--stdin', '--stdin-filename', filename],
+            stdin=contents), lines)
+
     def version_callback(self, version):
         """Remove the 'v' prefix and trailing space."""
         return version[1:].strip()
@@ -209,14 +450,22 @@ class Flake8(ExtHandler):
     BINARY_VERSION = '2.4.1'
     EXTENSIONS = ['.py']
     RE = re.compile(r'[^:]+:(\d+):([^\n]+)\n')
+    STDIN_VERSION = '3.0.0'
 
     def _prepare_directory(self, temp_dir, repo, pr):
         return
 
-    def _process(self, filename):
+    def _process(self, filename, lines=None):
         config_path = self.config_file_path
         command = ['--config', config_path] if config_path else []
-        return self._regex_parse(command + [filename])
+        return self._regex_parse(command + [filename], lines=lines)
+
+    def _process_stdin(self, filename, contents, lines=None):
+        config_path = self.config_file_path
+        command = ['--config', config_path] if config_path else []
+        return self._regex_parse(
+            command + ['--stdin-display-name', filename, '-'], stdin=contents,
+            lines=lines)
 
     def version_callback(self, version):
         """Remove the extra version information."""
@@ -234,12 +483,12 @@ class JSXHint(ExtHandler):
     def _prepare_directory(self, temp_dir, repo, pr):
         return
 
-    def _process(self, filename):
+    def _process(self, filename, lines=None):
         command = ['--reporter', 'unix']
         config_path = self.config_file_path
         if config_path:
             command += ['--config', config_path]
-        return self._regex_parse(command + [filename])
+        return self._regex_parse(command + [filename], lines=lines)
 
     def version_callback(self, version):
         """Return a parsed version string for the binary version."""
@@ -253,12 +502,13 @@ class Pep257(ExtHandler):
     BINARY_VERSION = '0.5.0'
     EXTENSIONS = ['.py']
     RE = re.compile(r'[^:]+:(\d+)[^\n]+\n\s+([^\n]+)\n')
+    RE_LINES = 2
 
     def _prepare_directory(self, temp_dir, repo, pr):
         return
 
-    def _process(self, filename):
-        return self._regex_parse([filename], stderr=STDOUT)
+    def _process(self, filename, lines=None):
+        return self._regex_parse([filename], stderr=STDOUT, lines=lines)
 
 
 class Rubocop(ExtHandler):
@@ -269,6 +519,8 @@ class Rubocop(ExtHandler):
     EXTENSIONS = ['.rb']
 
     def _prepare_directory(self, temp_dir, repo, pr):
+        if repo is None:  # Reviewing locally, use the handler config file
+            return
         rubocop_yaml_url = "{}/contents/.rubocop.yml?ref={}".format(repo.url, pr.head.ref)  # noqa: E501
         response = repo._get(rubocop_yaml_url).json()
         file_contents = b64decode(response["content"]).decode('utf-8')
@@ -278,7 +530,7 @@ class Rubocop(ExtHandler):
             fp.write(file_contents)
         return
 
-    def _process(self, filename):
+    def _process(self, filename, lines=None):
         command = [self.BINARY, '-f', 'j']
         config_path = self.config_file_path
         if config_path:
@@ -287,7 +539,9 @@ class Rubocop(ExtHandler):
         data = json.loads(self.execute(command + [filename]))
         retval = defaultdict(list)
         for offense in data.get('files', [{}])[0].get('offenses', []):
-            retval[offense['location']['line']].append(offense['message'])
+            line = offense['location']['line']
+            if lines is None or line in lines:
+                retval[line].append(offense['message'])
         return retval
 
 
@@ -297,17 +551,17 @@ class SCSSLint(ExtHandler):
     BINARY = 'scss-lint'
     BINARY_VERSION = '0.43.2'
     EXTENSIONS = ['.css', '.scss']
+    STDIN_VERSION = '0.45.0'
 
-    def _prepare_directory(self, temp_dir, repo, pr):
-        return
-
-    def _process(self, filename):
+    def _command(self):
         command = [self.BINARY, '-f', 'JSON']
         config_path = self.config_file_path
         if config_path:
             command += ['-c', config_path]
+        return command
 
-        data = json.loads(self.execute(command + [filename]))
+    def _parse(self, output, lines):
+        data = json.loads(output)
 
         retval = defaultdict(list)
         if not data.values():
@@ -319,12 +573,25 @@ class SCSSLint(ExtHandler):
                     "(line {line}, column {column})"
                 ).format(**offense)
                 raise HandlerException(exception_message)
+            if lines is not None and offense['line'] not in lines:
+                continue
             retval[offense['line']].append(
                 '{linter}: {reason}'.format(**offense)
             )
 
         return retval
 
+    def _prepare_directory(self, temp_dir, repo, pr):
+        return
+
+    def _process(self, filename, lines=None):
+        return self._parse(self.execute(self._command() + [filename]), lines)
+
+    def _process_stdin(self, filename, contents, lines=None):
+        return self._parse(self.execute(
+            self._command() + ['--stdin-file-path', filename],
+            stdin=contents), lines)
+
     def version_callback(self, version):
         """
         Return a parsed version string for the binary version.
@@ -1,15 +1,24 @@
 """Helper methods and classes."""
 
+try:
+    from urllib.parse import urlparse  # PY3
+except ImportError:
+    from urlparse import urlparse  # PY2
+
 from github3 import GitHub
 from github3.exceptions import GitHubError
 import os
 import sys
-from .const import NUMBER_RE, CONFIG_DIR
+from .const import (CONFIG_DIR, HUNK_RE, NUMBER_RE, QUOTED_ESCAPE_RE,
+                    QUOTED_PATH_RE, SHA_RE)
 from .exceptions import FarcyException
 
 if sys.version_info >= (3, 0):
     basestring = str
 
+C_ESCAPES = {b'a': b'\a', b'b': b'\b', b'f': b'\f', b'n': b'\n', b'r': b'\r',
+             b't': b'\t', b'v': b'\v'}
+
 
 def added_lines(patch):
     """Return a mapping of added line numbers to the patch line numbers."""
@@ -32,6 +41,113 @@ def added_lines(patch):
     return added
 
 
+def api_endpoint(method, url):
+    """Return a string identifying the GitHub API endpoint of a request.
+
+    Repository owners and names, numbers, commit shas and file paths are
+    replaced by placeholders so that requests to the same endpoint compare
+    equal.
+
+    """
+    parts = urlparse(url).path.strip('/').split('/')
+    if len(parts) >= 3 and parts[0] == 'repos':
+        parts[1:3] = [':owner', ':repo']
+        if 'contents' in parts:
+            parts[parts.index('contents') + 1:] = [':path']
+    for index, part in enumerate(parts):
+        if part.isdigit():
+            parts[index] = ':number'
+        elif SHA_RE.match(part):
+            parts[index] = ':sha'
+    return '{0} /{1}'.format(method, '/'.join(parts))
+
+
+def decode_lines(chunks, encoding='utf-8'):
+    r"""Yield decoded lines from an iterable of byte chunks.
+
+    Lines are split only on ``\\n`` so that carriage returns within the
+    content are preserved.
+
+    """
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.decode(encoding, 'replace')
+    if pending:
+        yield pending.decode(encoding, 'replace')
+
+
+def diff_files(lines):
+    """Yield (filename, status, patch) tuples from the lines of a unified diff.
+
+    Each status and patch match the ``status`` and ``patch`` attributes
+    GitHub provides for a pull request file. The status is one of
+    ``added``, ``modified``, ``removed`` or ``renamed``, and the patch is the
+    file's hunks without the file headers. Files without any hunks, such as
+    binary files, have a patch of None. Filenames quoted by git are unquoted.
+
+    """
+    filename = None
+    status = 'modified'
+    patch = []
+    old = new = 0  # The number of lines remaining in the current hunk
+    for line in lines:
+        if old > 0 or new > 0:
+            if line.startswith('-'):
+                old -= 1
+            elif line.startswith('+'):
+                new -= 1
+            elif not line.startswith('\\'):
+                line = line or ' '  # Restore stripped context lines
+                old -= 1
+                new -= 1
+            patch.append(line)
+        elif line.startswith('diff --git '):
+            if filename is not None:
+                yield filename, status, '\n'.join(patch) if patch else None
+            names = line[11:]
+            if names.endswith('"'):
+                filename = unquote_path(
+                    QUOTED_PATH_RE.search(names).group(0))[2:]
+            else:  # Both names are equal unless renamed
+                filename = names[(len(names) + 1) // 2 + 2:]
+            status = 'modified'
+            patch = []
+        elif line.startswith('@@'):
+            match = HUNK_RE.match(line)
+            old = int(match.group(1) or 1)
+            new = int(match.group(2) or 1)
+            patch.append(line)
+        elif line.startswith('\\') and patch:
+            patch.append(line)
+        elif line.startswith('new file mode '):
+            status = 'added'
+        elif line.startswith('deleted file mode '):
+            status = 'removed'
+        elif line.startswith('rename to '):
+            filename = unquote_path(line[10:])
+            status = 'renamed'
+        elif line.startswith('+++ '):
+            # Names containing spaces are followed by a tab
+            name = unquote_path(line[4:].rstrip('\t'))
+            if name.startswith('b/'):
+                filename = name[2:]
+    if filename is not None:
+        yield filename, status, '\n'.join(patch) if patch else None
+
+
+def diff_patches(lines):
+    """Yield (filename, patch) tuples from the lines of a unified diff.
+
+    See ``diff_files`` for the format of the patches.
+
+    """
+    for filename, _, patch in diff_files(lines):
+        yield filename, patch
+
+
 def ensure_config_dir():
     """Ensure Farcy config dir exists."""
     if not os.path.isdir(CONFIG_DIR):
@@ -118,6 +234,25 @@ def prompt(msg):
     return sys.stdin.readline().strip()
 
 
+def unquote_path(path):
+    r"""Return ``path`` without the C-style quotes git may add to it.
+
+    Git quotes paths containing special characters, and escapes the UTF-8
+    bytes of non-ASCII characters in octal, e.g., ``"\303\274.py"``.
+
+    """
+    if len(path) < 2 or not path.startswith('"') or not path.endswith('"'):
+        return path
+
+    def unescape(match):
+        escape = match.group(1)
+        if escape in b'01234567' or len(escape) > 1:  # An octal byte
+            return bytes(bytearray([int(escape, 8) & 0xff]))
+        return C_ESCAPES.get(escape, escape)
+    return QUOTED_ESCAPE_RE.sub(unescape, path[1:-1].encode('utf-8')) \
+        .decode('utf-8', 'replace')
+
+
 def raise_unexpected(code):
     """Called from with in an except block.
 
@@ -0,0 +1,170 @@
+"""A persistent cache of GitHub API reads revalidated by conditional requests.
+
+GitHub does not count ``304 Not Modified`` responses against the rate limit,
+so cached responses are revalidated on every read with their ``ETag`` or
+``Last-Modified`` header rather than expiring.
+
+"""
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+import json
+import sqlite3
+import threading
+import time
+from .helpers import api_endpoint
+from .metrics import HTTP_CACHE_REQUESTS
+
+try:
+    from urllib.parse import parse_qs, urlencode, urlparse, urlunparse  # PY3
+except ImportError:
+    from urllib import urlencode  # PY2
+    from urlparse import parse_qs, urlparse, urlunparse  # PY2
+
+CONDITIONAL_HEADERS = ('If-Modified-Since', 'If-None-Match')
+MAX_ENTRIES = 50000
+MAX_PER_PAGE = 100
+# Headers describing the encoded body, which is stored decoded
+OMITTED_HEADERS = ('Content-Encoding', 'Content-Length', 'Transfer-Encoding')
+PAGINATED_ENDPOINTS = {
+    'GET /repos/:owner/:repo/events',
+    'GET /repos/:owner/:repo/pulls',
+    'GET /repos/:owner/:repo/pulls/:number/comments',
+    'GET /repos/:owner/:repo/pulls/:number/commits',
+    'GET /repos/:owner/:repo/pulls/:number/files'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+def with_max_page_size(url):
+    """Return ``url`` requesting the largest page size of its listing.
+
+    URLs that are not of a paginated listing, or that set their own page
+    size, are returned unchanged.
+
+    """
+    if api_endpoint('GET', url) not in PAGINATED_ENDPOINTS:
+        return url
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    if 'per_page' in query:
+        return url
+    query['per_page'] = [str(MAX_PER_PAGE)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+class CachingAdapter(HTTPAdapter):
+    """A requests transport adapter revalidating GET responses in a cache.
+
+    Requests that are streamed, or that carry their own conditional headers,
+    bypass the cache. Responses served from the cache have a true
+    ``from_cache`` attribute.
+
+    """
+
+    def __init__(self, cache, **kwargs):
+        """Initialize a CachingAdapter object.
+
+        :param cache: The HttpCache to store responses in.
+
+        """
+        super(CachingAdapter, self).__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        """Send ``request``, revalidating a cached response when present."""
+        if request.method != 'GET':
+            return super(CachingAdapter, self).send(request, stream=stream,
+                                                    **kwargs)
+        request.url = with_max_page_size(request.url)
+        if stream or any(header in request.headers
+                         for header in CONDITIONAL_HEADERS):
+            HTTP_CACHE_REQUESTS.labels('bypass').inc()
+            return super(CachingAdapter, self).send(request, stream=stream,
+                                                    **kwargs)
+
+        key = '{0} {1}'.format(request.headers.get('Accept', ''), request.url)
+        cached = self.cache.get(key)
+        if cached is not None:
+            headers, body = cached
+            if 'ETag' in headers:
+                request.headers['If-None-Match'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+        response = super(CachingAdapter, self).send(request, stream=stream,
+                                                    **kwargs)
+        if cached is not None and response.status_code == 304:
+            HTTP_CACHE_REQUESTS.labels('hit').inc()
+            response.content  # Release the connection
+            headers.update(response.headers)
+            for header in OMITTED_HEADERS:
+                headers.pop(header, None)
+            response._content = body
+            response.from_cache = True
+            response.headers = headers
+            response.status_code = 200
+            return response
+
+        HTTP_CACHE_REQUESTS.labels('miss').inc()
+        if response.status_code == 200 and (
+                'ETag' in response.headers or
+                'Last-Modified' in response.headers):
+            self.cache.set(key, response.headers, response.content)
+        return response
+
+
+class HttpCache(object):
+    """Stores responses by key in a SQLite database shared by threads."""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        """Open, and create when necessary, the cache database at ``path``.
+
+        The least recently used entries beyond ``max_entries`` are removed.
+
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(SCHEMA)
+            self._connection.execute(
+                'DELETE FROM responses WHERE key NOT IN (SELECT key FROM '
+                'responses ORDER BY used DESC LIMIT ?)', (max_entries,))
+
+    def close(self):
+        """Close the cache database."""
+        with self._lock:
+            self._connection.close()
+
+    def get(self, key):
+        """Return a tuple containing (headers, body) of ``key``, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT headers, body FROM responses WHERE key = ?',
+                (key,)).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    'UPDATE responses SET used = ? WHERE key = ?',
+                    (time.time(), key))
+        if row is None:
+            return None
+        return CaseInsensitiveDict(json.loads(row[0])), bytes(row[1])
+
+    def set(self, key, headers, body):
+        """Store the response ``headers`` and decoded ``body`` at ``key``."""
+        headers = {name: value for name, value in headers.items()
+                   if name not in OMITTED_HEADERS}
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(headers), sqlite3.Binary(body),
+                 time.time()))
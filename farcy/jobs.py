@@ -0,0 +1,172 @@
+"""A durable queue of pull request reviews stored in SQLite."""
+
+import errno
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+FINAL_STATES = ('error', 'failure', 'success', 'superseded')
+# Seconds after which a running job of a process on another host is presumed
+# abandoned, as whether that process is alive cannot be checked
+LEASE_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL,
+    owner TEXT,
+    PRIMARY KEY (repository, number, sha)
+)
+"""
+
+
+def process_alive(pid):
+    """Return whether or not a process ``pid`` exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except OSError as exc:
+        return exc.errno == errno.EPERM  # Alive, but owned by another user
+    return True
+
+
+class ReviewQueue(object):
+    """Records reviews of (repository, number, sha) jobs as they progress.
+
+    A job is ``pending`` until it is started, ``running`` during its review,
+    and then has the final status of the review, or ``superseded`` when a
+    newer commit was reviewed instead. A job whose review failed is released
+    back to ``pending``. Each job records the ``host:pid`` owner that last
+    updated it, so that processes sharing the queue only take over the
+    running jobs of processes that are gone. The queue can be shared by
+    threads.
+
+    """
+
+    def __init__(self, path, owner=None):
+        """Open, and create when necessary, the queue database at ``path``.
+
+        :param path: The path of the SQLite database.
+        :param owner: The ``host:pid`` recorded for the jobs of this queue,
+            by default the current process.
+
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None)
+        self.owner = owner or '{0}:{1}'.format(socket.gethostname(),
+                                               os.getpid())
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(SCHEMA)
+            columns = [row[1] for row in self._connection.execute(
+                'PRAGMA table_info(reviews)')]
+            if 'owner' not in columns:  # Created before jobs had owners
+                self._connection.execute(
+                    'ALTER TABLE reviews ADD COLUMN owner TEXT')
+
+    def _is_stale(self, owner, updated):
+        """Return whether or not a running job was abandoned by its owner."""
+        host, _, pid = (owner or '').rpartition(':')
+        if not pid.isdigit():  # Started before jobs had owners
+            return True
+        if host == self.owner.rpartition(':')[0]:
+            return not process_alive(int(pid))
+        return time.time() - updated > LEASE_SECONDS
+
+    def _set_state(self, repository, number, sha, state):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?)',
+                (repository, number, sha, state, time.time(), self.owner))
+
+    def add(self, repository, number, sha):
+        """Add a pending job unless the job is already known."""
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR IGNORE INTO reviews VALUES (?, ?, ?, ?, ?, ?)',
+                (repository, number, sha, 'pending', time.time(), self.owner))
+
+    def claim(self, repository, number, sha):
+        """Start the job unless it is running or has a final state.
+
+        Return whether or not the job was started. The check and the update
+        are a single transaction, so only one of the threads or processes
+        sharing the queue starts a job.
+
+        """
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                updated = self._connection.execute(
+                    "UPDATE reviews SET state = 'running', updated = ?, "
+                    "owner = ? WHERE repository = ? AND number = ? AND "
+                    "sha = ? AND state = 'pending'",
+                    (time.time(), self.owner, repository, number,
+                     sha)).rowcount
+                if not updated:
+                    updated = self._connection.execute(
+                        "INSERT OR IGNORE INTO reviews VALUES "
+                        "(?, ?, ?, 'running', ?, ?)",
+                        (repository, number, sha, time.time(),
+                         self.owner)).rowcount
+            finally:
+                self._connection.execute('COMMIT')
+        return updated == 1
+
+    def close(self):
+        """Close the queue database."""
+        with self._lock:
+            self._connection.close()
+
+    def finish(self, repository, number, sha, state):
+        """Record the final ``state`` of a job."""
+        assert state in FINAL_STATES, state
+        self._set_state(repository, number, sha, state)
+
+    def is_reviewed(self, repository, number, sha):
+        """Return whether or not the job has a final state."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT state FROM reviews WHERE repository = ? AND '
+                'number = ? AND sha = ?', (repository, number, sha)).fetchone()
+        return row is not None and row[0] in FINAL_STATES
+
+    def release(self, repository, number, sha):
+        """Return the job to the pending state so that it can be claimed."""
+        self._set_state(repository, number, sha, 'pending')
+
+    def start(self, repository, number, sha):
+        """Record that the review of a job is running."""
+        self._set_state(repository, number, sha, 'running')
+
+    def unfinished(self, repository):
+        """Return the pending jobs of ``repository``.
+
+        Running jobs left over from an interrupted process, whose owner is no
+        longer running on this host or has not updated them within
+        ``LEASE_SECONDS`` on another host, are returned to the pending state
+        first. The running jobs of live processes are left to them.
+
+        """
+        with self._lock:
+            running = self._connection.execute(
+                "SELECT number, sha, owner, updated FROM reviews WHERE "
+                "repository = ? AND state = 'running'",
+                (repository,)).fetchall()
+            for number, sha, owner, updated in running:
+                if self._is_stale(owner, updated):
+                    self._connection.execute(
+                        "UPDATE reviews SET state = 'pending' WHERE "
+                        "repository = ? AND number = ? AND sha = ? AND "
+                        "state = 'running' AND updated = ?",
+                        (repository, number, sha, updated))
+            return self._connection.execute(
+                "SELECT repository, number, sha FROM reviews WHERE "
+                "repository = ? AND state = 'pending' ORDER BY updated",
+                (repository,)).fetchall()
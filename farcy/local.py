@@ -0,0 +1,161 @@
+"""Review a range of commits of a local git repository without GitHub.
+
+The changes are diffed with git and the files read with ``git cat-file``, so
+no GitHub session is created and no requests are made. The issues the
+handlers find on the changed lines are grouped as they would be on GitHub,
+and printed rather than commented.
+
+"""
+
+from __future__ import print_function
+from collections import Counter, OrderedDict
+from subprocess import CalledProcessError, STDOUT, check_output
+import sys
+from . import Farcy
+from .exceptions import FarcyException
+from .helpers import diff_patches
+from .mirror import BlobReader
+from .objects import DiffFile, ErrorTracker, MirroredContents
+
+# The exit status of ``farcy local`` by the state of the review. A review
+# that could not lint a file fails like an invalid range.
+EXIT_STATUSES = {'error': 2, 'failure': 1, 'success': 0}
+
+# Pull request file statuses by the first letter of git's statuses
+STATUSES = {'A': 'added', 'C': 'added', 'D': 'removed', 'R': 'renamed'}
+
+
+def git(*args):
+    """Run git in the current directory and return its output.
+
+    Paths containing non-ASCII characters are output as is rather than
+    quoted.
+
+    """
+    try:
+        return check_output(('git', '-c', 'core.quotepath=off') + args,
+                            stderr=STDOUT).decode('utf-8', 'replace')
+    except (CalledProcessError, OSError) as exc:
+        raise FarcyException('git {0} failed: {1}'.format(
+            args[0], getattr(exc, 'output', b'').decode('utf-8').strip()
+            or exc))
+
+
+def split_range(revisions):
+    """Return a tuple containing (base, head) of ``BASE..HEAD``.
+
+    ``BASE...HEAD`` is accepted as well, and the head defaults to ``HEAD``.
+
+    """
+    separator = '...' if '...' in revisions else '..'
+    base, _, head = revisions.partition(separator)
+    return base or 'HEAD', head or 'HEAD'
+
+
+class LocalFile(DiffFile):
+    """A changed file of a local range read with ``git cat-file``."""
+
+    def __init__(self, filename, patch, status, reader, sha):
+        """Initialize a LocalFile object.
+
+        :param filename: The path of the file in the repository.
+        :param patch: The file's hunks, or None.
+        :param status: The pull request status of the file, e.g., ``added``.
+        :param reader: The BlobReader of the repository.
+        :param sha: The commit to read the file from.
+
+        """
+        super(LocalFile, self).__init__(filename, patch, status, None, sha)
+        self._reader = reader
+
+    def contents(self):
+        """Return an object whose ``decoded`` attribute is the file's bytes."""
+        return MirroredContents(self._reader.read(self._sha, self.filename)
+                                or b'')
+
+
+class LocalReview(Farcy):
+    """Reviews the changes between two commits of the current repository."""
+
+    def __init__(self, config):
+        """Initialize a LocalReview object. No GitHub session is created."""
+        self.config = config
+        self._configure_logging()
+        self._load_handlers()
+        self._gitattributes_cache = OrderedDict()
+        self._reader = None
+        self.repo = None
+
+    def _files(self, revisions, sha):
+        """Yield a LocalFile for each file changed in ``revisions``.
+
+        The filenames are read from ``git diff --name-status -z``, which
+        neither quotes nor escapes them, and the patches of the diff are
+        looked up by filename. A file whose type changed has two patches, a
+        removal and an addition, of which the addition is linted.
+
+        """
+        changes = []
+        fields = git('diff', '--name-status', '-M', '-z',
+                     revisions).split('\0')
+        index = 0
+        while index < len(fields) - 1:
+            status = fields[index]
+            index += 3 if status[:1] in 'CR' else 2
+            changes.append((fields[index - 1],
+                            STATUSES.get(status[:1], 'modified')))
+        diff = git('diff', '--no-color', '--no-ext-diff', '-M',
+                   '--src-prefix=a/', '--dst-prefix=b/', revisions)
+        patches = dict(diff_patches(diff.split('\n')))
+        for filename, status in changes:
+            yield LocalFile(filename, patches.get(filename), status,
+                            self._reader, sha)
+
+    def review(self, revisions, out=None):
+        """Print the issues found on the lines changed in ``revisions``.
+
+        The issues are printed to ``out``, by default standard output. Return
+        the state a pull request's status would have: ``success``,
+        ``failure`` when issues are found, or ``error`` when linting a file
+        failed.
+
+        """
+        out = out or sys.stdout
+        sha = git('rev-parse', '--verify',
+                  split_range(revisions)[1] + '^{commit}').strip()
+        errors = ErrorTracker([], self.config.comment_group_threshold)
+        exception = False
+        stats = Counter()
+        self._reader = BlobReader(git('rev-parse', '--git-dir').strip())
+        try:
+            files = []
+            for pfile in self._files(revisions, sha):
+                added = self._compute_pfile_stats(pfile, stats, sha,
+                                                  self._reader)
+                if added is not None:
+                    files.append((pfile, added))
+            for pfile, added, file_issues in self._lint_files(files, None,
+                                                              stats):
+                if file_issues is None:
+                    exception = True
+                    continue
+                for line, messages in file_issues.items():
+                    if line in added:  # Skip unadded/unmodified lines.
+                        for message in messages:
+                            errors.track(message, pfile.filename,
+                                         added[line])
+                lines = {position: line for line, position in added.items()}
+                for position, violations in errors.errors(pfile.filename):
+                    print('{0}:{1}:'.format(pfile.filename, lines[position]),
+                          file=out)
+                    for violation in violations:
+                        print('* {0}'.format(violation), file=out)
+        finally:
+            self._reader.close()
+        self.costs.save()
+
+        for key, count in sorted(stats.items()):
+            self.log.debug('%16s: %s', key, count)
+        state, message = self._get_state(errors.new_issue_count, exception)
+        print(message, file=sys.stderr)
+        return state
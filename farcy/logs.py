@@ -0,0 +1,88 @@
+"""Log records through a queue emptied by a listener thread.
+
+The logging calls on the review path only put the record on a queue. Its
+message is formatted, optionally as JSON, and written by a listener thread,
+so that neither the formatting nor a slow stream delays reviews. Arguments
+of a message are formatted when it is written, so they must not be modified
+after the logging call.
+
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import threading
+
+try:
+    from queue import Queue  # PY3
+except ImportError:
+    from Queue import Queue  # PY2
+
+DATE_FORMAT = '%Y/%m/%d %H:%M:%S'
+FORMAT = '%(asctime)s %(levelname)8s %(message)s'
+
+_LISTENERS = {}  # Logger names mapped to (QueueHandler, QueueListener)
+_LOCK = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a JSON object on a single line."""
+
+    def format(self, record):
+        """Return the JSON object of the record."""
+        data = {'level': record.levelname, 'logger': record.name,
+                'message': record.getMessage(),
+                'time': self.formatTime(record, DATE_FORMAT)}
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, sort_keys=True)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Puts records on the queue without formatting their messages."""
+
+    def prepare(self, record):
+        """Return the record, as it is formatted by the listener thread."""
+        return record
+
+
+def configure(logger, json_output=False, stream=None):
+    """Write the records of ``logger`` to ``stream`` from a listener thread.
+
+    :param logger: The logger to add the queue handler to.
+    :param json_output: Write the records as JSON objects.
+    :param stream: The stream to write to, by default standard error.
+
+    The handler and listener added by an earlier call for the same logger are
+    replaced. Return the started QueueListener.
+
+    """
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if json_output
+                         else logging.Formatter(FORMAT, DATE_FORMAT))
+    queue = Queue()
+    listener = QueueListener(queue, handler)
+    queue_handler = LazyQueueHandler(queue)
+    with _LOCK:
+        stop(logger)
+        _LISTENERS[logger.name] = queue_handler, listener
+        logger.addHandler(queue_handler)
+        listener.start()
+    return listener
+
+
+def stop(logger):
+    """Write the queued records of ``logger`` and remove its queue handler."""
+    queue_handler, listener = _LISTENERS.pop(logger.name, (None, None))
+    if listener is not None:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+
+
+@atexit.register
+def stop_all():
+    """Write the queued records of every configured logger."""
+    with _LOCK:
+        for name in list(_LISTENERS):
+            stop(logging.getLogger(name))
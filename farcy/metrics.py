@@ -0,0 +1,281 @@
+"""Runtime metrics exposed in the Prometheus text exposition format."""
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer  # PY3
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # PY2
+    from SocketServer import ThreadingMixIn
+
+from bisect import bisect_left
+import threading
+from .helpers import api_endpoint
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{{{0}}}'.format(','.join('{0}="{1}"'.format(name, _escape(value))
+                                     for name, value in pairs))
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Value(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield ('', None, self.value)
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+
+class Metric(object):
+    """A metric with a single value that may be partitioned by labels.
+
+    Subclasses of other types override ``_child`` to create the value of each
+    label partition.
+
+    """
+
+    TYPE = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        """Initialize a Metric.
+
+        :param name: The metric name.
+        :param documentation: The help text of the metric.
+        :param labels: The names of the labels partitioning the metric.
+
+        """
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.name = name
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _child(self, values):
+        return _Value()
+
+    def labels(self, *values):
+        """Return the child metric for the given label values."""
+        values = tuple(str(value) for value in values)
+        if len(values) != len(self.label_names):
+            raise ValueError('{0} expects {1} label value(s)'
+                             .format(self.name, len(self.label_names)))
+        with self._lock:
+            child = self._values.get(values)
+            if child is None:
+                child = self._values[values] = self._child(values)
+        return child
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples for the exposition."""
+        with self._lock:
+            children = sorted(self._values.items())
+        for values, child in children:
+            for suffix, extra, value in child.samples():
+                yield (suffix, _format_labels(self.label_names, values,
+                                              extra), value)
+
+
+class Counter(Metric):
+    """A metric that only increases."""
+
+    TYPE = 'counter'
+
+    def inc(self, amount=1):
+        """Increment the unlabeled counter."""
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    """A metric that can be set to any value."""
+
+    TYPE = 'gauge'
+
+    def set(self, value):
+        """Set the unlabeled gauge to ``value``."""
+        self.labels().set(value)
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.sum += value
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            yield ('_bucket', ('le', _format_value(bound)), cumulative)
+        yield ('_sum', None, total)
+        yield ('_count', None, cumulative)
+
+
+class Histogram(Metric):
+    """A metric that counts observations in cumulative buckets."""
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=None):
+        """Initialize a Histogram.
+
+        :param buckets: The upper bounds of the buckets. A +Inf bucket is
+            always added.
+
+        """
+        super(Histogram, self).__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS)) + (
+            float('inf'),)
+
+    def _child(self, values):
+        return _Histogram(self.buckets)
+
+    def observe(self, value):
+        """Observe ``value`` in the unlabeled histogram."""
+        self.labels().observe(value)
+
+
+class Registry(object):
+    """A collection of metrics."""
+
+    def __init__(self):
+        """Initialize an empty Registry."""
+        self.metrics = []
+
+    def add(self, metric):
+        """Add ``metric`` to the registry and return it."""
+        self.metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append('# HELP {0} {1}'.format(metric.name,
+                                                 metric.documentation))
+            lines.append('# TYPE {0} {1}'.format(metric.name, metric.TYPE))
+            for suffix, labels, value in metric.samples():
+                lines.append('{0}{1}{2} {3}'.format(
+                    metric.name, suffix, labels, _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+API_CALLS = REGISTRY.add(Counter(
+    'farcy_github_api_calls_total', 'GitHub API calls by endpoint.',
+    ['endpoint']))
+EVENTS = REGISTRY.add(Counter(
+    'farcy_events_total', 'Repository events seen by type.', ['type']))
+EVENT_QUEUE_DEPTH = REGISTRY.add(Gauge(
+    'farcy_event_queue_depth', 'Fetched events waiting to be handled.'))
+HTTP_CACHE_REQUESTS = REGISTRY.add(Counter(
+    'farcy_http_cache_requests_total',
+    'GitHub API reads by HTTP cache result (hit, miss or bypass).',
+    ['result']))
+HANDLER_FAILURES = REGISTRY.add(Counter(
+    'farcy_handler_failures_total', 'Handler invocations that failed.',
+    ['handler']))
+HANDLER_SECONDS = REGISTRY.add(Histogram(
+    'farcy_handler_duration_seconds', 'Handler invocation latency.',
+    ['handler', 'stage']))
+RATE_LIMIT_REMAINING = REGISTRY.add(Gauge(
+    'farcy_github_rate_limit_remaining',
+    'GitHub API requests remaining in the current rate limit window.'))
+REVIEW_SECONDS = REGISTRY.add(Histogram(
+    'farcy_review_duration_seconds', 'Pull request review latency.'))
+REVIEW_STATS = REGISTRY.add(Counter(
+    'farcy_review_stats_total', 'Sum of the review statistics by name.',
+    ['stat']))
+REVIEWS_FINISHED = REGISTRY.add(Counter(
+    'farcy_reviews_finished_total', 'Pull request reviews finished by state.',
+    ['state']))
+REVIEWS_STARTED = REGISTRY.add(Counter(
+    'farcy_reviews_started_total', 'Pull request reviews started.'))
+
+
+def observe_api_response(response, *args, **kwargs):
+    """Record a GitHub API response.
+
+    This function is installed as a ``requests`` response hook.
+
+    """
+    API_CALLS.labels(api_endpoint(response.request.method,
+                                  response.request.url)).inc()
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None:
+        RATE_LIMIT_REMAINING.set(int(remaining))
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serve the metrics of the server's registry."""
+
+    def do_GET(self):
+        """Respond with the metrics exposition."""
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Do not log requests."""
+        return
+
+
+class MetricsServer(ThreadingMixIn, HTTPServer):
+    """An HTTP server exposing the metrics of a registry."""
+
+    daemon_threads = True
+
+    def __init__(self, address, registry=REGISTRY):
+        """Initialize a MetricsServer listening on ``address``."""
+        HTTPServer.__init__(self, address, MetricsRequestHandler)
+        self.registry = registry
+
+
+def start_server(port, host='127.0.0.1', registry=REGISTRY):
+    """Serve the metrics from a daemon thread and return the server."""
+    server = MetricsServer((host, port), registry)
+    thread = threading.Thread(target=server.serve_forever,
+                              name='farcy-metrics')
+    thread.daemon = True
+    thread.start()
+    return server
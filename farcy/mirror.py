@@ -0,0 +1,146 @@
+"""Local bare mirrors of the monitored repositories.
+
+A mirror lets Farcy read the changed files of a pull request with a single
+``git cat-file --batch`` process rather than one contents API call per file.
+
+"""
+
+from subprocess import (CalledProcessError, PIPE, Popen, STDOUT,
+                        TimeoutExpired, check_output)
+import os
+import threading
+from .exceptions import MirrorException
+
+PULL_REFSPEC = '+refs/pull/{0}/head:refs/pull/{0}/head'
+REFSPECS = ('+refs/heads/*:refs/heads/*', '+refs/pull/*/head:refs/pull/*/head')
+
+
+class BlobReader(object):
+    """Read files from a repository through ``git cat-file --batch``."""
+
+    def __init__(self, git_dir):
+        """Start the ``git cat-file`` process.
+
+        :param git_dir: The path of the git repository to read from.
+
+        """
+        self._lock = threading.Lock()
+        self._process = Popen(['git', '--git-dir', git_dir, 'cat-file',
+                               '--batch'], stdin=PIPE, stdout=PIPE)
+
+    def __enter__(self):
+        """Return the reader for use as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Stop the ``git cat-file`` process."""
+        self.close()
+
+    def close(self):
+        """Stop the ``git cat-file`` process."""
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+        self._process.stdout.close()
+
+    def _object(self, name):
+        """Return a tuple containing (type, bytes) of object ``name``.
+
+        None is returned when the object does not exist.
+
+        """
+        with self._lock:  # Requests and responses must not interleave
+            self._process.stdin.write('{0}\n'.format(name).encode('utf-8'))
+            self._process.stdin.flush()
+            header = self._process.stdout.readline().split()
+            if len(header) != 3:  # `missing` or `ambiguous`
+                return None
+            size = int(header[2])
+            data = self._process.stdout.read(size)
+            self._process.stdout.read(1)  # The newline after the contents
+        return header[1], data
+
+    def exists(self, rev):
+        """Return whether or not the commit ``rev`` is in the repository."""
+        return self._object('{0}^{{commit}}'.format(rev)) is not None
+
+    def read(self, rev, path):
+        """Return the bytes of the file ``path`` at ``rev``.
+
+        None is returned when the path does not exist at ``rev`` or is not a
+        regular file.
+
+        """
+        found = self._object('{0}:{1}'.format(rev, path))
+        return found[1] if found and found[0] == b'blob' else None
+
+
+class GitMirror(object):
+    """A bare mirror of a repository's branches and pull request heads.
+
+    ``TIMEOUT`` is the number of seconds a git command may run before it is
+    killed, so that an unresponsive remote does not stall reviews.
+
+    """
+
+    TIMEOUT = 300
+
+    def __init__(self, path, url):
+        """Initialize a GitMirror object.
+
+        :param path: The directory of the bare repository.
+        :param url: The URL of the repository to mirror.
+
+        """
+        self._fetch_lock = threading.Lock()
+        self.path = path
+        self.timeout = self.TIMEOUT
+        self.url = url
+
+    def _git(self, *args):
+        """Run git on the mirror and return its output.
+
+        Git never prompts for credentials, and MirrorException is raised when
+        it fails or runs longer than ``self.timeout`` seconds.
+
+        """
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        try:
+            return check_output(('git', '--git-dir', self.path) + args,
+                                env=env, stderr=STDOUT,
+                                timeout=self.timeout).decode('utf-8')
+        except (CalledProcessError, OSError, TimeoutExpired) as exc:
+            output = getattr(exc, 'output', None) or b''
+            raise MirrorException('git {0} failed: {1}'.format(
+                args[0], output.decode('utf-8', 'replace').strip() or exc))
+
+    def ensure(self):
+        """Create the bare repository if it does not exist."""
+        if os.path.isdir(self.path):
+            return
+        try:
+            check_output(['git', 'init', '--quiet', '--bare', self.path],
+                         stderr=STDOUT)
+        except (CalledProcessError, OSError) as exc:
+            raise MirrorException('Unable to create mirror {0}: {1}'
+                                  .format(self.path, exc))
+        self._git('config', 'remote.origin.url', self.url)
+        for refspec in REFSPECS:
+            self._git('config', '--add', 'remote.origin.fetch', refspec)
+
+    def fetch(self, *refspecs):
+        """Fetch ``refspecs`` from the remote, by default all of them.
+
+        Only objects missing from the mirror are transferred.
+
+        """
+        with self._fetch_lock:  # Concurrent fetches would contend for refs
+            self._git('fetch', '--quiet', '--no-tags', 'origin', *refspecs)
+
+    def fetch_pull_request(self, number):
+        """Fetch the head of pull request ``number``."""
+        self.fetch(PULL_REFSPEC.format(number))
+
+    def reader(self):
+        """Return a BlobReader for the mirror."""
+        return BlobReader(self.path)
@@ -1,29 +1,111 @@
 """Defines the standard objects used by Farcy."""
 
 try:
-    from configparser import ConfigParser  # PY3
+    from configparser import ConfigParser, Error as ConfigParserError  # PY3
 except ImportError:
-    from ConfigParser import SafeConfigParser as ConfigParser  # PY2
+    from ConfigParser import (SafeConfigParser as ConfigParser,  # PY2
+                              Error as ConfigParserError)
 
+from array import array
+from collections import Counter, defaultdict
 from datetime import timedelta, tzinfo
+from fnmatch import translate
 import logging
 import os
 import re
+import sys
 from .const import CONFIG_DIR, FARCY_COMMENT_START
 from .exceptions import FarcyException
 from .helpers import get_session, parse_bool, parse_set
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMPY_GROUP_MIN_LINES = 2048
+
+
+def group_lines(lines, threshold):
+    """Return a list of (start, count, last) tuples grouping sorted lines.
+
+    Consecutive lines belong to the same group when at most ``threshold``
+    lines separate them. Large inputs are grouped with NumPy when available.
+
+    """
+    if len(lines) == 1:  # The most common case
+        return [(lines[0], 1, lines[0])]
+    if numpy is not None and len(lines) >= NUMPY_GROUP_MIN_LINES:
+        values = numpy.asarray(lines)
+        breaks = numpy.flatnonzero(numpy.diff(values) > threshold) + 1
+        firsts = numpy.concatenate(([0], breaks))
+        lasts = numpy.concatenate((breaks - 1, [len(values) - 1]))
+        return list(zip(values[firsts].tolist(),
+                        (lasts - firsts + 1).tolist(),
+                        values[lasts].tolist()))
+
+    groups = []
+    start = last = None
+    count = 0
+    for line in lines:
+        if start is None:
+            start = line
+        elif line - last > threshold:
+            groups.append((start, count, last))
+            start = line
+            count = 0
+        count += 1
+        last = line
+    if start is not None:
+        groups.append((start, count, last))
+    return groups
+
 
 class Config(object):
     """Holds configuration for Farcy."""
 
-    ATTRIBUTES = {'comment_group_threshold', 'debug', 'exclude_paths',
-                  'exclude_users', 'limit_users', 'log_level',
-                  'pr_issue_report_limit', 'pull_requests', 'start_event'}
-    INT_ATTRS = {'comment_group_threshold', 'pr_issue_report_limit',
-                 'start_event'}
+    ATTRIBUTES = {'all_open', 'backfill_workers', 'comment_group_threshold',
+                  'debug', 'exclude_paths', 'exclude_users',
+                  'git_mirror_dir', 'handler_concurrency',
+                  'handler_costs_file', 'handler_cpu_limit',
+                  'handler_memory_limit', 'handler_niceness',
+                  'handler_open_files', 'handler_output_limit',
+                  'handler_timeout', 'http_cache_file', 'large_pr_threshold',
+                  'limit_users', 'lint_workers', 'log_json', 'log_level',
+                  'max_file_changes', 'max_patch_size', 'metrics_port',
+                  'perf_log', 'pr_issue_report_limit', 'pull_requests',
+                  'queue_file', 'record_file', 'skip_generated',
+                  'start_event', 'stop_at_comment_limit', 'trace_file',
+                  'updated_since'}
+    BOOL_ATTRS = {'all_open', 'log_json', 'perf_log', 'skip_generated',
+                  'stop_at_comment_limit'}
+    INT_ATTRS = {'backfill_workers', 'comment_group_threshold',
+                 'handler_concurrency', 'handler_cpu_limit',
+                 'handler_memory_limit', 'handler_niceness',
+                 'handler_open_files', 'handler_output_limit',
+                 'handler_timeout', 'large_pr_threshold', 'lint_workers',
+                 'max_file_changes', 'max_patch_size', 'metrics_port',
+                 'pr_issue_report_limit', 'start_event'}
+    # Limits of the linter processes, which handler_NAME_LIMIT options set
+    # for the handler NAME alone
+    HANDLER_LIMITS = ('concurrency', 'cpu_limit', 'memory_limit', 'niceness',
+                      'open_files', 'output_limit', 'timeout')
+    HANDLER_LIMIT_RE = re.compile(r'handler_(\w+?)_({0})$'.format(
+        '|'.join(HANDLER_LIMITS)))
     LOG_LEVELS = {'CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'}
     PATH = os.path.join(CONFIG_DIR, 'farcy.conf')
+    # Attributes only read on start-up, which reloading does not change
+    STARTUP_ATTRS = {'all_open', 'backfill_workers', 'git_mirror_dir',
+                     'handler_costs_file', 'http_cache_file', 'metrics_port',
+                     'perf_log', 'pull_requests', 'queue_file', 'record_file',
+                     'start_event', 'trace_file', 'updated_since'}
+
+    @property
+    def exclude_matcher(self):
+        """Compiled matcher of ``exclude_paths``, or None without any."""
+        if self._exclude_matcher is None and self.exclude_paths is not None:
+            self._exclude_matcher = PathMatcher(self.exclude_paths)
+        return self._exclude_matcher
 
     @property
     def log_level_int(self):
@@ -39,6 +121,9 @@ class Config(object):
 
     def __init__(self, repository, **overrides):
         """Initialize a config with default values."""
+        self._exclude_matcher = None
+        self._handler_limits = {}
+        self._overrides = overrides
         self._session = None
         self.repository = repository
         self.set_defaults()
@@ -66,6 +151,8 @@ class Config(object):
         elif attr in ('exclude_paths', 'pull_requests'):
             if value is not None:
                 value = parse_set(value)
+            if attr == 'exclude_paths':
+                self._exclude_matcher = None
         elif attr in ('exclude_users', 'limit_users'):
             if value:
                 value = parse_set(value, normalize=True)
@@ -79,6 +166,8 @@ class Config(object):
             repo_parts = value.split('/')
             if len(repo_parts) != 2:
                 raise FarcyException('Invalid repository: {0}'.format(value))
+        elif attr in self.BOOL_ATTRS:
+            value = parse_bool(value)
         elif attr in self.INT_ATTRS:
             if value is not None:
                 value = int(value)
@@ -88,6 +177,16 @@ class Config(object):
             raise FarcyException('Either exclude_users or limit_users '
                                  'can be provided, but not both.')
 
+    def handler_limit(self, handler, limit):
+        """Return the value of ``limit`` for the handler named ``handler``.
+
+        The ``handler_NAME_LIMIT`` option, e.g., ``handler_rubocop_timeout``,
+        takes precedence over the ``handler_LIMIT`` option of all handlers.
+
+        """
+        return self._handler_limits.get((handler.lower(), limit),
+                                        getattr(self, 'handler_' + limit))
+
     def load_config_file(self):
         """Load value overrides from configuration file."""
         if not os.path.isfile(self.PATH):
@@ -107,20 +206,67 @@ class Config(object):
     def override(self, **overrides):
         """Override the config values passed as keyword arguments."""
         for attr, value in overrides.items():
-            if attr in self.ATTRIBUTES and value:
+            if not value:
+                continue
+            match = self.HANDLER_LIMIT_RE.match(attr)
+            if attr in self.ATTRIBUTES:
                 setattr(self, attr, value)
+            elif match:
+                self._handler_limits[match.groups()] = int(value)
+
+    def reloaded(self):
+        """Return a Config with the configuration file loaded again.
+
+        The overrides this config was initialized with take precedence over
+        the file again, and the GitHub session is shared. Raise
+        FarcyException when the file cannot be parsed or contains an invalid
+        value.
+
+        """
+        try:
+            config = Config(self.repository, **self._overrides)
+        except (ConfigParserError, ValueError) as exc:
+            raise FarcyException('Invalid configuration file {0}: {1}'
+                                 .format(self.PATH, exc))
+        config._session = self._session
+        return config
 
     def set_defaults(self):
         """Set the default config values."""
+        self.all_open = False
+        self.backfill_workers = 4
         self.comment_group_threshold = 3
         self.debug = False
         self.exclude_paths = None
         self.exclude_users = None
+        self.git_mirror_dir = None
+        self.handler_concurrency = None
+        self.handler_costs_file = None
+        self.handler_cpu_limit = None
+        self.handler_memory_limit = None
+        self.handler_niceness = None
+        self.handler_open_files = None
+        self.handler_output_limit = None
+        self.handler_timeout = None
+        self.http_cache_file = None
+        self.large_pr_threshold = None
         self.limit_users = None
+        self.lint_workers = 1
+        self.log_json = False
         self.log_level = 'ERROR'
+        self.max_file_changes = None
+        self.max_patch_size = None
+        self.metrics_port = None
+        self.perf_log = False
         self.pr_issue_report_limit = 128
         self.pull_requests = None
+        self.queue_file = None
+        self.record_file = None
+        self.skip_generated = True
         self.start_event = None
+        self.stop_at_comment_limit = False
+        self.trace_file = None
+        self.updated_since = None
 
     def user_allowed(self, user):
         """Return if user is allowed."""
@@ -134,6 +280,9 @@ class Config(object):
 class ErrorMessage(object):
     """An error message keeps track the lines a single error appears on."""
 
+    __slots__ = ('_added', '_github', '_pending', 'group_threshold', 'groups',
+                 'message')
+
     def __init__(self, message, group_threshold):
         """Initialize an ErrorMessage object.
 
@@ -146,9 +295,27 @@ class ErrorMessage(object):
 
         """
         self.group_threshold = group_threshold
-        self.groups = set()
-        self.lines = {}  # Value is true when it's on github
+        self.groups = None  # Set of (line, count) groups that are on github
         self.message = message
+        self._added = None  # Array of lines tracked since the last sort
+        self._github = None  # Array of lines that are on github
+        self._pending = ()  # Sorted lines that are not on github
+
+    def _sorted_pending(self):
+        added = self._added
+        if added is None:
+            return self._pending
+        self._added = None
+        if len(added) == 1 and not self._pending and not self._github:
+            self._pending = added  # Most messages are on a single line
+        else:
+            lines = set(added)
+            if self._pending:
+                lines.update(self._pending)
+            if self._github:
+                lines.difference_update(self._github)
+            self._pending = array('i', sorted(lines))
+        return self._pending
 
     def messages(self):
         """Yield a tuple containing (line, message).
@@ -157,36 +324,32 @@ class ErrorMessage(object):
         how many lines are covered by the message.
 
         """
-        def output(start, count, span):
-            if count > 1:
-                return (start, '{0} <sub>{1}x spanning {2} lines</sub>'
-                        .format(self.message, count, span + 1))
-            return (start, self.message)
-
-        start = last = None
-        count = 0
-        for line, skip in sorted(self.lines.items()):
-            if skip:
+        for start, count, last in group_lines(self._sorted_pending(),
+                                              self.group_threshold):
+            if self.groups and (start, count) in self.groups:
                 continue
-            if start is None:
-                start = last = line
-            if line - last > self.group_threshold:
-                if (start, count) not in self.groups:
-                    yield output(start, count, last - start)
-                count = 0
-                start = line
-            count += 1
-            last = line
-        if start and (start, count) not in self.groups:
-            yield output(start, count, last - start)
+            if count > 1:
+                yield (start, '{0} <sub>{1}x spanning {2} lines</sub>'
+                       .format(self.message, count, last - start + 1))
+            else:
+                yield (start, self.message)
 
     def track(self, line, on_github=False):
         """Track the line and return self."""
-        self.lines[line] = self.lines.get(line, False) or on_github
+        if on_github:
+            if self._github is None:
+                self._github = array('i')
+            self._github.append(line)
+        # Github lines are added too so that the next sort removes them
+        if self._added is None:
+            self._added = array('i')
+        self._added.append(line)
         return self
 
     def track_group(self, line, count):
         """Record a grouping for this message that is on github."""
+        if self.groups is None:
+            self.groups = set()
         self.groups.add((line, count))
         return self
 
@@ -199,6 +362,8 @@ class ErrorTracker(object):
 
     @classmethod
     def _parse_group_message(cls, message):
+        if not message.endswith('</sub>'):  # Avoid matching most messages
+            return None
         match = cls.GROUP_MATCH.match(message)
         return match.groups() if match else None
 
@@ -215,19 +380,22 @@ class ErrorTracker(object):
         """
         self.by_file = {}
         self.github_message_count = 0
+        self._errors = None  # Cached (filename, errors) result of `errors`
         self.group_threshold = group_threshold
         self.hidden_issue_count = 0
         self.new_issue_count = 0
         self.from_github_comments(github_comments)
 
     def errors(self, filename):
-        """Generate tuples containing (line, [errors...])."""
-        by_line = {}
-        for error in self.by_file.get(filename, {}).values():
-            for line, message in error.messages():
-                by_line.setdefault(line, []).append(message)
-        for line in sorted(by_line):
-            yield (line, sorted(by_line[line]))
+        """Return an iterator of tuples containing (line, [errors...])."""
+        if self._errors is None or self._errors[0] != filename:
+            by_line = {}
+            for error in self.by_file.get(filename, {}).values():
+                for line, message in error.messages():
+                    by_line.setdefault(line, []).append(message)
+            self._errors = (filename, [(line, sorted(by_line[line]))
+                                       for line in sorted(by_line)])
+        return iter(self._errors[1])
 
     def from_github_comments(self, comments):
         """Populate the error tracker with Farcy comments from github."""
@@ -248,8 +416,16 @@ class ErrorTracker(object):
         if parts:
             message = parts[0]
 
-        error_message = self.by_file.setdefault(filename, {}).setdefault(
-            message, ErrorMessage(message, self.group_threshold))
+        by_message = self.by_file.get(filename)
+        if by_message is None:
+            by_message = self.by_file[sys.intern(filename)] = {}
+        error_message = by_message.get(message)
+        if error_message is None:
+            message = sys.intern(message)
+            error_message = by_message[message] = ErrorMessage(
+                message, self.group_threshold)
+        if self._errors is not None and self._errors[0] == filename:
+            self._errors = None
 
         if parts:
             error_message.track_group(line, int(parts[1]))
@@ -259,6 +435,230 @@ class ErrorTracker(object):
             error_message.track(line, is_github)
 
 
+class FileWatcher(object):
+    """Detects when files are created, modified, replaced or removed."""
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime, stat.st_size
+
+    def __init__(self, paths):
+        """Initialize a FileWatcher of ``paths``, which need not exist."""
+        self._stats = {path: self._stat(path) for path in paths}
+
+    def changed(self):
+        """Return the sorted paths that changed since the previous call."""
+        changed = []
+        for path, previous in self._stats.items():
+            current = self._stat(path)
+            if current != previous:
+                self._stats[path] = current
+                changed.append(path)
+        return sorted(changed)
+
+
+class GitAttributes(object):
+    """The attributes assigned to paths by a ``.gitattributes`` file.
+
+    Patterns without a slash match file names in any directory. Other
+    patterns match paths from the repository root using ``fnmatch``, which
+    is more lenient than git about ``*`` matching slashes.
+
+    """
+
+    def __init__(self, text=''):
+        """Initialize a GitAttributes object.
+
+        :param text: The contents of the ``.gitattributes`` file.
+
+        """
+        self._rules = []
+        for line in text.splitlines():
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            attrs = {}
+            for token in parts[1:]:
+                if token[0] == '-':
+                    attrs[token[1:]] = False
+                elif token[0] == '!':
+                    attrs[token[1:]] = None
+                elif '=' in token:
+                    name, value = token.split('=', 1)
+                    attrs[name] = parse_bool(value)
+                else:
+                    attrs[token] = True
+            pattern = parts[0].lstrip('/')
+            self._rules.append((re.compile(translate(pattern)).match,
+                                '/' not in parts[0], attrs))
+
+    def get(self, path, attr):
+        """Return the value of ``attr`` for ``path``.
+
+        The value is True when set, False when unset, and None when
+        unspecified.
+
+        """
+        name = path.rsplit('/', 1)[-1]
+        for match, basename, attrs in reversed(self._rules):
+            if attr in attrs and match(name if basename else path):
+                return attrs[attr]
+        return None
+
+
+class MirroredContents(object):
+    """The contents of a file read from a git mirror."""
+
+    __slots__ = ('decoded',)
+
+    def __init__(self, decoded):
+        """Initialize a MirroredContents object."""
+        self.decoded = decoded
+
+
+class MirroredFile(object):
+    """Wrap a pull request file reading its contents from a git mirror.
+
+    The contents API is used only when the file is missing from the mirror.
+    All other attributes are looked up on the wrapped file.
+
+    """
+
+    def __init__(self, pfile, reader, sha):
+        """Initialize a MirroredFile object.
+
+        :param pfile: The pull request file to wrap.
+        :param reader: The BlobReader of the mirror.
+        :param sha: The commit to read the file from.
+
+        """
+        self._pfile = pfile
+        self._reader = reader
+        self._sha = sha
+
+    def __getattr__(self, attr):
+        """Return the attribute from the wrapped file."""
+        return getattr(self._pfile, attr)
+
+    def contents(self):
+        """Return an object whose ``decoded`` attribute is the file's bytes."""
+        decoded = self._reader.read(self._sha, self._pfile.filename)
+        if decoded is None:
+            return self._pfile.contents()
+        return MirroredContents(decoded)
+
+
+class DiffFile(object):
+    """A file of a unified diff with a pull request file's interface.
+
+    The contents of the file are fetched from the repository at ``sha``.
+
+    """
+
+    def __init__(self, filename, patch, status, repo, sha):
+        """Initialize a DiffFile object.
+
+        :param filename: The path of the file in the repository.
+        :param patch: The file's hunks, or None.
+        :param status: The pull request status of the file, e.g., ``added``.
+        :param repo: The repository to fetch the file's contents from.
+        :param sha: The commit to read the file from.
+
+        """
+        self._repo = repo
+        self._sha = sha
+        self.filename = filename
+        self.patch = patch
+        self.status = status
+        self.additions_count = self.changes_count = 0
+        for line in (patch or '').split('\n'):
+            if line.startswith('+'):
+                self.additions_count += 1
+                self.changes_count += 1
+            elif line.startswith('-'):
+                self.changes_count += 1
+
+    def contents(self):
+        """Return an object whose ``decoded`` attribute is the file's bytes."""
+        return self._repo.file_contents(self.filename, ref=self._sha)
+
+
+class PathMatcher(object):
+    """Match paths against a collection of ``fnmatch`` patterns.
+
+    The patterns are compiled once. Literal patterns are looked up in a set,
+    and patterns with a single leading or trailing ``*`` are matched with
+    ``str.endswith`` and ``str.startswith``.
+
+    Any directory or file name of the remaining patterns that contains no
+    wildcard must also be one of the names in a matching path. These patterns
+    are indexed by their least common such name, and combined into one regular
+    expression per name, so a path is only matched against the expressions of
+    its own names, and of the patterns without any literal name.
+
+    """
+
+    SLASH_IN_SET_RE = re.compile(r'\[[^\]]*/')
+    WILDCARD_RE = re.compile(r'[*?[]')
+
+    def __init__(self, patterns):
+        """Initialize a PathMatcher object.
+
+        :param patterns: The ``fnmatch`` patterns to match paths against.
+
+        """
+        exact = set()
+        prefixes = []
+        suffixes = []
+        others = []
+        for pattern in patterns:
+            wildcards = self.WILDCARD_RE.findall(pattern)
+            if not wildcards:
+                exact.add(pattern)
+            elif wildcards == ['*'] and pattern.endswith('*'):
+                prefixes.append(pattern[:-1])
+            elif wildcards == ['*'] and pattern.startswith('*'):
+                suffixes.append(pattern[1:])
+            else:
+                others.append((pattern, self._literal_names(pattern)))
+        frequency = Counter(name for _, names in others for name in names)
+        indexed = defaultdict(list)
+        for pattern, names in others:
+            name = min(names, key=lambda x: (frequency[x], x)) \
+                if names else None
+            indexed[name].append(translate(pattern))
+        self._exact = frozenset(exact)
+        self._prefixes = tuple(sorted(prefixes))
+        self._suffixes = tuple(sorted(suffixes))
+        self._regexes = {name: re.compile('|'.join(regexes)).match
+                         for name, regexes in indexed.items()}
+        self._regex = self._regexes.pop(None, None)
+
+    def __call__(self, path):
+        """Return whether or not ``path`` matches any of the patterns."""
+        if path in self._exact or path.startswith(self._prefixes) or \
+                path.endswith(self._suffixes):
+            return True
+        if self._regexes:
+            for name in set(path.split('/')):
+                match = self._regexes.get(name)
+                if match is not None and match(path) is not None:
+                    return True
+        return self._regex is not None and self._regex(path) is not None
+
+    @classmethod
+    def _literal_names(cls, pattern):
+        """Return the set of names in ``pattern`` without wildcards."""
+        if '/' not in pattern or cls.SLASH_IN_SET_RE.search(pattern):
+            return set()
+        return {name for name in pattern.split('/')
+                if name and not cls.WILDCARD_RE.search(name)}
+
+
 class UTC(tzinfo):
     """Provides a simple UTC timezone class.
 
@@ -0,0 +1,156 @@
+"""Record GitHub API traffic to an archive and replay it offline.
+
+An archive is a JSON lines file, gzip compressed when its name ends with
+``.gz``. Its first line describes where Farcy started reading events, and
+each following line holds a response, along with the seconds elapsed since
+the recording started.
+
+"""
+
+from base64 import b64decode, b64encode
+from collections import defaultdict, deque
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from timeit import default_timer
+import gzip
+import json
+import threading
+import time
+from .exceptions import ReplayException, ReplayFinished
+from .helpers import api_endpoint
+
+EVENTS_ENDPOINT = 'GET /repos/:owner/:repo/events'
+
+
+def load_archive(path):
+    """Return a tuple containing (start, responses) of the archive."""
+    with open_archive(path, 'rt') as fp:
+        start = json.loads(fp.readline())
+        responses = [json.loads(line) for line in fp]
+    return start, responses
+
+
+def open_archive(path, mode):
+    """Return the archive at ``path`` opened in text ``mode``."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+class Recorder(object):
+    """A requests response hook writing each response to an archive."""
+
+    def __init__(self, path, repository, start_time=None, last_event_id=None):
+        """Create the archive at ``path``.
+
+        :param path: The path of the archive.
+        :param repository: The monitored repository.
+        :param start_time: Farcy's start time when handling events from then.
+        :param last_event_id: The id of the last event Farcy will skip.
+
+        """
+        self._fp = open_archive(path, 'wt')
+        self._lock = threading.Lock()
+        self._start = default_timer()
+        self._write({'last_event_id': last_event_id,
+                     'repository': repository,
+                     'start_time': start_time and start_time.isoformat()})
+
+    def __call__(self, response, *args, **kwargs):
+        """Write ``response`` to the archive."""
+        request = response.request
+        self._write({'body': b64encode(response.content).decode('ascii'),
+                     'headers': dict(response.headers),
+                     'method': request.method,
+                     'offset': round(default_timer() - self._start, 6),
+                     'status': response.status_code,
+                     'url': request.url})
+
+    def _write(self, record):
+        line = json.dumps(record, sort_keys=True) + '\n'
+        with self._lock:
+            self._fp.write(line)
+            self._fp.flush()
+
+    def close(self):
+        """Close the archive."""
+        with self._lock:
+            self._fp.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """A requests transport adapter serving the responses of an archive.
+
+    Responses to the same request are served in their recorded order, and
+    the last one is repeated when they run out. Writes are never sent: they
+    are answered with a recorded response to the same request, or to the
+    same endpoint. Event polls are served no earlier than their recorded
+    offset divided by ``speed``, or immediately when ``speed`` is 0, and
+    ReplayFinished is raised once the recorded polls run out.
+
+    """
+
+    def __init__(self, responses, speed=1.0):
+        """Initialize a ReplayAdapter object.
+
+        :param responses: The responses of an archive.
+        :param speed: The factor to accelerate the replay by.
+
+        """
+        super(ReplayAdapter, self).__init__()
+        self._by_endpoint = {}
+        self._by_request = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._start = None
+        self.events_served_at = None
+        self.speed = speed
+        for record in responses:
+            self._by_request[(record['method'], record['url'])].append(record)
+            self._by_endpoint.setdefault(
+                api_endpoint(record['method'], record['url']), record)
+
+    def _record(self, method, url):
+        """Return the recorded response for the request."""
+        endpoint = api_endpoint(method, url)
+        with self._lock:
+            if self._start is None:
+                self._start = default_timer()
+            records = self._by_request.get((method, url))
+            if endpoint == EVENTS_ENDPOINT:
+                if not records:
+                    raise ReplayFinished('All recorded events were replayed')
+                return records.popleft()
+            if records:
+                return records.popleft() if len(records) > 1 else records[0]
+            if method not in ('GET', 'HEAD') and endpoint in self._by_endpoint:
+                return self._by_endpoint[endpoint]
+        raise ReplayException('No recorded response for {0} {1}'
+                              .format(method, url))
+
+    def close(self):
+        """Release the adapter's resources."""
+
+    def send(self, request, **kwargs):
+        """Return the recorded response for ``request``."""
+        record = self._record(request.method, request.url)
+        if api_endpoint(request.method, request.url) == EVENTS_ENDPOINT:
+            if self.speed:
+                delay = self._start + record['offset'] / self.speed - \
+                    default_timer()
+                if delay > 0:
+                    time.sleep(delay)
+            self.events_served_at = default_timer()
+
+        response = Response()
+        response._content = b64decode(record['body'])
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict(record['headers'])
+        response.headers.pop('Content-Encoding', None)
+        if 'X-Poll-Interval' in response.headers:  # Pace polls by offset
+            response.headers['X-Poll-Interval'] = '0'
+        response.reason = ''
+        response.request = request
+        response.status_code = record['status']
+        response.url = request.url
+        return response
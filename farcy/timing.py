@@ -0,0 +1,150 @@
+"""Timing of the stages of pull request reviews."""
+
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from timeit import default_timer
+import threading
+from .helpers import api_endpoint
+from .metrics import HANDLER_SECONDS
+
+_LOCAL = threading.local()
+
+
+def add_child_cpu(seconds):
+    """Add the CPU seconds of a terminated linter process.
+
+    The seconds are added to the handler stage timed by the current thread,
+    and to the current profile. Each linter is measured on its own, so the
+    linters run by other threads are not included.
+
+    """
+    stage_cpu = getattr(_LOCAL, 'stage_cpu', None)
+    if stage_cpu is not None:
+        stage_cpu[0] += seconds
+    profile = current_profile()
+    if profile is not None:
+        with profile._lock:
+            profile.child_cpu += seconds
+
+
+def count_api_call(response, *args, **kwargs):
+    """Count a GitHub API response against the current profile.
+
+    This function is installed as a ``requests`` response hook.
+
+    """
+    profile = current_profile()
+    if profile is not None:
+        endpoint = api_endpoint(response.request.method, response.request.url)
+        with profile._lock:
+            profile.api_calls[endpoint] += 1
+            if getattr(response, 'from_cache', False):
+                profile.api_cache_hits += 1
+
+
+def current_profile():
+    """Return the ReviewProfile of the current thread, if any."""
+    return getattr(_LOCAL, 'profile', None)
+
+
+@contextmanager
+def profiling(profile):
+    """Make ``profile`` the current profile within the context."""
+    previous = current_profile()
+    _LOCAL.profile = profile
+    try:
+        yield profile
+    finally:
+        _LOCAL.profile = previous
+
+
+@contextmanager
+def timed(stage, handler=None):
+    """Add the time spent within the context to the current profile.
+
+    :param stage: The name of the stage being timed.
+    :param handler: The name of the handler when timing a handler stage. The
+        CPU time of the linter processes, from ``add_child_cpu``, is only
+        measured for handler stages, and handler stages are also observed by
+        the handler latency metric.
+
+    """
+    profile = current_profile()
+    if profile is None and handler is None:
+        yield
+        return
+    previous_cpu = getattr(_LOCAL, 'stage_cpu', None)
+    if handler:
+        _LOCAL.stage_cpu = [0.0]  # Added to by add_child_cpu
+    stage_cpu = getattr(_LOCAL, 'stage_cpu', None)
+    start = default_timer()
+    try:
+        yield
+    finally:
+        wall = default_timer() - start
+        _LOCAL.stage_cpu = previous_cpu
+        if handler:
+            HANDLER_SECONDS.labels(handler, stage).observe(wall)
+            if profile is not None:
+                profile.add_handler(handler, stage, wall, stage_cpu[0])
+        else:
+            profile.add(stage, wall)
+
+
+class ReviewProfile(object):
+    """Accumulates the time spent in each stage of a pull request review."""
+
+    def __init__(self, repository, number):
+        """Initialize a ReviewProfile object.
+
+        :param repository: The owner/name of the repository.
+        :param number: The number of the pull request being reviewed.
+
+        """
+        self.api_cache_hits = 0
+        self.api_calls = Counter()
+        self.child_cpu = 0.0  # CPU seconds of the linter processes
+        self.handlers = defaultdict(dict)
+        self.number = number
+        self.repository = repository
+        self.stages = {}
+        self._lock = threading.Lock()  # Files may be linted by threads
+        self._start = default_timer()
+
+    def add(self, stage, wall):
+        """Add ``wall`` seconds spent in ``stage``."""
+        with self._lock:
+            values = self.stages.setdefault(stage, {'calls': 0, 'wall': 0.0})
+            values['calls'] += 1
+            values['wall'] += wall
+
+    def add_handler(self, handler, stage, wall, child_cpu):
+        """Add the seconds spent by ``handler`` in ``stage``."""
+        with self._lock:
+            values = self.handlers[handler].setdefault(
+                stage, {'calls': 0, 'child_cpu': 0.0, 'wall': 0.0})
+            values['calls'] += 1
+            values['child_cpu'] += child_cpu
+            values['wall'] += wall
+
+    def elapsed(self):
+        """Return the seconds elapsed since the review started."""
+        return default_timer() - self._start
+
+    def record(self, **extra):
+        """Return a dictionary summarizing the review.
+
+        Keyword arguments are included in the returned dictionary.
+
+        """
+        record = {'api_cache_hits': self.api_cache_hits,
+                  'api_calls': dict(self.api_calls),
+                  'api_call_count': sum(self.api_calls.values()),
+                  'child_cpu': self.child_cpu,
+                  'handlers': dict(self.handlers),
+                  'pr': self.number,
+                  'repository': self.repository,
+                  'stages': self.stages,
+                  'wall': self.elapsed()}
+        record.update(extra)
+        return record
@@ -0,0 +1,203 @@
+"""Spans exported as OpenTelemetry JSON lines.
+
+Tracing is disabled until ``configure`` is called with a path. While
+disabled, ``span`` returns a shared no-op context manager.
+
+"""
+
+from contextlib import contextmanager
+from random import getrandbits
+import json
+import threading
+import time
+from .const import __version__
+from .helpers import api_endpoint
+
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+_LOCAL = threading.local()
+_TRACER = None
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def _stack():
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    return stack
+
+
+class _NoopSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        return
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span(object):
+    """A timed operation within a trace."""
+
+    def __init__(self, tracer, name, attributes, kind=KIND_INTERNAL):
+        """Initialize a Span as a child of the current span, if any."""
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        self.attributes = attributes
+        self.end_ns = None
+        self.error = None
+        self.kind = kind
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = '{0:016x}'.format(getrandbits(64))
+        self.start_ns = None
+        self.trace_id = (parent.trace_id if parent
+                         else '{0:032x}'.format(getrandbits(128)))
+        self.tracer = tracer
+
+    def __enter__(self):
+        """Start the span and make it the current span."""
+        self.start_ns = time_ns()
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """End the span and export it."""
+        self.end_ns = time_ns()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.error = '{0}: {1}'.format(exc_type.__name__, exc_value)
+        self.tracer.export(self)
+        return False
+
+    def set_attribute(self, key, value):
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    def to_json(self):
+        """Return the span in the OTLP JSON representation."""
+        data = {'attributes': [_attribute(key, value) for key, value
+                               in sorted(self.attributes.items())],
+                'endTimeUnixNano': str(self.end_ns),
+                'kind': self.kind,
+                'name': self.name,
+                'spanId': self.span_id,
+                'startTimeUnixNano': str(self.start_ns),
+                'traceId': self.trace_id}
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.error:
+            data['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return data
+
+
+class Tracer(object):
+    """Exports finished spans to a file as OTLP JSON lines."""
+
+    def __init__(self, path):
+        """Initialize a Tracer appending spans to the file at ``path``."""
+        self._fp = open(path, 'a')
+        self._lock = threading.Lock()
+        self.path = path
+
+    def close(self):
+        """Close the output file."""
+        with self._lock:
+            self._fp.close()
+
+    def export(self, span):
+        """Write ``span`` as a single line of JSON."""
+        line = json.dumps({'resourceSpans': [{
+            'resource': {'attributes': [
+                _attribute('service.name', 'farcy'),
+                _attribute('service.version', __version__)]},
+            'scopeSpans': [{'scope': {'name': 'farcy'},
+                            'spans': [span.to_json()]}]}]},
+            sort_keys=True)
+        with self._lock:
+            self._fp.write(line + '\n')
+            self._fp.flush()
+
+
+def configure(path):
+    """Export spans to ``path``, or disable tracing when ``path`` is None."""
+    global _TRACER
+    if _TRACER is not None:
+        _TRACER.close()
+    _TRACER = Tracer(path) if path else None
+
+
+def current_span():
+    """Return the current span of the current thread, if any."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def record_api_response(response, *args, **kwargs):
+    """Export a span for a GitHub API response.
+
+    This function is installed as a ``requests`` response hook. The span
+    ends now and starts when the request was sent.
+
+    """
+    if _TRACER is None:
+        return
+    request = response.request
+    api_span = Span(_TRACER, api_endpoint(request.method, request.url),
+                    {'http.method': request.method,
+                     'http.status_code': response.status_code,
+                     'http.url': request.url}, kind=KIND_CLIENT)
+    api_span.end_ns = time_ns()
+    api_span.start_ns = api_span.end_ns - int(
+        response.elapsed.total_seconds() * 1e9)
+    _TRACER.export(api_span)
+
+
+def span(name, **attributes):
+    """Return a context manager tracing the operation ``name``."""
+    if _TRACER is None:
+        return _NOOP_SPAN
+    return Span(_TRACER, name, attributes)
+
+
+def time_ns():
+    """Return the current time in nanoseconds since the epoch."""
+    return int(time.time() * 1e9)
+
+
+@contextmanager
+def within(parent):
+    """Make ``parent``, a span of another thread, current within the context.
+
+    Spans started within the context, such as by a worker thread, become
+    children of ``parent``. ``parent`` is not ended or exported on exit.
+
+    """
+    if parent is None:
+        yield parent
+        return
+    stack = _stack()
+    stack.append(parent)
+    try:
+        yield parent
+    finally:
+        if stack and stack[-1] is parent:
+            stack.pop()
@@ -1,5 +1,16 @@
 """Farcy test helpers."""
 
+from subprocess import Popen
+import socket
+import sys
+
+
+def exited_owner():
+    """Return the ReviewQueue owner of a process that has exited."""
+    process = Popen([sys.executable, '-c', ''])
+    process.wait()
+    return '{0}:{1}'.format(socket.gethostname(), process.pid)
+
 
 class Struct(object):
     """A dynamic class with attributes based on the input dictionary."""
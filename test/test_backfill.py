@@ -0,0 +1,58 @@
+"""Farcy backfill test file."""
+
+from __future__ import print_function
+from farcy.backfill import Backfill
+from mock import MagicMock
+import logging
+import threading
+import unittest
+
+
+class BackfillTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def test_empty(self):
+        backfill = Backfill(MagicMock(), [])
+        backfill.start()
+        backfill.join()
+        self.assertTrue(backfill.finished.is_set())
+        self.assertEqual(0, backfill.total)
+
+    def test_failure(self):
+        def review(number):
+            if number == 2:
+                raise Exception()
+
+        backfill = Backfill(review, [1, 2, 3], workers=2)
+        backfill.start()
+        backfill.join()
+        self.assertEqual(1, backfill.failed)
+        self.assertEqual(3, backfill.reviewed)
+        self.assertTrue(backfill.finished.is_set())
+        self.assertIn('reviewed 3 of 3', backfill.summary())
+
+    def test_ready(self):
+        ready = threading.Event()
+        review = MagicMock()
+        backfill = Backfill(review, [1], ready=ready)
+        backfill.start()
+        self.assertFalse(backfill.finished.wait(0.05))
+        self.assertFalse(review.called)
+        ready.set()
+        backfill.join()
+        review.assert_called_once_with(1)
+
+    def test_workers(self):
+        seen = set()
+        barrier = threading.Barrier(4, timeout=5)
+
+        def review(number):
+            seen.add(threading.current_thread().name)
+            barrier.wait()
+
+        backfill = Backfill(review, range(8), workers=4)
+        backfill.start()
+        backfill.join()
+        self.assertEqual(4, len(seen))
+        self.assertEqual(0, backfill.failed)
@@ -0,0 +1,77 @@
+"""Farcy costs test file."""
+
+from __future__ import print_function
+from farcy import costs
+from mock import MagicMock
+from shutil import rmtree
+from tempfile import mkdtemp
+import os
+import threading
+import unittest
+
+
+class CostModelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'costs.json')
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def test_coefficients(self):
+        model = costs.CostModel()
+        for size in (100, 1000, 10000, 100, 5000):
+            model.observe('Flake8', size, 0.2 + size * 1e-4)
+        overhead, per_byte = model.coefficients('Flake8')
+        self.assertAlmostEqual(0.2, overhead)
+        self.assertAlmostEqual(1e-4, per_byte)
+        self.assertAlmostEqual(0.3, model.predict(['Flake8'], 1000))
+
+    def test_coefficients__same_size(self):
+        model = costs.CostModel()
+        model.observe('Pep257', 100, 0.1)
+        model.observe('Pep257', 100, 0.3)
+        overhead, per_byte = model.coefficients('Pep257')
+        self.assertEqual(0.0, per_byte)
+        self.assertTrue(0.2 < overhead < 0.3)  # Recent runs weigh more
+
+    def test_predict__unobserved(self):
+        model = costs.CostModel()
+        self.assertEqual(0.0, model.predict([], 1000))
+        self.assertAlmostEqual(
+            2 * (costs.DEFAULT_OVERHEAD + 1000 *
+                 costs.DEFAULT_SECONDS_PER_BYTE),
+            model.predict(['A', 'B'], 1000))
+
+    def test_save(self):
+        model = costs.CostModel(self.path)
+        model.observe('Rubocop', 10, 2.0)
+        model.observe('Rubocop', 20, 3.0)
+        model.save()
+        self.assertEqual(['costs.json'], os.listdir(self.tmpdir))
+        self.assertAlmostEqual(
+            model.predict(['Rubocop'], 40),
+            costs.CostModel(self.path).predict(['Rubocop'], 40))
+
+    def test_save__concurrent(self):
+        model = costs.CostModel(self.path)
+        model.observe('Flake8', 10, 1.0)
+        threads = [threading.Thread(target=model.save) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(['costs.json'], os.listdir(self.tmpdir))
+
+    def test_save__failure_is_logged(self):
+        log = MagicMock()
+        model = costs.CostModel(os.path.join(self.tmpdir, 'missing', 'c.json'),
+                                log=log)
+        model.observe('Flake8', 10, 1.0)
+        model.save()
+        self.assertEqual(1, log.warning.call_count)
+        self.assertEqual([], os.listdir(self.tmpdir))
+
+    def test_save__without_path(self):
+        costs.CostModel().save()
+        self.assertEqual([], os.listdir(self.tmpdir))
@@ -1,16 +1,27 @@
 """Farcy class test file."""
 
 from __future__ import print_function
-from collections import namedtuple
-from datetime import datetime
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
 from farcy import (Config, FARCY_COMMENT_START, Farcy, FarcyException, UTC,
                    main, no_handler_debug_factory)
-from mock import MagicMock, call, patch
-from github3.exceptions import ConnectionError
+from farcy import tracing
+from farcy.const import DIFF_MEDIA_TYPE, STDIN_DIR
+from farcy.costs import CostModel
+from farcy.exceptions import HandlerLimitExceeded, MirrorException
+from farcy.jobs import ReviewQueue
+from mock import ANY, MagicMock, call, patch
+from github3.exceptions import ConnectionError, NotFoundError
+from shutil import rmtree
+from tempfile import mkdtemp
 import farcy as farcy_module
+import json
 import logging
+import os
+import threading
+import time
 import unittest
-from .helper import Struct
+from .helper import Struct, exited_owner
 
 Config.PATH = '/dev/null'  # Don't allow the system config file to load.
 farcy_module.APPROVAL_PHRASES = ['Dummy Approval']  # Provide only one option.
@@ -41,11 +52,18 @@ def assert_status(farcy, failures=0):
 
 
 def mockpfile(**kwargs):
+    kwargs.setdefault('filename', 'DummyFile')
     for attr in PFILE_ATTRS:
         kwargs.setdefault(attr, None)
     return MockPFile(**kwargs)
 
 
+def mockpr(**kwargs):
+    pr = MagicMock(**kwargs)
+    pr.refresh.return_value = pr  # Refreshed in place like a PullRequest
+    return pr
+
+
 class FarcyBaseTest(unittest.TestCase):
     def setUp(self):
         logging.disable(logging.CRITICAL)
@@ -82,6 +100,53 @@ class FarcyTest(FarcyBaseTest):
             mockpfile(filename='tmp/foo'), stats))
         self.assertEqual({'blacklisted_files': 11}, stats)
 
+    def test_compute_pfile_stats__generated(self):
+        farcy = self._farcy_instance()
+        farcy.repo.file_contents.return_value = MockInfo(
+            decoded=b'gen/** linguist-generated\n')
+        for filename in ['app/a_pb2.py', 'x/y.pb.go', 'yarn.lock',
+                         'gen/a.py']:
+            stats = Counter()
+            self.assertEqual(None, farcy._compute_pfile_stats(
+                mockpfile(filename=filename, patch='', status='added'),
+                stats, 'dummy'))
+            self.assertEqual({'generated_files': 1}, stats)
+        farcy.repo.file_contents.assert_called_once_with('.gitattributes',
+                                                         ref='dummy')
+
+    def test_compute_pfile_stats__generated__disabled(self):
+        farcy = self._farcy_instance()
+        farcy.config.skip_generated = False
+        stats = Counter()
+        self.assertEqual({1: 1}, farcy._compute_pfile_stats(
+            mockpfile(filename='a.min.js', patch='@@ -0,0 +1 @@\n+a',
+                      status='added'), stats, 'dummy'))
+        self.assertFalse(farcy.repo.file_contents.called)
+
+    def test_compute_pfile_stats__large_changes(self):
+        farcy = self._farcy_instance()
+        farcy.config.max_file_changes = 10
+        stats = Counter()
+        pfile = Struct(changes_count=11, filename='a.py', patch='',
+                       status='added')
+        self.assertEqual(None, farcy._compute_pfile_stats(pfile, stats))
+        self.assertEqual({'large_change_files': 1}, stats)
+
+    def test_compute_pfile_stats__large_patch(self):
+        farcy = self._farcy_instance()
+        farcy.config.max_patch_size = 10
+        stats = Counter()
+        self.assertEqual(None, farcy._compute_pfile_stats(
+            mockpfile(patch='@@ -0,0 +1 @@\n+a', status='added'), stats))
+        self.assertEqual({'large_patch_files': 1}, stats)
+
+    def test_compute_pfile_stats__minified(self):
+        stats = Counter()
+        self.assertEqual(None, self._farcy_instance()._compute_pfile_stats(
+            mockpfile(filename='app/bundle.min.js', patch='', status='added'),
+            stats))
+        self.assertEqual({'minified_files': 1}, stats)
+
     @patch('farcy.added_lines')
     def test_compute_pfile_stats__modified(self, mock_added_lines):
         mock_added_lines.return_value = {1: 1, 2: 2}
@@ -101,6 +166,16 @@ class FarcyTest(FarcyBaseTest):
             mockpfile(status='added'), stats))
         self.assertEqual({'unchanged_files': 11}, stats)
 
+    def test_compute_pfile_stats__vendored(self):
+        farcy = self._farcy_instance()
+        farcy.repo.file_contents.return_value = MockInfo(
+            decoded=b'third_party/* linguist-vendored\n')
+        stats = Counter()
+        self.assertEqual(None, farcy._compute_pfile_stats(
+            mockpfile(filename='third_party/a.py', patch='', status='added'),
+            stats, 'dummy'))
+        self.assertEqual({'vendored_files': 1}, stats)
+
     def test_compute_pfile_stats__removed(self):
         stats = {'deleted_files': 10}
         config = Config(None)
@@ -118,6 +193,64 @@ class FarcyTest(FarcyBaseTest):
             self.assertTrue(mock_critical.called)
         self.assertEqual({}, stats)
 
+    def test_configure_logging__perf_log(self):
+        config = Config(None)
+        config.log_level = 'DEBUG'
+        farcy = self._farcy_instance(config=config)
+        self.assertGreater(farcy.perf_log.getEffectiveLevel(),
+                           logging.CRITICAL)
+
+        farcy.config.perf_log = True
+        farcy._configure_logging()
+        self.assertEqual(logging.INFO, farcy.perf_log.getEffectiveLevel())
+
+        farcy.config.perf_log = False  # Such as by a reloaded configuration
+        farcy._configure_logging()
+        self.assertGreater(farcy.perf_log.getEffectiveLevel(),
+                           logging.CRITICAL)
+
+    def test_gitattributes__cached_per_sha(self):
+        farcy = self._farcy_instance()
+        farcy.repo.file_contents.return_value = MockInfo(
+            decoded=b'*.js linguist-generated\n')
+        attributes = farcy._gitattributes('a')
+        self.assertTrue(attributes.get('b/c.js', 'linguist-generated'))
+        self.assertIs(attributes, farcy._gitattributes('a'))
+        farcy._gitattributes('b')
+        self.assertEqual([call('.gitattributes', ref='a'),
+                          call('.gitattributes', ref='b')],
+                         farcy.repo.file_contents.call_args_list)
+
+    def test_gitattributes__mirror(self):
+        farcy = self._farcy_instance()
+        blobs = {'.gitattributes': b'*.js linguist-generated\n'}
+        reader = Struct(exists=lambda sha: sha == 'a',
+                        read=lambda sha, path: blobs.get(path))
+        self.assertTrue(farcy._gitattributes('a', reader).get(
+            'b/c.js', 'linguist-generated'))
+        blobs.clear()  # Without a .gitattributes file
+        self.assertEqual(None, farcy._gitattributes('b', Struct(
+            exists=lambda sha: True, read=lambda sha, path: None)).get(
+                'b/c.js', 'linguist-generated'))
+        self.assertFalse(farcy.repo.file_contents.called)
+
+    def test_gitattributes__mirror_missing_commit(self):
+        farcy = self._farcy_instance()
+        farcy.repo.file_contents.return_value = MockInfo(
+            decoded=b'*.js linguist-generated\n')
+        reader = Struct(exists=lambda sha: False)
+        self.assertTrue(farcy._gitattributes('a', reader).get(
+            'b/c.js', 'linguist-generated'))
+        farcy.repo.file_contents.assert_called_once_with('.gitattributes',
+                                                         ref='a')
+
+    def test_gitattributes__not_found(self):
+        farcy = self._farcy_instance()
+        farcy.repo.file_contents.side_effect = NotFoundError(
+            MagicMock(status_code=404))
+        self.assertEqual(None, farcy._gitattributes('a').get(
+            'b/c.js', 'linguist-generated'))
+
     def test_get_issues__simple_module(self):
         farcy = self._farcy_instance()
         pfile = mockpfile(contents=lambda: MockInfo(decoded=b'"""A."""\n'),
@@ -139,15 +272,249 @@ class FarcyTest(FarcyBaseTest):
         self.assertEqual({}, farcy.get_issues(pfile, pr))
         self.assertTrue(mock_prepare_directory.called)
 
+    def test_get_issues__limit_exceeded(self):
+        farcy = self._farcy_instance()
+        handler = MagicMock()
+        handler.process.side_effect = HandlerLimitExceeded('slow', 'timeout')
+        farcy._ext_to_handler['.py'] = [handler]
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1\n'),
+                          filename='a.py')
+        stats = Counter()
+        with self.assertRaises(HandlerLimitExceeded):
+            farcy.get_issues(pfile, None, stats)
+        self.assertEqual({'handler_limit_timeout': 1}, stats)
+
+    def test_lint_file__limit_exceeded(self):
+        farcy = self._farcy_instance()
+        handler = MagicMock()
+        handler.process.side_effect = HandlerLimitExceeded('slow', 'timeout')
+        farcy._ext_to_handler['.py'] = [handler]
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1\n'),
+                          filename='a.py')
+        stats = Counter()
+        with patch.object(farcy.log, 'warning') as mock_warning:
+            self.assertEqual(None, farcy._lint_file(pfile, None, stats, None))
+        mock_warning.assert_called_with('Unable to lint %s: %s', 'a.py', ANY)
+        self.assertEqual('slow', str(mock_warning.call_args[0][2]))
+        self.assertEqual({'handler_limit_timeout': 1}, stats)
+
+    def test_get_issues__observe_cost(self):
+        farcy = self._farcy_instance()
+        handler = MagicMock()
+        handler.name = 'Dummy'
+        handler.process.return_value = {1: ['issue']}
+        farcy._ext_to_handler['.py'] = [handler]
+        farcy.costs = MagicMock()
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1\n'),
+                          filename='a.py', patch='+a = 1')
+        self.assertEqual({1: ['issue']}, farcy.get_issues(pfile, None))
+        farcy.costs.observe.assert_called_once_with('Dummy', 6, ANY)
+
+    @patch('farcy.default_timer')
+    def test_lint_files__cost_by_patch(self, mock_timer):
+        farcy = self._farcy_instance()
+        farcy.config.lint_workers = 2
+        handler = MagicMock(stdin=True)
+        handler.name = 'Dummy'
+        handler.process.return_value = {}
+        farcy._ext_to_handler.clear()  # Ignore the installed handlers
+        farcy._ext_to_handler['.py'] = [handler]
+        farcy.costs = CostModel()
+
+        def pfile(name, file_size, patch_size):
+            return mockpfile(
+                contents=lambda: MockInfo(decoded=b'a' * file_size),
+                filename=name, patch='+' * patch_size)
+
+        # The runtime follows the patch, not the size of the file
+        mock_timer.side_effect = [0, 0.1 + 100 * 1e-3, 0, 0.1 + 1000 * 1e-3]
+        farcy.get_issues(pfile('a.py', 10000, 100), None)
+        farcy.get_issues(pfile('b.py', 100, 1000), None)
+        self.assertAlmostEqual(
+            1.1, farcy.costs.predict(['Dummy'], 1000))
+
+        started = []
+
+        def get_issues(pfile, pr, stats, lines):
+            started.append(pfile.filename)
+            return {}
+
+        files = [(pfile('large_file.py', 100000, 10), {}),
+                 (pfile('large_patch.py', 100, 5000), {})]
+        with patch.object(farcy, 'get_issues', side_effect=get_issues):
+            list(farcy._lint_files(files, None, Counter()))
+        self.assertEqual(['large_patch.py'], started[:1])
+
+    @patch('farcy.rmtree')
+    @patch('farcy.mkdtemp')
+    @patch('farcy.Farcy._write_contents')
+    def test_get_issues__stdin(self, mock_write_contents, mock_mkdtemp,
+                               mock_rmtree):
+        farcy = self._farcy_instance()
+        handler = MagicMock(stdin=True)
+        handler.process.return_value = {1: ['issue']}
+        farcy._ext_to_handler['.py'] = [handler]
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1\n'),
+                          filename='a/b.py')
+        self.assertEqual({1: ['issue']}, farcy.get_issues(pfile, None))
+        handler.process.assert_called_once_with(
+            os.path.join(STDIN_DIR, 'a/b.py'), b'a = 1\n', lines=None)
+        self.assertFalse(handler.prepare_directory.called)
+        self.assertFalse(mock_write_contents.called)
+        self.assertFalse(mock_mkdtemp.called)
+        self.assertFalse(mock_rmtree.called)
+
+    def test_get_issues__stdin_from_ignoring_directory(self):
+        farcy = self._farcy_instance()
+        paths = []
+
+        def process(filename, contents=None, lines=None):
+            paths.append(filename)
+            return {}
+
+        piped = MagicMock(stdin=True)
+        written = MagicMock(stdin=False)
+        piped.process.side_effect = written.process.side_effect = process
+        farcy._ext_to_handler['.js'] = [piped, written]
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1;\n'),
+                          filename='a/b.js')
+        cwd = os.getcwd()
+        tmpdir = mkdtemp()
+        try:
+            with open(os.path.join(tmpdir, '.eslintignore'), 'w') as fp:
+                fp.write('a/\n')
+            os.chdir(tmpdir)
+            farcy.get_issues(pfile, None)
+        finally:
+            os.chdir(cwd)
+            rmtree(tmpdir)
+        # The linters resolve the file outside of the working directory,
+        # whether it is piped or written.
+        self.assertEqual(os.path.join(STDIN_DIR, 'a/b.js'), paths[0])
+        self.assertTrue(paths[1].endswith(os.path.join('', 'a', 'b.js')))
+        for path in paths:
+            self.assertTrue(os.path.isabs(path))
+            self.assertFalse(path.startswith(tmpdir))
+
+    def test_get_issues__lines(self):
+        farcy = self._farcy_instance()
+        handler = MagicMock(stdin=True)
+        handler.process.return_value = {2: ['issue']}
+        farcy._ext_to_handler['.py'] = [handler]
+        pfile = mockpfile(contents=lambda: MockInfo(decoded=b'a = 1\n'),
+                          filename='a.py')
+        self.assertEqual({2: ['issue']},
+                         farcy.get_issues(pfile, None, lines={2: 1}))
+        handler.process.assert_called_once_with(ANY, b'a = 1\n',
+                                                lines={2: 1})
+
     def test_get_issues__no_handlers(self):
         farcy = self._farcy_instance()
         self.assertEqual({}, farcy.get_issues(mockpfile(filename=''), None))
 
 
+class FarcyLintFilesTest(FarcyBaseTest):
+    def test_lint_files__workers(self):
+        farcy = self._farcy_instance()
+        farcy.config.lint_workers = 2
+        farcy._ext_to_handler.clear()  # Ignore the installed handlers
+        farcy._ext_to_handler['.rb'] = [Struct(name='Slow')]
+        files = [(mockpfile(filename='a.py', patch='+a'), {1: 1}),
+                 (mockpfile(filename='b.rb', patch='+b'), {1: 1}),
+                 (mockpfile(filename='c.py', patch='+c' * 100), {1: 1})]
+        started = []
+
+        def get_issues(pfile, pr, stats, lines):
+            started.append(pfile.filename)
+            stats['linted'] += 1
+            if pfile.filename == 'c.py':
+                raise Exception()
+            return {1: [pfile.filename]}
+
+        stats = Counter()
+        with patch.object(farcy, 'get_issues', side_effect=get_issues):
+            results = list(farcy._lint_files(files, None, stats))
+        self.assertEqual(['b.rb'], started[:1])  # Predicted to be slowest
+        self.assertEqual([('a.py', {1: ['a.py']}), ('b.rb', {1: ['b.rb']}),
+                          ('c.py', None)],
+                         [(pfile.filename, issues)
+                          for pfile, _, issues in results])
+        self.assertEqual({'linted': 3}, stats)
+
+    def test_lint_files__closed(self):
+        farcy = self._farcy_instance()
+        farcy.config.lint_workers = 2
+        files = [(mockpfile(filename='{0}.py'.format(x), patch='+'), {})
+                 for x in range(50)]
+        release = threading.Event()
+
+        def get_issues(pfile, pr, stats, lines):
+            if pfile.filename != '0.py':
+                release.wait()
+            return {}
+
+        with patch.object(farcy, 'get_issues',
+                          side_effect=get_issues) as mock_get_issues:
+            results = farcy._lint_files(files, None, Counter())
+            next(results)
+            threading.Timer(0.1, release.set).start()
+            results.close()
+        self.assertLessEqual(mock_get_issues.call_count, 3)
+
+    def test_lint_files__span(self):
+        farcy = self._farcy_instance()
+        farcy.config.lint_workers = 2
+        files = [(mockpfile(filename='{0}.py'.format(x), patch='+'), {})
+                 for x in range(4)]
+        parents = []
+
+        def get_issues(pfile, pr, stats, lines):
+            parents.append(tracing.current_span())  # The get_issues span
+            return {}
+
+        tracing.configure(os.devnull)
+        try:
+            with tracing.span('handle_pr') as handle_pr:
+                with patch.object(farcy, 'get_issues', side_effect=get_issues):
+                    list(farcy._lint_files(files, None, Counter()))
+        finally:
+            tracing.configure(None)
+        self.assertEqual([handle_pr.span_id] * 4,
+                         [get_issues.parent_id for get_issues in parents])
+
+
 class FarcyHandlePrTest(FarcyBaseTest):
     DUMMY_COMMENT = Struct(body='_[farcy \n* MatchingError', path='DummyFile',
                            position=16)
 
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__concurrent(self, mock_get_issues):
+        started, release = threading.Event(), threading.Event()
+
+        def get_issues(*args):
+            started.set()
+            release.wait(5)
+            return {}
+        mock_get_issues.side_effect = get_issues
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(patch='@@ -0,0 +1 @@\n+a',
+                                           status='added')]
+
+        farcy = self._farcy_instance()
+        farcy.queue = ReviewQueue(':memory:')
+        threads = [threading.Thread(target=farcy.handle_pr, args=(pr,))
+                   for _ in range(2)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        threads[1].start()
+        time.sleep(0.05)  # Let the second review reach the first's
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, mock_get_issues.call_count)
+        assert_status(farcy)
+
     @patch('farcy.Farcy.get_issues')
     @patch('farcy.added_lines')
     def test_handle_pr__exception_from_get_issues(self, mock_added_lines,
@@ -158,20 +525,48 @@ class FarcyHandlePrTest(FarcyBaseTest):
         mock_added_lines.return_value = {16: 16}
         mock_get_issues.side_effect = side_effect
 
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         pfile = mockpfile(patch='', status='added')
         pr.files.return_value = [pfile]
 
         farcy = self._farcy_instance()
         with patch.object(self.logger, 'info') as mock_info:
             farcy.handle_pr(pr)
-            assert_calls(mock_info, call('Handling PR#180 by Dummy'),
-                         call('PR#180 STATUS: encountered an exception in '
+            assert_calls(mock_info,
+                         call('Handling PR#%s by %s', 180, 'Dummy'),
+                         call('PR#%s STATUS: %s', 180,
+                              'encountered an exception in '
                               'handler. Check log.'))
 
         mock_added_lines.assert_called_with('')
-        mock_get_issues.assert_called_once_with(pfile, pr)
+        mock_get_issues.assert_called_once_with(pfile, pr, ANY, ANY)
+        assert_calls(farcy.repo.create_status,
+                     call('dummy', 'pending', context='farcy',
+                          description='started investigation'),
+                     call('dummy', 'error', context='farcy',
+                          description=('encountered an exception in handler. '
+                                       'Check log.')))
+
+    @patch('farcy.added_lines')
+    def test_handle_pr__cpu_limit_exceeded(self, mock_added_lines):
+        mock_added_lines.return_value = {1: 1}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(
+            contents=lambda: MockInfo(decoded=b'a = 1\n'), filename='a.py',
+            patch='', status='added')]
+        handler = MagicMock(stdin=True)
+        handler.name = 'Dummy'
+        handler.process.side_effect = HandlerLimitExceeded(
+            'Dummy exceeded its CPU limit of 1 seconds', 'cpu')
+
+        farcy = self._farcy_instance()
+        farcy._ext_to_handler['.py'] = [handler]
+        with patch.object(self.logger, 'debug') as mock_debug:
+            farcy.handle_pr(pr)
+        mock_debug.assert_any_call('PR#%s %16s: %s', 180, 'handler_limit_cpu',
+                                   1)
         assert_calls(farcy.repo.create_status,
                      call('dummy', 'pending', context='farcy',
                           description='started investigation'),
@@ -180,7 +575,7 @@ class FarcyHandlePrTest(FarcyBaseTest):
                                        'Check log.')))
 
     def test_handle_pr__pr_closed(self):
-        pr = MagicMock(number=180, state='closed')
+        pr = mockpr(number=180, state='closed')
         farcy = self._farcy_instance()
         with patch.object(self.logger, 'debug') as mock_debug:
             farcy.handle_pr(pr)
@@ -188,6 +583,40 @@ class FarcyHandlePrTest(FarcyBaseTest):
                 'Skipping PR#180: invalid state (closed)')
         pr.refresh.assert_called_with()
 
+    def test_handle_pr__pr_metadata_cached(self):
+        pr = mockpr(number=180, state='closed')
+        farcy = self._farcy_instance()
+        farcy._track_pr(pr)
+        farcy.handle_pr(pr)
+        self.assertFalse(pr.refresh.called)
+
+        with patch('time.time', return_value=time.time() + 3600):
+            farcy.handle_pr(pr)
+        pr.refresh.assert_called_once_with()
+
+    @patch('farcy.objects.get_session')
+    def test_handle_pr__pr_metadata_listed(self, mock_get_session):
+        full = MagicMock(changed_files=1, number=180, state='open',
+                         user=Struct(login='Dummy'))
+        full.head.ref = 'DUMMY_BRANCH'
+        full.head.sha = 'dummy'
+        full.files.return_value = []
+        # Listed pull requests lack changed_files, and refresh to a new object
+        listed = Struct(head=Struct(ref='DUMMY_BRANCH', sha='dummy'),
+                        number=180, refresh=lambda: full)
+        repo = mock_get_session.return_value.repository.return_value
+        repo.pull_requests.return_value = [listed]
+
+        config = Config('dummy/dummy')
+        config.large_pr_threshold = 2
+        farcy = Farcy(config)
+        farcy.PushEvent(Struct(payload={'ref': 'refs/heads/DUMMY_BRANCH'}))
+        self.assertIs(full, farcy.open_prs['DUMMY_BRANCH'])
+        assert_status(farcy)
+
+        farcy.PushEvent(Struct(payload={'ref': 'refs/heads/DUMMY_BRANCH'}))
+        self.assertFalse(full.refresh.called)  # Fetched within the max age
+
     @patch('farcy.Farcy.get_issues')
     @patch('farcy.added_lines')
     def test_handle_pr__single_failure(self, mock_added_lines,
@@ -195,8 +624,8 @@ class FarcyHandlePrTest(FarcyBaseTest):
         mock_added_lines.return_value = {16: 16}
         mock_get_issues.return_value = {16: ['Dummy Failure']}
 
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         pfile = mockpfile(filename='DummyFile', patch='', status='added')
         pr.files.return_value = [pfile]
 
@@ -204,16 +633,44 @@ class FarcyHandlePrTest(FarcyBaseTest):
         with patch.object(self.logger, 'info') as mock_info:
             farcy.handle_pr(pr)
             assert_calls(mock_info,
-                         call('Handling PR#180 by Dummy'),
-                         call('PR#180 STATUS: found 1 issue'))
+                         call('Handling PR#%s by %s', 180, 'Dummy'),
+                         call('PR#%s STATUS: %s', 180,
+                              'found 1 issue'))
 
         mock_added_lines.assert_called_with('')
-        mock_get_issues.assert_called_once_with(pfile, pr)
+        mock_get_issues.assert_called_once_with(pfile, pr, ANY, ANY)
         assert_calls(pr.create_review_comment, call(
             '{0}\n* Dummy Failure'.format(FARCY_COMMENT_START),
             'dummy', 'DummyFile', 16))
         assert_status(farcy, failures=1)
 
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__stop_at_comment_limit(self, mock_get_issues):
+        mock_get_issues.return_value = {1: ['Dummy Failure']}
+
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.review_comments.return_value = [self.DUMMY_COMMENT] * 127
+        pfiles = [mockpfile(filename='a', patch='@@ -0,0 +1 @@\n+a',
+                            status='added'),
+                  mockpfile(filename='b', patch='@@ -0,0 +1,2 @@\n+b\n+b',
+                            status='added'),
+                  mockpfile(filename='c', patch='@@ -0,0 +1 @@\n+c',
+                            status='added')]
+        pr.files.return_value = pfiles
+
+        farcy = self._farcy_instance()
+        farcy.config.stop_at_comment_limit = True
+        with patch.object(self.logger, 'debug') as mock_debug:
+            farcy.handle_pr(pr)
+        mock_debug.assert_any_call('PR#%s %16s: %s', 180,
+                                   'unexamined_files', 2)
+        mock_get_issues.assert_called_once_with(pfiles[1], pr, ANY, ANY)
+        self.assertEqual(1, pr.create_review_comment.call_count)
+        farcy.repo.create_status.assert_called_with(
+            'dummy', 'failure', context='farcy',
+            description='found 1 issue (2 files not examined)')
+
     @patch('farcy.Farcy.get_issues')
     @patch('farcy.added_lines')
     def test_handle_pr__single_failure__limit_exceeded(self, mock_added_lines,
@@ -221,8 +678,8 @@ class FarcyHandlePrTest(FarcyBaseTest):
         mock_added_lines.return_value = {16: 16}
         mock_get_issues.return_value = {16: ['Dummy Failure']}
 
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         pr.review_comments.return_value = [self.DUMMY_COMMENT] * 128
 
         pfile = mockpfile(filename='DummyFile', patch='', status='added')
@@ -233,16 +690,17 @@ class FarcyHandlePrTest(FarcyBaseTest):
             with patch.object(self.logger, 'info') as mock_info:
                 farcy.handle_pr(pr)
                 assert_calls(mock_info,
-                             call('Handling PR#180 by Dummy'),
-                             call('PR#180 STATUS: found 1 issue'))
+                             call('Handling PR#%s by %s', 180, 'Dummy'),
+                             call('PR#%s STATUS: %s', 180,
+                                  'found 1 issue'))
             assert_calls(mock_debug,
-                         call('PR#180      added_files: 1'),
-                         call('PR#180      added_lines: 1'),
-                         call('PR#180           issues: 1'),
-                         call('PR#180   skipped_issues: 1'))
+                         call('PR#%s %16s: %s', 180, 'added_files', 1),
+                         call('PR#%s %16s: %s', 180, 'added_lines', 1),
+                         call('PR#%s %16s: %s', 180, 'issues', 1),
+                         call('PR#%s %16s: %s', 180, 'skipped_issues', 1))
 
         mock_added_lines.assert_called_with('')
-        mock_get_issues.assert_called_once_with(pfile, pr)
+        mock_get_issues.assert_called_once_with(pfile, pr, ANY, ANY)
         assert_calls(pr.create_review_comment)
         assert_status(farcy, failures=1)
 
@@ -252,8 +710,8 @@ class FarcyHandlePrTest(FarcyBaseTest):
         mock_added_lines.return_value = {16: 16}
         mock_get_issues.return_value = {3: ['Failure on non-modified line.']}
 
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         pfile = mockpfile(patch='', status='added')
         pr.files.return_value = [pfile]
 
@@ -261,35 +719,189 @@ class FarcyHandlePrTest(FarcyBaseTest):
         with patch.object(self.logger, 'info') as mock_info:
             farcy.handle_pr(pr)
             assert_calls(mock_info,
-                         call('Handling PR#180 by Dummy'),
-                         call('PR#180 STATUS: approves! Dummy Approval!'))
+                         call('Handling PR#%s by %s', 180, 'Dummy'),
+                         call('PR#%s STATUS: %s', 180,
+                              'approves! Dummy Approval!'))
 
         mock_added_lines.assert_called_with('')
-        mock_get_issues.assert_called_once_with(pfile, pr)
+        mock_get_issues.assert_called_once_with(pfile, pr, ANY, ANY)
         assert_calls(pr.create_review_comment)
         assert_status(farcy)
 
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__queue(self, mock_get_issues):
+        mock_get_issues.return_value = {}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(patch='@@ -0,0 +1 @@\n+a',
+                                           status='added')]
+
+        farcy = self._farcy_instance()
+        farcy.queue = ReviewQueue(':memory:')
+        farcy.handle_pr(pr)
+        self.assertTrue(farcy.queue.is_reviewed('dummy/dummy', 180, 'dummy'))
+        assert_status(farcy)
+
+        farcy.handle_pr(pr)  # Already reviewed
+        assert_status(farcy)
+        self.assertEqual(1, mock_get_issues.call_count)
+
+        farcy.handle_pr(pr, force=True)
+        self.assertEqual(2, mock_get_issues.call_count)
+
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__queue_failure(self, mock_get_issues):
+        mock_get_issues.return_value = {}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.side_effect = [
+            ConnectionError(Exception('dummy')),
+            [mockpfile(patch='@@ -0,0 +1 @@\n+a', status='added')]]
+
+        farcy = self._farcy_instance()
+        farcy.queue = ReviewQueue(':memory:')
+        self.assertRaises(ConnectionError, farcy.handle_pr, pr)
+        self.assertFalse(farcy.queue.is_reviewed('dummy/dummy', 180, 'dummy'))
+
+        farcy.handle_pr(pr)  # Retried
+        self.assertTrue(farcy.queue.is_reviewed('dummy/dummy', 180, 'dummy'))
+        self.assertEqual(1, mock_get_issues.call_count)
+        assert_calls(farcy.repo.create_status,
+                     call('dummy', 'pending', context='farcy',
+                          description='started investigation'),
+                     call('dummy', 'pending', context='farcy',
+                          description='started investigation'),
+                     call('dummy', 'success', context='farcy',
+                          description='approves! Dummy Approval!'))
+
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__large_pr_uses_diff(self, mock_get_issues):
+        mock_get_issues.return_value = {2: ['Dummy Failure']}
+
+        pr = mockpr(changed_files=2, number=180, state='open',
+                    url='https://api.github.com/repos/a/b/pulls/180',
+                    user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+
+        farcy = self._farcy_instance()
+        farcy.config.large_pr_threshold = 2
+        response = farcy.repo.session.get.return_value
+        response.status_code = 200
+        response.iter_content.return_value = [
+            b'diff --git a/DummyFile b/DummyFile\n',
+            b'@@ -1,1 +1,2 @@\n a\n+b\n']
+        farcy.handle_pr(pr)
+
+        farcy.repo.session.get.assert_called_once_with(
+            pr.url, headers={'Accept': DIFF_MEDIA_TYPE}, stream=True)
+        self.assertFalse(pr.files.called)
+        pfile = mock_get_issues.call_args[0][0]
+        self.assertEqual(('DummyFile', 'modified', 1),
+                         (pfile.filename, pfile.status, pfile.changes_count))
+        pfile.contents()
+        farcy.repo.file_contents.assert_called_with('DummyFile', ref='dummy')
+        assert_calls(pr.create_review_comment, call(
+            '{0}\n* Dummy Failure'.format(FARCY_COMMENT_START),
+            'dummy', 'DummyFile', 2))
+        assert_status(farcy, failures=1)
+        response.close.assert_called_once_with()
+
+    def test_handle_pr__large_pr_diff_unavailable(self):
+        pr = mockpr(changed_files=2, number=180, state='open',
+                    user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(filename='DummyFile',
+                                           status='modified')]
+
+        farcy = self._farcy_instance()
+        farcy.config.large_pr_threshold = 2
+        farcy.repo.session.get.return_value.status_code = 406
+        farcy.handle_pr(pr)
+        assert_status(farcy)
+        self.assertTrue(pr.files.called)
+        farcy.repo.session.get.return_value.close.assert_called_once_with()
+
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__git_mirror(self, mock_get_issues):
+        mock_get_issues.return_value = {}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(
+            filename='a.py', patch='@@ -0,0 +1 @@\n+a', status='added')]
+
+        farcy = self._farcy_instance()
+        farcy.mirror = MagicMock()
+        reader = farcy.mirror.reader.return_value
+        reader.read.return_value = b'a = 1\n'
+        farcy.handle_pr(pr)
+
+        farcy.mirror.fetch_pull_request.assert_called_once_with(180)
+        pfile = mock_get_issues.call_args[0][0]
+        self.assertEqual(b'a = 1\n', pfile.contents().decoded)
+        reader.read.assert_called_with('dummy', 'a.py')
+        self.assertTrue(reader.close.called)
+
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__git_mirror_fetch_failure(self, mock_get_issues):
+        mock_get_issues.return_value = {}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pfile = mockpfile(filename='a.py', patch='@@ -0,0 +1 @@\n+a',
+                          status='added')
+        pr.files.return_value = [pfile]
+
+        farcy = self._farcy_instance()
+        farcy.mirror = MagicMock()
+        farcy.mirror.fetch_pull_request.side_effect = MirrorException('bad')
+        farcy.handle_pr(pr)
+
+        self.assertIs(pfile, mock_get_issues.call_args[0][0])
+        self.assertFalse(farcy.mirror.reader.called)
+        assert_status(farcy)
+
+    @patch('farcy.Farcy.get_issues')
+    def test_handle_pr__perf_log(self, mock_get_issues):
+        mock_get_issues.return_value = {}
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
+        pr.files.return_value = [mockpfile(patch='@@ -0,0 +1 @@\n+a',
+                                           status='added')]
+
+        farcy = self._farcy_instance()
+        with patch.object(farcy.perf_log, 'isEnabledFor', return_value=True):
+            with patch.object(farcy.perf_log, 'info') as mock_info:
+                farcy.handle_pr(pr)
+        record = json.loads(mock_info.call_args[0][0])
+        self.assertEqual(180, record['pr'])
+        self.assertEqual('success', record['state'])
+        self.assertEqual({'added_files': 1, 'added_lines': 1, 'hidden': 0,
+                          'issues': 0}, record['stats'])
+        self.assertEqual(1, record['stages']['get_issues']['calls'])
+        self.assertEqual(2, record['stages']['set_status']['calls'])
+
     def test_handle_pr__success_without_any_changed_files(self):
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         pr.files.return_value = [mockpfile()]
         farcy = self._farcy_instance()
         with patch.object(self.logger, 'info') as mock_info:
             farcy.handle_pr(pr)
             assert_calls(mock_info,
-                         call('Handling PR#180 by Dummy'),
-                         call('PR#180 STATUS: approves! Dummy Approval!'))
+                         call('Handling PR#%s by %s', 180, 'Dummy'),
+                         call('PR#%s STATUS: %s', 180,
+                              'approves! Dummy Approval!'))
         assert_status(farcy)
 
     def test_handle_pr__success_without_files(self):
-        pr = MagicMock(number=180, state='open', user=Struct(login='Dummy'))
-        pr.commits.return_value = [Struct(sha='dummy')]
+        pr = mockpr(number=180, state='open', user=Struct(login='Dummy'))
+        pr.head.sha = 'dummy'
         farcy = self._farcy_instance()
         with patch.object(self.logger, 'info') as mock_info:
             farcy.handle_pr(pr)
             assert_calls(mock_info,
-                         call('Handling PR#180 by Dummy'),
-                         call('PR#180 STATUS: approves! Dummy Approval!'))
+                         call('Handling PR#%s by %s', 180, 'Dummy'),
+                         call('PR#%s STATUS: %s', 180,
+                              'approves! Dummy Approval!'))
         assert_status(farcy)
 
     def test_handle_pr__user_blacklisted(self):
@@ -366,6 +978,30 @@ class FarcyEventCallbackTest(FarcyBaseTest):
         self.assertEqual({'DUMMY_BRANCH': pull_request}, instance.open_prs)
         self.assertFalse(mock_handle_pr.called)
 
+    @patch('farcy.Farcy.handle_pr')
+    def test_PullRequestEvent__edited(self, mock_handle_pr):
+        instance = self._farcy_instance()
+        instance.open_prs = {'DUMMY_BRANCH': None}
+
+        pull_request = Struct(head={'ref': 'DUMMY_BRANCH'}, number=1337)
+        event = Struct(payload={'action': 'edited',
+                                'pull_request': pull_request})
+
+        instance.PullRequestEvent(event)
+        self.assertEqual({'DUMMY_BRANCH': pull_request}, instance.open_prs)
+        self.assertIn(1337, instance._pr_fetched)
+        self.assertFalse(mock_handle_pr.called)
+
+    @patch('farcy.Farcy.handle_pr')
+    def test_PushEvent__head_updated(self, mock_handle_pr):
+        instance = self._farcy_instance()
+        pull_request = Struct(head=Struct(sha='old'), number=1337)
+        instance.open_prs['DUMMY_BRANCH'] = pull_request
+        instance.PushEvent(Struct(payload={'head': 'new',
+                                           'ref': 'refs/heads/DUMMY_BRANCH'}))
+        self.assertEqual('new', pull_request.head.sha)
+        mock_handle_pr.assert_called_with(pull_request)
+
     @patch('farcy.Farcy.handle_pr')
     def test_PushEvent__pr_does_not_exist(self, mock_handle_pr):
         event = Struct(payload={'ref': 'refs/heads/DUMMY_BRANCH'})
@@ -490,8 +1126,8 @@ class FarcyEventTest(FarcyBaseTest):
     @patch('farcy.Farcy.events')
     @patch('farcy.Farcy.PushEvent')
     def test_run(self, mock_callback, mock_events):
-        event1 = Struct(type='PushEvent', uniq=1)
-        event2 = Struct(type='PushEvent', uniq=2)
+        event1 = Struct(id=1, type='PushEvent', uniq=1)
+        event2 = Struct(id=2, type='PushEvent', uniq=2)
         self.assertEqual(event1, event1)
         self.assertNotEqual(event1, event2)
 
@@ -501,6 +1137,118 @@ class FarcyEventTest(FarcyBaseTest):
         assert_calls(mock_callback, call(event1), call(event2))
         mock_callback.assert_called_with(event2)
 
+    @patch('farcy.Recorder')
+    def test_record_file(self, mock_recorder):
+        config = Config(None)
+        config.record_file = 'archive.jsonl'
+        farcy = self._farcy_instance(config=config)
+        self.assertIs(mock_recorder.return_value, farcy.recorder)
+        mock_recorder.assert_called_once_with(
+            'archive.jsonl', 'dummy/dummy', farcy.start_time, None)
+        config.session.session.hooks['response'].append.assert_called_with(
+            mock_recorder.return_value)
+
+    @patch('farcy.CachingAdapter')
+    @patch('farcy.HttpCache')
+    def test_http_cache_file(self, mock_cache, mock_adapter):
+        config = Config(None)
+        config.http_cache_file = 'cache.db'
+        farcy = self._farcy_instance(config=config)
+        self.assertIs(mock_cache.return_value, farcy.http_cache)
+        mock_cache.assert_called_once_with('cache.db')
+        mock_adapter.assert_called_once_with(mock_cache.return_value)
+        config.session.session.mount.assert_called_once_with(
+            'https://', mock_adapter.return_value)
+
+    def _reload_config(self, text):
+        tmpdir = mkdtemp()
+        path = os.path.join(tmpdir, 'farcy.conf')
+        try:
+            with patch.object(Config, 'PATH', path):
+                farcy = self._farcy_instance()
+                handler = MagicMock(config_path=os.devnull)
+                farcy.handlers.append(handler)
+                self.assertFalse(farcy._reload_config())
+                with open(path, 'w') as fp:
+                    fp.write(text)
+                with patch.object(farcy.log, 'warning') as mock_warning, \
+                        patch.object(farcy.log, 'error') as mock_error:
+                    reloaded = farcy._reload_config()
+        finally:
+            rmtree(tmpdir)
+        return farcy, handler, reloaded, mock_warning, mock_error
+
+    def test_reload_config(self):
+        farcy, handler, reloaded, mock_warning, _ = self._reload_config(
+            '[DEFAULT]\nexclude_paths: a/*\nhandler_timeout: 5\n'
+            'queue_file: queue.db\n')
+        self.assertTrue(reloaded)
+        self.assertTrue(farcy.config.exclude_matcher('a/b.py'))
+        self.assertEqual(None, farcy.config.queue_file)
+        mock_warning.assert_called_once_with('Restart farcy to change %s',
+                                             'queue_file')
+        handler.load_config_file.assert_called_once_with()
+        self.assertEqual(5, handler.set_limits.call_args[1]['timeout'])
+
+    def test_set_handler_limits(self):
+        farcy = self._farcy_instance(config=Config(
+            None, handler_concurrency=2, handler_memory_limit=512,
+            handler_timeout=60, handler_rubocop_concurrency=1,
+            handler_rubocop_timeout=600))
+        rubocop = MagicMock()
+        rubocop.name = 'Rubocop'
+        pep257 = MagicMock()
+        pep257.name = 'Pep257'
+        farcy._set_handler_limits(rubocop)
+        farcy._set_handler_limits(pep257)
+        limits = dict(cpu=None, memory=512 * 2 ** 20, niceness=None,
+                      open_files=None, output=None)
+        rubocop.set_limits.assert_called_once_with(concurrency=1,
+                                                   timeout=600, **limits)
+        pep257.set_limits.assert_called_once_with(concurrency=2, timeout=60,
+                                                  **limits)
+
+    def test_reload_config__invalid(self):
+        farcy, handler, reloaded, _, mock_error = self._reload_config(
+            '[DEFAULT]\nexclude_paths: a/*\nlint_workers: many\n')
+        self.assertFalse(reloaded)
+        self.assertEqual(None, farcy.config.exclude_paths)
+        self.assertTrue(mock_error.called)
+        self.assertFalse(handler.set_limits.called)
+
+    @patch('farcy.Farcy.events')
+    @patch('farcy.Farcy.handle_pr')
+    def test_run__resume_reviews(self, mock_handle_pr, mock_events):
+        mock_events.return_value = []
+        farcy = self._farcy_instance()
+        prs = {number: Struct(number=number) for number in (180, 360)}
+        farcy.repo.pull_request.side_effect = prs.get
+        farcy.queue = ReviewQueue(':memory:', owner=exited_owner())
+        farcy.queue.start('dummy/dummy', 180, 'old')
+        farcy.queue.add('dummy/dummy', 360, 'sha')
+        farcy.queue.add('dummy/dummy', 540, 'sha')  # Deleted
+        farcy.queue.finish('dummy/dummy', 720, 'sha', 'success')
+
+        def handle_pr(pr):
+            if pr.number == 360:
+                farcy.queue.finish('dummy/dummy', 360, 'sha', 'success')
+        mock_handle_pr.side_effect = handle_pr
+        farcy.run()
+
+        assert_calls(mock_handle_pr, call(prs[180]), call(prs[360]))
+        self.assertEqual([], farcy.queue.unfinished('dummy/dummy'))
+        self.assertTrue(farcy.queue.is_reviewed('dummy/dummy', 540, 'sha'))
+        self.assertEqual({180, 360}, set(farcy._pr_fetched))
+
+    def test_run__resume_reviews_running_elsewhere(self):
+        farcy = self._farcy_instance()
+        farcy.queue = ReviewQueue(':memory:')  # Owned by this live process
+        farcy.queue.start('dummy/dummy', 180, 'sha')
+        with patch.object(farcy, 'handle_pr') as mock_handle_pr:
+            farcy._resume_reviews()
+        self.assertFalse(mock_handle_pr.called)
+        self.assertFalse(farcy.queue.claim('dummy/dummy', 180, 'sha'))
+
     @patch('farcy.Farcy.handle_pr')
     def test_run__single_pull_request(self, mock_handle_pr):
         farcy = self._farcy_instance()
@@ -515,8 +1263,33 @@ class FarcyEventTest(FarcyBaseTest):
         farcy.repo.pull_request.side_effect = lambda x: x
         farcy.config.pull_requests = '360,180,720'
         farcy.run()
-        assert_calls(mock_handle_pr, call(180, force=True),
-                     call(360, force=True), call(720, force=True))
+        mock_handle_pr.assert_has_calls(
+            [call(180, force=True), call(360, force=True),
+             call(720, force=True)], any_order=True)
+        self.assertEqual(3, mock_handle_pr.call_count)
+        self.assertEqual(3, farcy.backfill.reviewed)
+
+    @patch('farcy.Farcy.events')
+    @patch('farcy.Farcy.handle_pr')
+    def test_run__all_open(self, mock_handle_pr, mock_events):
+        mock_events.return_value = []
+        farcy = self._farcy_instance()
+        now = datetime.now(UTC())
+        for number, age in ((1, 3), (2, 1), (3, 2)):
+            farcy.open_prs['branch{0}'.format(number)] = Struct(
+                head=Struct(sha=str(number)), number=number,
+                updated_at=now - timedelta(days=age))
+        farcy.config.all_open = True
+        farcy.config.backfill_workers = 1
+        farcy.config.updated_since = (now - timedelta(days=2, hours=1)) \
+            .strftime('%Y-%m-%dT%H:%M:%S')
+        farcy.queue = ReviewQueue(':memory:')
+        farcy.run()
+        farcy.backfill.join()
+        self.assertEqual([2, 3], [x[0][0].number for x in
+                                  mock_handle_pr.call_args_list])
+        self.assertEqual([('dummy/dummy', 2, '2'), ('dummy/dummy', 3, '3')],
+                         sorted(farcy.queue.unfinished('dummy/dummy')))
 
 
 class MainTest(unittest.TestCase):
@@ -567,13 +1340,13 @@ class NoHandlerDebugFactory(unittest.TestCase):
         func(self.farcy, '.js')
         func(self.farcy, '.js')
         self.farcy.log.debug.assert_called_once_with(
-            'No handlers for extension .js')
+            'No handlers for extension %s', '.js')
 
     def test_no_handler_factory__output_when_cache_expired(self):
         func = no_handler_debug_factory(0)
         func(self.farcy, '.js')
         func(self.farcy, '.js')
-        calls = [call('No handlers for extension .js')] * 2
+        calls = [call('No handlers for extension %s', '.js')] * 2
         assert_calls(self.farcy.log.debug, *calls)
 
     def test_no_handler_factory__multiple_calls(self):
@@ -581,5 +1354,5 @@ class NoHandlerDebugFactory(unittest.TestCase):
         func(self.farcy, '.js')
         func(self.farcy, '.css')
         assert_calls(self.farcy.log.debug,
-                     call('No handlers for extension .js'),
-                     call('No handlers for extension .css'))
+                     call('No handlers for extension %s', '.js'),
+                     call('No handlers for extension %s', '.css'))
@@ -1,9 +1,17 @@
 """Farcy handlers test file."""
 
 from __future__ import print_function
+from mock import patch
+from shutil import rmtree
+from subprocess import Popen
+from tempfile import mkdtemp
 import os
+import sys
+import threading
 import unittest
-from farcy.exceptions import HandlerException
+from farcy.const import STDIN_DIR
+from farcy.exceptions import HandlerException, HandlerLimitExceeded
+from farcy.timing import ReviewProfile, profiling, timed
 import farcy.handlers
 
 
@@ -71,6 +79,133 @@ class ExtHandlerTest(unittest.TestCase):
                          str(cm.exception))
 
 
+class ExtHandlerExecuteTest(unittest.TestCase):
+
+    """Tests the streamed execution of handler binaries."""
+
+    def setUp(self):
+        cls = type('Python', (farcy.handlers.ExtHandler,), {})
+        cls.BINARY = sys.executable
+        cls.RE = farcy.handlers.Flake8.RE
+        self.handler = cls.__new__(cls)
+        self.handler.name = 'Python'
+        self.handler.set_limits()
+
+    def script(self, source):
+        return [sys.executable, '-c', source]
+
+    def test_apply_limits__exited(self):
+        self.handler.set_limits(niceness=5, open_files=16)
+        process = Popen(self.script('pass'))
+        process.wait()
+        self.handler._apply_limits(process.pid)  # Does not raise
+
+    def test_execute(self):
+        self.assertEqual('a\nb\n', self.handler.execute(
+            self.script('print("a"); print("b"); raise SystemExit(1)')))
+
+    def test_execute__concurrency(self):
+        self.handler.set_limits(concurrency=1)
+        output = self.handler.iter_output(self.script('print("a")'))
+        self.assertEqual('a\n', next(output))
+        self.assertFalse(self.handler._slots.acquire(False))
+        output.close()
+        self.assertTrue(self.handler._slots.acquire(False))
+
+    def test_execute__child_cpu(self):
+        profile = ReviewProfile('a/b', 1)
+
+        def lint(handler, code):
+            with profiling(profile), timed('process', handler):
+                self.handler.execute(self.script(code))
+
+        busy = threading.Thread(target=lint, args=(
+            'Busy', 'import time\nend = time.time() + 0.5\n'
+                    'while time.time() < end: pass'))
+        busy.start()
+        lint('Idle', 'import time; time.sleep(0.5)')
+        busy.join()
+        self.assertLess(0.3, profile.handlers['Busy']['process']['child_cpu'])
+        self.assertGreater(0.2,
+                           profile.handlers['Idle']['process']['child_cpu'])
+        self.assertEqual(profile.child_cpu, profile.record()['child_cpu'])
+
+    def test_execute__cpu_limit(self):
+        self.handler.set_limits(cpu=1)
+        with self.assertRaises(HandlerLimitExceeded) as cm:
+            self.handler.execute(self.script('while True: pass'))
+        self.assertEqual('cpu', cm.exception.limit)
+
+    def test_execute__niceness(self):
+        self.handler.set_limits(niceness=5)
+        niceness = int(self.handler.execute(self.script(
+            'import os; print(os.nice(0))')))
+        self.assertEqual(os.nice(0) + 5, niceness)
+
+    def test_execute__open_files(self):
+        self.handler.set_limits(open_files=16)
+        self.assertEqual('16\n', self.handler.execute(self.script(
+            'import resource; '
+            'print(resource.getrlimit(resource.RLIMIT_NOFILE)[0])')))
+
+    def test_execute__output_limit(self):
+        self.handler.output_limit = 1024
+        with self.assertRaises(HandlerLimitExceeded) as cm:
+            self.handler.execute(self.script(
+                'while True: print("x" * 80)'))
+        self.assertEqual('output', cm.exception.limit)
+
+    def test_execute__stdin(self):
+        contents = b'a' * 2 ** 20
+        self.assertEqual('{0}\n'.format(2 ** 20), self.handler.execute(
+            self.script('import sys; print(len(sys.stdin.read()))'),
+            stdin=contents))
+
+    def test_execute__stdin_unread(self):
+        self.assertEqual('a\n', self.handler.execute(
+            self.script('print("a")'), stdin=b'a' * 2 ** 20))
+
+    def test_execute__timeout(self):
+        self.handler.timeout = 0.2
+        with self.assertRaises(HandlerLimitExceeded) as cm:
+            self.handler.execute(self.script('import time; time.sleep(30)'))
+        self.assertEqual('timeout', cm.exception.limit)
+        self.assertEqual('Python exceeded its time limit of 0.2 seconds',
+                         str(cm.exception))
+
+    def test_regex_parse(self):
+        output = 'a.py:1:1: E1 first\\nnoise\\na.py:12:3: W2 second\\n'
+        retval = self.handler._regex_parse(
+            ['-c', 'import sys; sys.stdout.write("{0}")'.format(output)])
+        self.assertEqual({1: ['1: E1 first'], 12: ['3: W2 second']}, retval)
+
+    def test_regex_parse__lines(self):
+        output = 'a.py:1:1: E1 first\\na.py:12:3: W2 second\\n'
+        retval = self.handler._regex_parse(
+            ['-c', 'import sys; sys.stdout.write("{0}")'.format(output)],
+            lines={12})
+        self.assertEqual({12: ['3: W2 second']}, retval)
+
+    def test_regex_parse__multiple_lines(self):
+        self.handler.RE = farcy.handlers.Pep257.RE
+        self.handler.RE_LINES = farcy.handlers.Pep257.RE_LINES
+        output = ('noise\\na.py:1 at module level:\\n    D100: first\\n'
+                  'a.py:9 in public function `f`:\\n    D103: second\\n')
+        retval = self.handler._regex_parse(
+            ['-c', 'import sys; sys.stdout.write("{0}")'.format(output)])
+        self.assertEqual({1: ['D100: first'], 9: ['D103: second']}, retval)
+
+    @patch('farcy.handlers.PARSE_LINES', 2)
+    def test_regex_parse__multiple_lines_across_chunks(self):
+        self.handler.RE = farcy.handlers.Pep257.RE
+        self.handler.RE_LINES = farcy.handlers.Pep257.RE_LINES
+        output = ('a.py:1 at module level:\\n    D100: first\\nnoise\\n'
+                  'a.py:9 in public function `f`:\\n    D103: second\\n')
+        retval = self.handler._regex_parse(
+            ['-c', 'import sys; sys.stdout.write("{0}")'.format(output)])
+        self.assertEqual({1: ['D100: first'], 9: ['D103: second']}, retval)
+
+
 class FarcyTest(unittest.TestCase):
 
     """Provides helpers for various FarcyTest classes."""
@@ -110,6 +245,23 @@ class ESLintTest(FarcyTest):
         self.assertEqual({3: ['Unexpected console statement. (no-console)']},
                          errors)
 
+    def test_single_error__stdin(self):
+        """Ignore files in the working directory should not apply."""
+        cwd = os.getcwd()
+        tmpdir = mkdtemp()
+        try:
+            with open(os.path.join(tmpdir, '.eslintignore'), 'w') as fp:
+                fp.write('*.js\n')
+            os.chdir(tmpdir)
+            with open(self.path('single_issue.js'), 'rb') as fp:
+                errors = self.linter.process(
+                    os.path.join(STDIN_DIR, 'single_issue.js'), fp.read())
+        finally:
+            os.chdir(cwd)
+            rmtree(tmpdir)
+        self.assertEqual({3: ['Unexpected console statement. (no-console)']},
+                         errors)
+
     def test_invalid_syntax(self):
         """Test an error is returned for correct line when syntax error."""
         errors = self.linter.process(self.path('invalid_syntax.js'))
@@ -136,6 +288,13 @@ class Flake8Test(FarcyTest):
         self.assertEqual({3: ['1: E302 expected 2 blank lines, found 1']},
                          errors)
 
+    def test_single_error__stdin(self):
+        """A single error should be returned for piped contents."""
+        with open(self.path('single_issue.py'), 'rb') as fp:
+            errors = self.process('a/single_issue.py', fp.read())
+        self.assertEqual({3: ['1: E302 expected 2 blank lines, found 1']},
+                         errors)
+
 
 class Pep257Test(FarcyTest):
 
@@ -152,6 +152,120 @@ class PatchFunctionTest(unittest.TestCase):
             self.fail('added_lines() raised AssertionError')
 
 
+class ApiEndpointTest(unittest.TestCase):
+    def test_api_endpoint(self):
+        url = 'https://api.github.com/repos/a/b/pulls/12/files?per_page=100'
+        self.assertEqual('GET /repos/:owner/:repo/pulls/:number/files',
+                         helpers.api_endpoint('GET', url))
+
+    def test_api_endpoint__contents(self):
+        url = 'https://api.github.com/repos/a/b/contents/app/a.rb?ref=master'
+        self.assertEqual('GET /repos/:owner/:repo/contents/:path',
+                         helpers.api_endpoint('GET', url))
+
+    def test_api_endpoint__sha(self):
+        url = 'https://api.github.com/repos/a/b/statuses/{0}'.format('f' * 40)
+        self.assertEqual('POST /repos/:owner/:repo/statuses/:sha',
+                         helpers.api_endpoint('POST', url))
+
+
+class DiffFunctionTest(unittest.TestCase):
+    DIFF = """diff --git a/a.py b/a.py
+index 1111111..2222222 100644
+--- a/a.py
++++ b/a.py
+@@ -1,2 +1,3 @@
+ import os
++++ not a header
+-x = 1
++x = 2
+diff --git a/old.rb b/new.rb
+similarity index 90%
+rename from old.rb
+rename to new.rb
+diff --git a/gone.js b/gone.js
+deleted file mode 100644
+--- a/gone.js
++++ /dev/null
+@@ -1 +0,0 @@
+-var a;
+\\ No newline at end of file
+diff --git a/img.png b/img.png
+Binary files a/img.png and b/img.png differ"""
+
+    def test_decode_lines(self):
+        chunks = [b'first\r', b'\nsec', b'ond\n\nla', b'st']
+        self.assertEqual(['first\r', 'second', '', 'last'],
+                         list(helpers.decode_lines(chunks)))
+
+    def test_decode_lines__trailing_newline(self):
+        self.assertEqual(['a', 'b'], list(helpers.decode_lines([b'a\nb\n'])))
+
+    def test_diff_patches(self):
+        patches = list(helpers.diff_patches(self.DIFF.split('\n')))
+        self.assertEqual([
+            ('a.py', '@@ -1,2 +1,3 @@\n import os\n+++ not a header\n'
+                     '-x = 1\n+x = 2'),
+            ('new.rb', None),
+            ('gone.js', '@@ -1 +0,0 @@\n-var a;\n'
+                        '\\ No newline at end of file'),
+            ('img.png', None)], patches)
+
+    def test_diff_files(self):
+        self.assertEqual(
+            [('a.py', 'modified'), ('new.rb', 'renamed'),
+             ('gone.js', 'removed'), ('img.png', 'modified')],
+            [(filename, status) for filename, status, _
+             in helpers.diff_files(self.DIFF.split('\n'))])
+
+    def test_diff_files__added(self):
+        diff = ['diff --git a/b.py b/b.py', 'new file mode 100644',
+                '--- /dev/null', '+++ b/b.py', '@@ -0,0 +1 @@', '+b = 1']
+        self.assertEqual([('b.py', 'added', '@@ -0,0 +1 @@\n+b = 1')],
+                         list(helpers.diff_files(diff)))
+
+    def test_diff_patches__added_lines(self):
+        patch = dict(helpers.diff_patches(self.DIFF.split('\n')))['a.py']
+        self.assertEqual({2: 2, 3: 4}, helpers.added_lines(patch))
+
+    def test_diff_patches__no_diff(self):
+        self.assertEqual([], list(helpers.diff_patches([])))
+
+    def test_diff_patches__quoted_paths(self):
+        diff = ['diff --git "a/\\303\\274.py" "b/\\303\\274.py"',
+                'new file mode 100644',
+                '--- /dev/null',
+                '+++ "b/\\303\\274.py"',
+                '@@ -0,0 +1 @@',
+                '+b',
+                'diff --git a/old.py "b/n \\303\\274.py"',
+                'rename from old.py',
+                'rename to "n \\303\\274.py"',
+                'diff --git "a/ta\\tb\\"q.png" "b/ta\\tb\\"q.png"',
+                'Binary files /dev/null and "b/ta\\tb\\"q.png" differ']
+        self.assertEqual([('\u00fc.py', '@@ -0,0 +1 @@\n+b'),
+                          ('n \u00fc.py', None), ('ta\tb"q.png', None)],
+                         list(helpers.diff_patches(diff)))
+
+    def test_diff_patches__spaces(self):
+        diff = ['diff --git a/sp ace.py b/sp ace.py',
+                '--- a/sp ace.py\t',
+                '+++ b/sp ace.py\t',
+                '@@ -1 +1,2 @@',
+                ' a',
+                '+e',
+                'diff --git a/n o.png b/n o.png',
+                'Binary files a/n o.png and b/n o.png differ']
+        self.assertEqual([('sp ace.py', '@@ -1 +1,2 @@\n a\n+e'),
+                          ('n o.png', None)],
+                         list(helpers.diff_patches(diff)))
+
+    def test_diff_patches__stripped_context_line(self):
+        diff = ['diff --git a/a b/a', '@@ -1,2 +1,2 @@', '', '-x', '+y']
+        self.assertEqual([('a', '@@ -1,2 +1,2 @@\n \n-x\n+y')],
+                         list(helpers.diff_patches(diff)))
+
+
 class PluralTest(unittest.TestCase):
     def test_plural__with_one__int(self):
         self.assertEqual('1 unit', helpers.plural(1, 'unit'))
@@ -217,3 +331,12 @@ class PromptTest(unittest.TestCase):
         self.assertEqual('hello', helpers.prompt('my message'))
         mock_stdout.write.assert_called_with('my message: ')
         self.assertTrue(mock_stdout.flush.called)
+
+
+class UnquotePathTest(unittest.TestCase):
+    def test_unquote_path(self):
+        self.assertEqual('a\tb"c\\\u00fc.py', helpers.unquote_path(
+            '"a\\tb\\"c\\\\\\303\\274.py"'))
+
+    def test_unquote_path__unquoted(self):
+        self.assertEqual('sp ace.py', helpers.unquote_path('sp ace.py'))
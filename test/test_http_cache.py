@@ -0,0 +1,149 @@
+"""Farcy http_cache test file."""
+
+from __future__ import print_function
+from farcy import http_cache
+from farcy.metrics import HTTP_CACHE_REQUESTS
+from mock import patch
+from requests import Session
+from requests.models import Response
+from shutil import rmtree
+from tempfile import mkdtemp
+import os
+import unittest
+
+API = 'https://api.github.com/repos/a/b'
+
+
+def response(status=200, body=b'', **headers):
+    result = Response()
+    result._content = body
+    result.headers.update(headers)
+    result.status_code = status
+    return result
+
+
+@patch('requests.adapters.HTTPAdapter.send')
+class CachingAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.cache = http_cache.HttpCache(os.path.join(self.tmpdir, 'c.db'))
+        self.session = Session()
+        self.session.mount('https://',
+                           http_cache.CachingAdapter(self.cache))
+
+    def tearDown(self):
+        self.cache.close()
+        rmtree(self.tmpdir)
+
+    def count(self, result):
+        return HTTP_CACHE_REQUESTS.labels(result).value
+
+    def test_send__bypass_conditional_request(self, mock_send):
+        mock_send.return_value = response(304)
+        bypass = self.count('bypass')
+        result = self.session.get(API + '/events',
+                                  headers={'If-None-Match': '"a"'})
+        self.assertEqual(304, result.status_code)
+        self.assertEqual(bypass + 1, self.count('bypass'))
+        self.assertEqual(
+            '"a"', mock_send.call_args[0][0].headers['If-None-Match'])
+
+    def test_send__not_modified(self, mock_send):
+        mock_send.return_value = response(
+            200, b'{"id": 1}', ETag='"a"', **{'Content-Length': '9'})
+        self.assertEqual({'id': 1}, self.session.get(API).json())
+
+        hits = self.count('hit')
+        mock_send.return_value = response(
+            304, ETag='"a"', **{'X-RateLimit-Remaining': '10'})
+        result = self.session.get(API)
+        self.assertEqual('"a"', mock_send.call_args[0][0]
+                         .headers['If-None-Match'])
+        self.assertEqual(200, result.status_code)
+        self.assertEqual({'id': 1}, result.json())
+        self.assertTrue(result.from_cache)
+        self.assertEqual('10', result.headers['X-RateLimit-Remaining'])
+        self.assertNotIn('Content-Length', result.headers)
+        self.assertEqual(hits + 1, self.count('hit'))
+
+    def test_send__modified(self, mock_send):
+        mock_send.return_value = response(200, b'1', ETag='"a"')
+        self.session.get(API)
+        mock_send.return_value = response(200, b'2', ETag='"b"')
+        self.assertEqual(2, self.session.get(API).json())
+        mock_send.return_value = response(304)
+        self.assertEqual(2, self.session.get(API).json())
+        self.assertEqual('"b"', mock_send.call_args[0][0]
+                         .headers['If-None-Match'])
+
+    def test_send__not_cached_without_validator(self, mock_send):
+        mock_send.return_value = response(200, b'1')
+        self.session.get(API)
+        self.session.get(API)
+        self.assertNotIn('If-None-Match', mock_send.call_args[0][0].headers)
+
+    def test_send__write(self, mock_send):
+        mock_send.return_value = response(201, b'{}', ETag='"a"')
+        self.session.post(API + '/statuses/sha', json={})
+        mock_send.return_value = response(200, b'{}')
+        self.session.get(API + '/statuses/sha')
+        self.assertNotIn('If-None-Match', mock_send.call_args[0][0].headers)
+
+    def test_send__per_page(self, mock_send):
+        mock_send.return_value = response(200, b'[]')
+        self.session.get(API + '/pulls/1/files')
+        self.assertEqual(API + '/pulls/1/files?per_page=100',
+                         mock_send.call_args[0][0].url)
+        self.session.get(API + '/pulls/1/files?per_page=30&page=2')
+        self.assertEqual(API + '/pulls/1/files?per_page=30&page=2',
+                         mock_send.call_args[0][0].url)
+        self.session.get(API + '/pulls/1')
+        self.assertEqual(API + '/pulls/1', mock_send.call_args[0][0].url)
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.db')
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def test_get__unknown(self):
+        cache = http_cache.HttpCache(self.path)
+        self.assertEqual(None, cache.get('key'))
+        cache.close()
+
+    def test_set(self):
+        cache = http_cache.HttpCache(self.path)
+        cache.set('key', {'Content-Encoding': 'gzip', 'ETag': '"a"'}, b'body')
+        cache.close()
+
+        cache = http_cache.HttpCache(self.path)
+        headers, body = cache.get('key')
+        cache.close()
+        self.assertEqual(b'body', body)
+        self.assertEqual({'ETag': '"a"'}, dict(headers))
+        self.assertEqual('"a"', headers['etag'])
+
+    def test_prune(self):
+        cache = http_cache.HttpCache(self.path)
+        for used, key in enumerate(('a', 'b', 'c')):
+            with patch('time.time', return_value=used):
+                cache.set(key, {}, b'')
+        with patch('time.time', return_value=3):
+            cache.get('a')
+        cache.close()
+
+        cache = http_cache.HttpCache(self.path, max_entries=2)
+        self.assertEqual(None, cache.get('b'))
+        self.assertNotEqual(None, cache.get('a'))
+        self.assertNotEqual(None, cache.get('c'))
+        cache.close()
+
+
+class WithMaxPageSizeTest(unittest.TestCase):
+    def test_with_max_page_size(self):
+        self.assertEqual(API + '/pulls?state=open&per_page=100',
+                         http_cache.with_max_page_size(
+                             API + '/pulls?state=open'))
@@ -0,0 +1,145 @@
+"""Farcy jobs test file."""
+
+from __future__ import print_function
+from farcy.jobs import ReviewQueue
+from mock import patch
+from shutil import rmtree
+from tempfile import mkdtemp
+import os
+import sqlite3
+import threading
+import unittest
+from .helper import exited_owner
+
+
+class ReviewQueueTest(unittest.TestCase):
+    JOB = ('a/b', 1, 'f' * 40)
+
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'queue.db')
+        self.queue = ReviewQueue(self.path)
+
+    def tearDown(self):
+        self.queue.close()
+        rmtree(self.tmpdir)
+
+    def test_add(self):
+        self.queue.add(*self.JOB)
+        self.queue.add(*self.JOB)
+        self.assertFalse(self.queue.is_reviewed(*self.JOB))
+        self.assertEqual([self.JOB], self.queue.unfinished('a/b'))
+
+    def test_claim(self):
+        self.assertTrue(self.queue.claim(*self.JOB))
+        self.assertFalse(self.queue.claim(*self.JOB))  # Running
+        self.queue.finish(*self.JOB, state='success')
+        self.assertFalse(self.queue.claim(*self.JOB))
+
+    def test_claim__pending(self):
+        self.queue.add(*self.JOB)
+        self.assertTrue(self.queue.claim(*self.JOB))
+        self.assertFalse(self.queue.claim(*self.JOB))
+
+    def test_claim__processes(self):
+        other = ReviewQueue(self.path)
+        try:
+            self.queue.add(*self.JOB)
+            self.assertTrue(other.claim(*self.JOB))
+            self.assertFalse(self.queue.claim(*self.JOB))
+        finally:
+            other.close()
+
+    def test_claim__threads(self):
+        claimed = []
+        threads = [threading.Thread(
+            target=lambda: claimed.append(self.queue.claim(*self.JOB)))
+            for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, claimed.count(True))
+
+    def test_finish(self):
+        self.queue.start(*self.JOB)
+        self.queue.finish(*self.JOB, state='failure')
+        self.assertTrue(self.queue.is_reviewed(*self.JOB))
+        self.assertEqual([], self.queue.unfinished('a/b'))
+
+    def test_is_reviewed__unknown(self):
+        self.assertFalse(self.queue.is_reviewed(*self.JOB))
+
+    def test_release(self):
+        self.assertTrue(self.queue.claim(*self.JOB))
+        self.queue.release(*self.JOB)
+        self.assertFalse(self.queue.is_reviewed(*self.JOB))
+        self.assertTrue(self.queue.claim(*self.JOB))
+
+    def test_threads(self):
+        def review(number):
+            self.queue.start('a/b', number, 'sha')
+            self.queue.finish('a/b', number, 'sha', 'success')
+        threads = [threading.Thread(target=review, args=(number,))
+                   for number in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(self.queue.is_reviewed('a/b', number, 'sha')
+                            for number in range(20)))
+
+    def test_unfinished__after_restart(self):
+        self.queue.close()
+        self.queue = ReviewQueue(self.path, owner=exited_owner())
+        self.queue.start(*self.JOB)
+        self.queue.start('a/b', 2, 'e' * 40)
+        self.queue.finish('a/b', 2, 'e' * 40, 'success')
+        self.queue.start('c/d', 3, 'd' * 40)
+        self.queue.close()
+
+        self.queue = ReviewQueue(self.path)
+        self.assertEqual([self.JOB], self.queue.unfinished('a/b'))
+        self.assertTrue(self.queue.is_reviewed('a/b', 2, 'e' * 40))
+        self.assertTrue(self.queue.claim(*self.JOB))
+
+    def test_unfinished__running_in_other_process(self):
+        other = ReviewQueue(self.path)  # A live process of this host
+        try:
+            self.assertTrue(other.claim(*self.JOB))
+            self.assertEqual([], self.queue.unfinished('a/b'))
+            self.assertFalse(self.queue.claim(*self.JOB))
+        finally:
+            other.close()
+
+    def test_unfinished__running_on_other_host(self):
+        other = ReviewQueue(self.path, owner='elsewhere:1')
+        try:
+            self.assertTrue(other.claim(*self.JOB))
+            self.assertEqual([], self.queue.unfinished('a/b'))
+            with patch('farcy.jobs.LEASE_SECONDS', -1):
+                self.assertEqual([self.JOB], self.queue.unfinished('a/b'))
+        finally:
+            other.close()
+
+    def test_unfinished__without_owner(self):
+        self.queue.close()
+        os.remove(self.path)
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            'CREATE TABLE reviews (repository TEXT NOT NULL, number INTEGER '
+            'NOT NULL, sha TEXT NOT NULL, state TEXT NOT NULL, updated REAL '
+            'NOT NULL, PRIMARY KEY (repository, number, sha))')
+        connection.execute(
+            "INSERT INTO reviews VALUES (?, ?, ?, 'running', 0)", self.JOB)
+        connection.commit()
+        connection.close()
+
+        self.queue = ReviewQueue(self.path)
+        self.assertEqual([self.JOB], self.queue.unfinished('a/b'))
+        self.queue.finish(*self.JOB, state='success')
+        self.assertTrue(self.queue.is_reviewed(*self.JOB))
+
+    def test_wal(self):
+        self.assertEqual(('wal',), self.queue._connection.execute(
+            'PRAGMA journal_mode').fetchone())
@@ -0,0 +1,135 @@
+"""Farcy local test file."""
+
+from __future__ import print_function
+from farcy import Config, local
+from farcy.exceptions import FarcyException
+from io import StringIO
+from mock import patch
+from shutil import rmtree
+from subprocess import check_call
+from tempfile import mkdtemp
+import logging
+import os
+import unittest
+
+GIT_ENV = {'GIT_AUTHOR_EMAIL': 'a@b', 'GIT_AUTHOR_NAME': 'a',
+           'GIT_COMMITTER_EMAIL': 'a@b', 'GIT_COMMITTER_NAME': 'a'}
+
+
+class LocalFileTest(unittest.TestCase):
+    def test_counts(self):
+        pfile = local.LocalFile('a.py', '@@ -1,2 +1,2 @@\n-a\n+b\n+c\n d',
+                                'modified', None, 'sha')
+        self.assertEqual(2, pfile.additions_count)
+        self.assertEqual(3, pfile.changes_count)
+
+
+class LocalReviewTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.cwd = os.getcwd()
+        self.tmpdir = mkdtemp()
+        os.chdir(self.tmpdir)
+        self.env = patch.dict(os.environ, GIT_ENV)
+        self.env.start()
+        self.commit('base', {'old.py': 'x = 1\n', 'gone.py': 'y = 1\n'})
+        self.commit('head', {'new.py': 'import os\nimport sys\n',
+                             'old.py': 'x = 1\nx = 2\n'}, ['gone.py'])
+
+    def tearDown(self):
+        self.env.stop()
+        os.chdir(self.cwd)
+        rmtree(self.tmpdir)
+
+    def commit(self, message, files, removed=()):
+        if not os.path.isdir('.git'):
+            check_call(['git', 'init', '--quiet'])
+        for path, text in files.items():
+            with open(path, 'w') as fp:
+                fp.write(text)
+        check_call(['git', 'add', '--all'])
+        if removed:
+            check_call(['git', 'rm', '--quiet', '--'] + list(removed))
+        check_call(['git', 'commit', '--quiet', '-m', message])
+
+    @patch('farcy.objects.get_session')
+    @patch('farcy.local.LocalReview.get_issues')
+    def test_review(self, mock_get_issues, mock_get_session):
+        files = {}
+
+        def get_issues(pfile, pr, stats, lines):
+            files[pfile.filename] = (pfile.status, pfile.contents().decoded)
+            return {1: ['Unused import'], 2: ['Unused import']} \
+                if pfile.filename == 'new.py' else {1: ['Unchanged line']}
+
+        mock_get_issues.side_effect = get_issues
+        out = StringIO()
+        with patch('sys.stderr', StringIO()) as err:
+            state = local.LocalReview(Config(None)).review('HEAD~1..HEAD',
+                                                           out)
+        self.assertEqual('failure', state)
+        self.assertEqual('new.py:1:\n* Unused import <sub>2x spanning 2 '
+                         'lines</sub>\n', out.getvalue())
+        self.assertEqual('found 2 issues\n', err.getvalue())
+        self.assertEqual({'new.py': ('added', b'import os\nimport sys\n'),
+                          'old.py': ('modified', b'x = 1\nx = 2\n')}, files)
+        self.assertFalse(mock_get_session.called)
+
+    @patch('farcy.local.LocalReview.get_issues')
+    def test_review__special_filenames(self, mock_get_issues):
+        names = ['sp ace.py', '\u00fc.py', 'ta\tb"q.py']
+        self.commit('special', {name: 'z = 1\n' for name in names})
+        files = {}
+
+        def get_issues(pfile, pr, stats, lines):
+            files[pfile.filename] = (pfile.status, pfile.contents().decoded)
+            return {}
+
+        mock_get_issues.side_effect = get_issues
+        with patch('sys.stderr', StringIO()):
+            state = local.LocalReview(Config(None)).review('HEAD~1..HEAD',
+                                                           StringIO())
+        self.assertEqual('success', state)
+        self.assertEqual({name: ('added', b'z = 1\n') for name in names},
+                         files)
+
+    @patch('farcy.local.LocalReview.get_issues')
+    def test_review__handler_exception(self, mock_get_issues):
+        mock_get_issues.side_effect = Exception()
+        with patch('sys.stderr', StringIO()) as err:
+            state = local.LocalReview(Config(None)).review('HEAD~1..HEAD',
+                                                           StringIO())
+        self.assertEqual('error', state)
+        self.assertEqual(2, local.EXIT_STATUSES[state])
+        self.assertEqual('encountered an exception in handler. Check log.\n',
+                         err.getvalue())
+
+    @patch('farcy.local.LocalReview.get_issues')
+    def test_review__type_change(self, mock_get_issues):
+        os.symlink('old.py', 'link.py')
+        self.commit('link', {})
+        os.remove('link.py')
+        self.commit('type', {'link.py': 'b = 2\n', 'zz.py': 'c = 3\n'})
+        patches = {}
+
+        def get_issues(pfile, pr, stats, lines):
+            patches[pfile.filename] = pfile.patch
+            return {}
+
+        mock_get_issues.side_effect = get_issues
+        with patch('sys.stderr', StringIO()):
+            local.LocalReview(Config(None)).review('HEAD~1..HEAD', StringIO())
+        self.assertEqual({'link.py': '@@ -0,0 +1 @@\n+b = 2',
+                          'zz.py': '@@ -0,0 +1 @@\n+c = 3'}, patches)
+
+    def test_review__invalid_range(self):
+        with patch('sys.stderr', StringIO()):
+            self.assertRaises(FarcyException,
+                              local.LocalReview(Config(None)).review,
+                              'HEAD~1..missing')
+
+    def test_split_range(self):
+        self.assertEqual(('a', 'b'), local.split_range('a..b'))
+        self.assertEqual(('a', 'b'), local.split_range('a...b'))
+        self.assertEqual(('a', 'HEAD'), local.split_range('a..'))
+        self.assertEqual(('a', 'HEAD'), local.split_range('a'))
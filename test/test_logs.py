@@ -0,0 +1,91 @@
+"""Farcy logs test file."""
+
+from __future__ import print_function
+from farcy import logs
+from io import StringIO
+from timeit import default_timer
+import json
+import logging
+import time
+import unittest
+
+
+class Formatted(object):
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return 'formatted'
+
+
+class SlowStream(StringIO):
+    def write(self, text):
+        time.sleep(0.05)
+        return StringIO.write(self, text)
+
+
+class LogsTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.NOTSET)  # Other tests disable logging
+        self.logger = logging.getLogger('farcy.test_logs')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.saved_handlers = self.logger.handlers[:]
+        self.logger.handlers = []  # Such as those capturing records
+
+    def tearDown(self):
+        logs.stop(self.logger)
+        self.logger.handlers = self.saved_handlers
+
+    def test_configure(self):
+        stream = StringIO()
+        logs.configure(self.logger, stream=stream)
+        self.logger.info('PR#%s %s', 1, 'reviewed')
+        logs.stop(self.logger)
+        self.assertTrue(stream.getvalue().endswith(
+            '    INFO PR#1 reviewed\n'))
+
+    def test_configure__json(self):
+        stream = StringIO()
+        logs.configure(self.logger, json_output=True, stream=stream)
+        try:
+            raise ValueError('bad')
+        except ValueError:
+            self.logger.exception('Failed %s', 'PR#1')
+        logs.stop(self.logger)
+        record = json.loads(stream.getvalue())
+        self.assertEqual('ERROR', record['level'])
+        self.assertEqual('farcy.test_logs', record['logger'])
+        self.assertEqual('Failed PR#1', record['message'])
+        self.assertIn('ValueError: bad', record['exception'])
+
+    def test_configure__lazy(self):
+        argument = Formatted()
+        stream = StringIO()
+        logs.configure(self.logger, stream=stream)
+        self.logger.debug('%s', argument)
+        self.logger.info('%s', argument)
+        logs.stop(self.logger)
+        self.assertEqual(1, argument.count)
+        self.assertIn('formatted', stream.getvalue())
+
+    def test_configure__replaces_handler(self):
+        first, second = StringIO(), StringIO()
+        logs.configure(self.logger, stream=first)
+        logs.configure(self.logger, stream=second)
+        self.logger.info('message')
+        logs.stop(self.logger)
+        self.assertEqual([], self.logger.handlers)
+        self.assertEqual('', first.getvalue())
+        self.assertEqual(1, second.getvalue().count('message'))
+
+    def test_configure__slow_stream(self):
+        stream = SlowStream()
+        logs.configure(self.logger, stream=stream)
+        start = default_timer()
+        for index in range(10):
+            self.logger.info('message %d', index)
+        self.assertLess(default_timer() - start, 0.25)
+        logs.stop(self.logger)
+        self.assertEqual(10, stream.getvalue().count('message'))
@@ -0,0 +1,92 @@
+"""Farcy metrics test file."""
+
+from __future__ import print_function
+from farcy import metrics
+import unittest
+from .helper import Struct
+
+try:
+    from urllib.request import urlopen  # PY3
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import HTTPError, urlopen  # PY2
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter(self):
+        counter = self.registry.add(metrics.Counter(
+            'dummy_total', 'Dummy counter.', ['type']))
+        counter.labels('a').inc()
+        counter.labels('b').inc(2)
+        counter.labels('a').inc()
+        self.assertEqual('# HELP dummy_total Dummy counter.\n'
+                         '# TYPE dummy_total counter\n'
+                         'dummy_total{type="a"} 2\n'
+                         'dummy_total{type="b"} 2\n',
+                         self.registry.exposition())
+
+    def test_gauge__unlabeled(self):
+        gauge = self.registry.add(metrics.Gauge('dummy', 'Dummy gauge.'))
+        gauge.set(5)
+        gauge.set(3)
+        self.assertIn('\ndummy 3\n', self.registry.exposition())
+
+    def test_histogram(self):
+        histogram = self.registry.add(metrics.Histogram(
+            'dummy_seconds', 'Dummy histogram.', buckets=[1, 5]))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual('# HELP dummy_seconds Dummy histogram.\n'
+                         '# TYPE dummy_seconds histogram\n'
+                         'dummy_seconds_bucket{le="1"} 2\n'
+                         'dummy_seconds_bucket{le="5"} 3\n'
+                         'dummy_seconds_bucket{le="+Inf"} 4\n'
+                         'dummy_seconds_sum 14.5\n'
+                         'dummy_seconds_count 4\n',
+                         self.registry.exposition())
+
+    def test_labels__escaped(self):
+        counter = self.registry.add(metrics.Counter('d', 'D.', ['name']))
+        counter.labels('a"b\\c\nd').inc()
+        self.assertIn('d{name="a\\"b\\\\c\\nd"} 1',
+                      self.registry.exposition())
+
+    def test_labels__wrong_count(self):
+        counter = metrics.Counter('dummy_total', 'Dummy.', ['a', 'b'])
+        self.assertRaises(ValueError, counter.labels, 'a')
+
+    def test_metric__untyped(self):
+        metric = self.registry.add(metrics.Metric('dummy', 'Dummy.', ['a']))
+        metric.labels('b').set(3)
+        self.assertEqual('# HELP dummy Dummy.\n'
+                         '# TYPE dummy untyped\n'
+                         'dummy{a="b"} 3\n',
+                         self.registry.exposition())
+
+    def test_observe_api_response(self):
+        calls = metrics.API_CALLS.labels('GET /repos/:owner/:repo').value
+        response = Struct(headers={'X-RateLimit-Remaining': '4999'},
+                          request=Struct(method='GET', url='https://api.'
+                                         'github.com/repos/a/b'))
+        metrics.observe_api_response(response)
+        self.assertEqual(
+            calls + 1, metrics.API_CALLS.labels('GET /repos/:owner/:repo')
+            .value)
+        self.assertEqual(4999, metrics.RATE_LIMIT_REMAINING.labels().value)
+
+    def test_server(self):
+        self.registry.add(metrics.Counter('dummy_total', 'Dummy.')).inc()
+        server = metrics.start_server(0, registry=self.registry)
+        try:
+            url = 'http://127.0.0.1:{0}'.format(server.server_port)
+            response = urlopen(url + '/metrics')
+            self.assertEqual(metrics.CONTENT_TYPE,
+                             response.headers['Content-Type'])
+            self.assertIn(b'\ndummy_total 1\n', response.read())
+            self.assertRaises(HTTPError, urlopen, url + '/other')
+        finally:
+            server.shutdown()
+            server.server_close()
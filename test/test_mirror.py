@@ -0,0 +1,98 @@
+"""Farcy mirror test file."""
+
+from __future__ import print_function
+from farcy.exceptions import MirrorException
+from farcy.mirror import GitMirror
+from mock import patch
+from shutil import rmtree
+from subprocess import TimeoutExpired, check_output
+from tempfile import mkdtemp
+import os
+import unittest
+
+
+class GitMirrorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.origin = os.path.join(self.tmpdir, 'origin')
+        self.git('init', '--quiet', self.origin)
+        self.head = self.commit({'a.py': b'a = 1\n', 'lib/b.rb': b'b = 2\n'})
+        self.git('-C', self.origin, 'update-ref', 'refs/pull/1/head',
+                 self.head)
+        self.mirror = GitMirror(os.path.join(self.tmpdir, 'mirror.git'),
+                                self.origin)
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def commit(self, files):
+        for path, data in files.items():
+            path = os.path.join(self.origin, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as fp:
+                fp.write(data)
+        self.git('-C', self.origin, 'add', '.')
+        self.git('-C', self.origin, '-c', 'user.name=farcy', '-c',
+                 'user.email=farcy@example.com', 'commit', '--quiet', '-m',
+                 'dummy')
+        return self.git('-C', self.origin, 'rev-parse', 'HEAD').strip()
+
+    def git(self, *args):
+        return check_output(('git',) + args).decode('utf-8')
+
+    def test_ensure__idempotent(self):
+        self.mirror.ensure()
+        self.mirror.ensure()
+        self.assertTrue(os.path.isfile(os.path.join(self.mirror.path,
+                                                    'HEAD')))
+
+    def test_fetch(self):
+        self.mirror.ensure()
+        self.mirror.fetch()
+        self.assertIn('refs/pull/1/head', self.git(
+            '--git-dir', self.mirror.path, 'show-ref'))
+
+    def test_fetch__invalid_remote(self):
+        self.mirror.url = os.path.join(self.tmpdir, 'missing')
+        self.mirror.ensure()
+        self.assertRaises(MirrorException, self.mirror.fetch_pull_request, 1)
+
+    @patch('farcy.mirror.check_output')
+    def test_fetch__timeout(self, mock_check_output):
+        mock_check_output.side_effect = TimeoutExpired(['git', 'fetch'], 300)
+        with self.assertRaises(MirrorException) as cm:
+            self.mirror.fetch()
+        self.assertEqual("git fetch failed: Command '['git', 'fetch']' timed "
+                         "out after 300 seconds", str(cm.exception))
+        kwargs = mock_check_output.call_args[1]
+        self.assertEqual('0', kwargs['env']['GIT_TERMINAL_PROMPT'])
+        self.assertEqual(GitMirror.TIMEOUT, kwargs['timeout'])
+
+    def test_fetch_pull_request__incremental(self):
+        self.mirror.ensure()
+        self.mirror.fetch_pull_request(1)
+        head = self.commit({'a.py': b'a = 3\n'})
+        self.git('-C', self.origin, 'update-ref', 'refs/pull/1/head', head)
+        self.mirror.fetch_pull_request(1)
+        with self.mirror.reader() as reader:
+            self.assertEqual(b'a = 1\n', reader.read(self.head, 'a.py'))
+            self.assertEqual(b'a = 3\n', reader.read(head, 'a.py'))
+
+    def test_reader(self):
+        self.mirror.ensure()
+        self.mirror.fetch_pull_request(1)
+        with self.mirror.reader() as reader:
+            self.assertEqual(b'a = 1\n', reader.read(self.head, 'a.py'))
+            self.assertEqual(None, reader.read(self.head, 'missing.py'))
+            self.assertEqual(None, reader.read(self.head, 'lib'))
+            self.assertEqual(b'b = 2\n', reader.read(self.head, 'lib/b.rb'))
+            self.assertEqual(None, reader.read('f' * 40, 'a.py'))
+
+    def test_reader__exists(self):
+        self.mirror.ensure()
+        self.mirror.fetch_pull_request(1)
+        with self.mirror.reader() as reader:
+            self.assertTrue(reader.exists(self.head))
+            self.assertFalse(reader.exists('f' * 40))
+            self.assertEqual(b'a = 1\n', reader.read(self.head, 'a.py'))
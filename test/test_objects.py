@@ -2,7 +2,12 @@
 
 from __future__ import print_function
 from farcy import objects
-from mock import patch
+from fnmatch import fnmatch
+from mock import MagicMock, patch
+from shutil import rmtree
+from tempfile import mkdtemp
+import os
+import tracemalloc
 import unittest
 import farcy.exceptions as exceptions
 from .helper import Struct
@@ -81,13 +86,37 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(1337, config.start_event)
         self.assertEqual({'bboe'}, config.limit_users)
 
+    @patch('os.path.isfile')
+    def test_config__exclude_matcher(self, mock_is_file):
+        mock_is_file.return_value = False
+        config = objects.Config('a/b')
+        self.assertEqual(None, config.exclude_matcher)
+        config.exclude_paths = 'vendor/*'
+        matcher = config.exclude_matcher
+        self.assertTrue(matcher('vendor/a.rb'))
+        self.assertIs(matcher, config.exclude_matcher)
+        config.exclude_paths = 'lib/*'
+        self.assertFalse(config.exclude_matcher('vendor/a.rb'))
+
     def test_config__repr(self):
         config = self._config_instance(None, repo='a/b')
-        repr_str = ("Config('a/b', comment_group_threshold=3, debug=False, "
+        repr_str = ("Config('a/b', all_open=False, backfill_workers=4, "
+                    "comment_group_threshold=3, debug=False, "
                     "exclude_paths=None, exclude_users=None, "
-                    "limit_users=None, log_level='ERROR', "
+                    "git_mirror_dir=None, handler_concurrency=None, "
+                    "handler_costs_file=None, handler_cpu_limit=None, "
+                    "handler_memory_limit=None, "
+                    "handler_niceness=None, handler_open_files=None, "
+                    "handler_output_limit=None, handler_timeout=None, "
+                    "http_cache_file=None, large_pr_threshold=None, "
+                    "limit_users=None, lint_workers=1, log_json=False, "
+                    "log_level='ERROR', max_file_changes=None, "
+                    "max_patch_size=None, metrics_port=None, perf_log=False, "
                     "pr_issue_report_limit=128, pull_requests=None, "
-                    "start_event=None)")
+                    "queue_file=None, record_file=None, "
+                    "skip_generated=True, start_event=None, "
+                    "stop_at_comment_limit=False, trace_file=None, "
+                    "updated_since=None)")
         self.assertEqual(repr_str, repr(config))
 
     def test_default_repo_from_config(self):
@@ -122,6 +151,54 @@ class ConfigTest(unittest.TestCase):
         with self.assertRaises(exceptions.FarcyException):
             config.limit_users = ['b']
 
+    def test_handler_limit(self):
+        tmpdir = mkdtemp()
+        path = os.path.join(tmpdir, 'farcy.conf')
+        with open(path, 'w') as fp:
+            fp.write('[DEFAULT]\nhandler_timeout: 60\n'
+                     'handler_rubocop_timeout: 600\n'
+                     'handler_pep257_cpu_limit: 5\n')
+        with patch.object(objects.Config, 'PATH', path):
+            config = objects.Config('a/b')
+        rmtree(tmpdir)
+        self.assertEqual(600, config.handler_limit('Rubocop', 'timeout'))
+        self.assertEqual(60, config.handler_limit('Pep257', 'timeout'))
+        self.assertEqual(5, config.handler_limit('Pep257', 'cpu_limit'))
+        self.assertEqual(None, config.handler_limit('Rubocop', 'cpu_limit'))
+
+    def test_reloaded(self):
+        tmpdir = mkdtemp()
+        path = os.path.join(tmpdir, 'farcy.conf')
+        with open(path, 'w') as fp:
+            fp.write('[DEFAULT]\nexclude_paths: a/*\nlimit_users: bob\n')
+        with patch.object(objects.Config, 'PATH', path):
+            config = objects.Config('a/b', limit_users='alice')
+            config._session = session = object()
+            with open(path, 'w') as fp:
+                fp.write('[DEFAULT]\nexclude_paths: b/*\n')
+            reloaded = config.reloaded()
+        rmtree(tmpdir)
+        self.assertEqual({'a/*'}, config.exclude_paths)
+        self.assertEqual({'b/*'}, reloaded.exclude_paths)
+        self.assertEqual({'alice'}, reloaded.limit_users)
+        self.assertEqual('a/b', reloaded.repository)
+        self.assertIs(session, reloaded._session)
+
+    def test_reloaded__invalid(self):
+        tmpdir = mkdtemp()
+        path = os.path.join(tmpdir, 'farcy.conf')
+        with patch.object(objects.Config, 'PATH', path):
+            config = objects.Config('a/b')
+            with open(path, 'w') as fp:
+                fp.write('[DEFAULT]\nlint_workers: many\n')
+            with self.assertRaises(exceptions.FarcyException):
+                config.reloaded()
+            with open(path, 'w') as fp:
+                fp.write('lint_workers = 2\n')
+            with self.assertRaises(exceptions.FarcyException):
+                config.reloaded()
+        rmtree(tmpdir)
+
     def test_setting_repo(self):
         config = self._config_instance(None, repo='a/b')
         self.assertEqual('a/b', config.repository)
@@ -201,6 +278,27 @@ class ErrorMessageTest(unittest.TestCase):
     def test_messages__no_messages(self):
         self.assertEqual([], list(self.message.messages()))
 
+    def test_messages__line_moved_to_github(self):
+        self.add_lines(False, 1, 3, 5)
+        self.assertEqual([(1, 'Dummy Message <sub>3x spanning 5 lines</sub>')],
+                         list(self.message.messages()))
+        self.add_lines(True, 3)
+        self.assertEqual([(1, 'Dummy Message'), (5, 'Dummy Message')],
+                         list(self.message.messages()))
+
+    def test_messages__single_line_tracked_again(self):
+        self.add_lines(False, 5)
+        self.assertEqual([(5, 'Dummy Message')], list(self.message.messages()))
+        self.add_lines(False, 4, 5)
+        self.assertEqual([(4, 'Dummy Message <sub>2x spanning 2 lines</sub>')],
+                         list(self.message.messages()))
+
+    def test_messages__unordered_lines(self):
+        self.add_lines(False, 10, 1, 11, 2, 1)
+        grouped = 'Dummy Message <sub>2x spanning 2 lines</sub>'
+        self.assertEqual([(1, grouped), (10, grouped)],
+                         list(self.message.messages()))
+
     def test_track__return_value(self):
         self.assertEqual(self.message, self.message.track(16))
 
@@ -208,6 +306,156 @@ class ErrorMessageTest(unittest.TestCase):
         self.assertEqual(self.message, self.message.track_group(16, 2))
 
 
+class FileWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'a.conf')
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def write(self, text):
+        with open(self.path, 'w') as fp:
+            fp.write(text)
+
+    def test_changed(self):
+        watcher = objects.FileWatcher([self.path])
+        self.assertEqual([], watcher.changed())
+        self.write('a')
+        self.assertEqual([self.path], watcher.changed())
+        self.assertEqual([], watcher.changed())
+        self.write('ab')
+        self.assertEqual([self.path], watcher.changed())
+        os.remove(self.path)
+        self.assertEqual([self.path], watcher.changed())
+        self.assertEqual([], watcher.changed())
+
+    def test_changed__replaced(self):
+        self.write('a')
+        watcher = objects.FileWatcher([self.path])
+        other = os.path.join(self.tmpdir, 'b.conf')
+        with open(other, 'w') as fp:
+            fp.write('b')
+        stat = os.stat(self.path)
+        os.utime(other, (stat.st_atime, stat.st_mtime))
+        os.rename(other, self.path)
+        self.assertEqual([self.path], watcher.changed())
+
+
+class GitAttributesTest(unittest.TestCase):
+    TEXT = """# Comment
+*.js linguist-generated=true
+/app/*.js -linguist-generated
+app/legacy/*.js linguist-generated
+docs/** linguist-documentation
+vendor/** linguist-vendored
+vendor/ours/* !linguist-vendored
+"""
+
+    def setUp(self):
+        self.attributes = objects.GitAttributes(self.TEXT)
+
+    def test_get__any_directory(self):
+        self.assertTrue(self.attributes.get('a.js', 'linguist-generated'))
+        self.assertTrue(self.attributes.get('lib/a/b.js',
+                                            'linguist-generated'))
+
+    def test_get__last_match_wins(self):
+        self.assertFalse(self.attributes.get('app/a.js',
+                                             'linguist-generated'))
+        self.assertTrue(self.attributes.get('app/legacy/a.js',
+                                            'linguist-generated'))
+        self.assertEqual(None, self.attributes.get('vendor/ours/a.rb',
+                                                   'linguist-vendored'))
+
+    def test_get__unspecified(self):
+        self.assertEqual(None, self.attributes.get('a.py',
+                                                   'linguist-generated'))
+        self.assertEqual(None, objects.GitAttributes().get(
+            'a.py', 'linguist-generated'))
+
+    def test_get__vendored(self):
+        self.assertTrue(self.attributes.get('vendor/a/b.rb',
+                                            'linguist-vendored'))
+        self.assertEqual(None, self.attributes.get('vendor/a/b.rb',
+                                                   'linguist-generated'))
+
+
+class GroupLinesTest(unittest.TestCase):
+    LINES = [1, 2, 4, 8, 9, 20, 24]
+    EXPECTED = [(1, 3, 4), (8, 2, 9), (20, 1, 20), (24, 1, 24)]
+
+    def test_group_lines(self):
+        self.assertEqual(self.EXPECTED, objects.group_lines(self.LINES, 2))
+
+    def test_group_lines__empty(self):
+        self.assertEqual([], objects.group_lines([], 2))
+
+    def test_group_lines__single(self):
+        self.assertEqual([(7, 1, 7)], objects.group_lines([7], 2))
+
+    @unittest.skipIf(objects.numpy is None, 'numpy is not installed')
+    @patch('farcy.objects.NUMPY_GROUP_MIN_LINES', 1)
+    def test_group_lines__numpy(self):
+        self.assertEqual(self.EXPECTED, objects.group_lines(self.LINES, 2))
+
+    @patch('farcy.objects.numpy', None)
+    def test_group_lines__without_numpy(self):
+        lines = list(range(0, 10000, 3))
+        self.assertEqual([(0, len(lines), 9999)],
+                         objects.group_lines(lines, 3))
+
+
+class DiffFileTest(unittest.TestCase):
+    def test_diff_file(self):
+        repo = MagicMock()
+        pfile = objects.DiffFile('a.py', '@@ -1,2 +1,2 @@\n-a\n+b\n+c\n d',
+                                 'modified', repo, 'dummy')
+        self.assertEqual(2, pfile.additions_count)
+        self.assertEqual(3, pfile.changes_count)
+        self.assertEqual(repo.file_contents.return_value, pfile.contents())
+        repo.file_contents.assert_called_once_with('a.py', ref='dummy')
+
+
+class MirroredFileTest(unittest.TestCase):
+    def setUp(self):
+        self.pfile = Struct(contents=lambda: Struct(decoded=b'api'),
+                            filename='a.py', status='added')
+        self.reader = Struct(read=lambda sha, path: self.blobs.get(path))
+        self.blobs = {'a.py': b'mirror'}
+
+    def test_contents(self):
+        pfile = objects.MirroredFile(self.pfile, self.reader, 'dummy')
+        self.assertEqual(b'mirror', pfile.contents().decoded)
+        self.assertEqual('added', pfile.status)
+
+    def test_contents__missing_from_mirror(self):
+        self.blobs = {}
+        pfile = objects.MirroredFile(self.pfile, self.reader, 'dummy')
+        self.assertEqual(b'api', pfile.contents().decoded)
+
+
+class PathMatcherTest(unittest.TestCase):
+    PATHS = ['a.py', 'db/schema.rb', 'app/a.min.js', 'vendor/b/c.rb',
+             'lib/vendor/d.rb', 'x/y.pb.go', 'x/y.go', 'npm_modules',
+             'docs/a.md', 'docs/b.rst', 'db/a.rb']
+    PATTERNS = ['npm_modules', 'vendor/*', '*.min.js', 'db/schema.rb',
+                '*/vendor/*', 'x/*.pb.*', 'docs/?.[mr]*', 'lib[/]vendor/*']
+
+    def test_call(self):
+        matcher = objects.PathMatcher(self.PATTERNS)
+        for path in self.PATHS:
+            self.assertEqual(
+                any(fnmatch(path, pattern) for pattern in self.PATTERNS),
+                matcher(path), path)
+
+    def test_call__no_patterns(self):
+        self.assertFalse(objects.PathMatcher([])('a.py'))
+
+    def test_call__star(self):
+        self.assertTrue(objects.PathMatcher(['*'])('a/b.py'))
+
+
 class ErrorTrackerTest(unittest.TestCase):
     def setUp(self):
         self.tracker = objects.ErrorTracker([], 2)
@@ -282,6 +530,31 @@ class ErrorTrackerTest(unittest.TestCase):
         self.assertEqual([(16, ['Non MatchingError'])],
                          list(self.tracker.errors('DummyFile')))
 
+    def test_errors__updated_after_track(self):
+        self.tracker.track('Error', 'DummyFile', 16)
+        self.assertEqual([(16, ['Error'])],
+                         list(self.tracker.errors('DummyFile')))
+        self.tracker.track('Other Error', 'DummyFile', 16)
+        self.assertEqual([(16, ['Error', 'Other Error'])],
+                         list(self.tracker.errors('DummyFile')))
+
+    def test_memory__synthetic_large_pr(self):
+        files, messages, lines = 1000, 8, 5
+        tracemalloc.start()
+        try:
+            tracker = objects.ErrorTracker([], 3)
+            for file_index in range(files):
+                filename = 'app/file_{0}.rb'.format(file_index)
+                for index in range(messages):
+                    message = 'Style/Rule{0}: Synthetic issue.'.format(index)
+                    for line in range(index, lines * 40, 40):
+                        tracker.track(message, filename, line + 1)
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(files * messages * lines, tracker.new_issue_count)
+        self.assertLess(used / tracker.new_issue_count, 80)
+
     def test_only_hidden_issues(self):
         comment = Struct(body='_[farcy \n* MatchingError', path='DummyFile',
                          position=None)
@@ -0,0 +1,94 @@
+"""Farcy recording test file."""
+
+from __future__ import print_function
+from farcy import recording
+from farcy.exceptions import ReplayException, ReplayFinished
+from requests import Session
+from requests.models import PreparedRequest, Response
+from shutil import rmtree
+from tempfile import mkdtemp
+import os
+import unittest
+
+API = 'https://api.github.com/repos/a/b'
+
+
+def record(method, url, body=b'{}', status=200, **headers):
+    response = Response()
+    response._content = body
+    response.headers.update(headers)
+    response.status_code = status
+    response.request = PreparedRequest()
+    response.request.prepare(method=method, url=url)
+    return response
+
+
+class RecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def test_record(self):
+        for name in ('archive.jsonl', 'archive.jsonl.gz'):
+            path = os.path.join(self.tmpdir, name)
+            recorder = recording.Recorder(path, 'a/b', last_event_id=10)
+            recorder(record('GET', API, b'{"id": 1}', ETag='"abc"'))
+            recorder.close()
+
+            start, responses = recording.load_archive(path)
+            self.assertEqual({'last_event_id': 10, 'repository': 'a/b',
+                              'start_time': None}, start)
+            self.assertEqual(1, len(responses))
+            self.assertEqual('GET', responses[0]['method'])
+            self.assertEqual('"abc"', responses[0]['headers']['ETag'])
+            self.assertEqual(API, responses[0]['url'])
+
+
+class ReplayAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        path = os.path.join(self.tmpdir, 'archive.jsonl')
+        recorder = recording.Recorder(path, 'a/b')
+        for response in [
+                record('GET', API, b'{"id": 1}'),
+                record('GET', API + '/events', b'[1]',
+                       **{'X-Poll-Interval': '60'}),
+                record('GET', API + '/events', b'', status=304),
+                record('GET', API + '/pulls/1', b'{"state": "open"}'),
+                record('GET', API + '/pulls/1', b'{"state": "closed"}'),
+                record('POST', API + '/statuses/' + 'f' * 40,
+                       b'{"state": "success"}', status=201)]:
+            recorder(response)
+        recorder.close()
+        self.session = Session()
+        self.session.mount('https://', recording.ReplayAdapter(
+            recording.load_archive(path)[1], speed=0))
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def test_send(self):
+        self.assertEqual({'id': 1}, self.session.get(API).json())
+
+    def test_send__events(self):
+        response = self.session.get(API + '/events')
+        self.assertEqual([1], response.json())
+        self.assertEqual('0', response.headers['X-Poll-Interval'])
+        self.assertEqual(304, self.session.get(API + '/events').status_code)
+        self.assertRaises(ReplayFinished, self.session.get, API + '/events')
+
+    def test_send__in_order_then_repeat_last(self):
+        for state in ['open', 'closed', 'closed']:
+            self.assertEqual({'state': state},
+                             self.session.get(API + '/pulls/1').json())
+
+    def test_send__unrecorded_request(self):
+        self.assertRaises(ReplayException, self.session.get, API + '/pulls')
+
+    def test_send__write_to_same_endpoint(self):
+        response = self.session.post(API + '/statuses/' + 'e' * 40,
+                                     json={'state': 'failure'})
+        self.assertEqual(201, response.status_code)
+        self.assertEqual({'state': 'success'}, response.json())
@@ -0,0 +1,63 @@
+"""Farcy timing test file."""
+
+from __future__ import print_function
+from farcy import timing
+from mock import patch
+import unittest
+from .helper import Struct
+
+
+class TimingTest(unittest.TestCase):
+    def test_count_api_call(self):
+        response = Struct(request=Struct(
+            method='GET', url='https://api.github.com/repos/a/b/pulls/1'))
+        profile = timing.ReviewProfile('a/b', 1)
+        with timing.profiling(profile):
+            timing.count_api_call(response)
+            timing.count_api_call(response)
+        timing.count_api_call(response)
+        self.assertEqual({'GET /repos/:owner/:repo/pulls/:number': 2},
+                         profile.api_calls)
+
+    def test_count_api_call__cache_hit(self):
+        request = Struct(method='GET',
+                         url='https://api.github.com/repos/a/b/pulls/1')
+        profile = timing.ReviewProfile('a/b', 1)
+        with timing.profiling(profile):
+            timing.count_api_call(Struct(from_cache=True, request=request))
+            timing.count_api_call(Struct(request=request))
+        self.assertEqual(1, profile.api_cache_hits)
+        self.assertEqual(1, profile.record()['api_cache_hits'])
+
+    def test_current_profile__nested(self):
+        self.assertEqual(None, timing.current_profile())
+        outer = timing.ReviewProfile('a/b', 1)
+        inner = timing.ReviewProfile('a/b', 2)
+        with timing.profiling(outer):
+            with timing.profiling(inner):
+                self.assertEqual(inner, timing.current_profile())
+            self.assertEqual(outer, timing.current_profile())
+        self.assertEqual(None, timing.current_profile())
+
+    @patch('farcy.timing.default_timer')
+    def test_record(self, mock_timer):
+        mock_timer.side_effect = [0, 1, 3, 4, 6, 10]
+        profile = timing.ReviewProfile('a/b', 16)
+        with timing.profiling(profile):
+            with timing.timed('get_issues'):
+                pass
+            with timing.timed('process', 'Flake8'):
+                pass
+        record = profile.record(state='success')
+        self.assertEqual({'calls': 1, 'wall': 2},
+                         record['stages']['get_issues'])
+        self.assertEqual(1, record['handlers']['Flake8']['process']['calls'])
+        self.assertEqual(2, record['handlers']['Flake8']['process']['wall'])
+        self.assertEqual(16, record['pr'])
+        self.assertEqual('a/b', record['repository'])
+        self.assertEqual('success', record['state'])
+        self.assertEqual(10, record['wall'])
+
+    def test_timed__without_profile(self):
+        with timing.timed('get_issues'):
+            self.assertEqual(None, timing.current_profile())
@@ -0,0 +1,91 @@
+"""Farcy tracing test file."""
+
+from __future__ import print_function
+from datetime import timedelta
+from farcy import tracing
+from tempfile import mkstemp
+import json
+import os
+import threading
+import unittest
+from .helper import Struct
+
+
+class TracingTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        tracing.configure(None)
+        os.remove(self.path)
+
+    def spans(self):
+        with open(self.path) as fp:
+            return [json.loads(line)['resourceSpans'][0]['scopeSpans'][0]
+                    ['spans'][0] for line in fp]
+
+    def test_span__disabled(self):
+        with tracing.span('dummy', attr=1) as span:
+            span.set_attribute('other', 2)
+        self.assertEqual([], self.spans())
+
+    def test_span__error(self):
+        tracing.configure(self.path)
+        with self.assertRaises(ValueError):
+            with tracing.span('dummy'):
+                raise ValueError('bad value')
+        self.assertEqual({'code': 2, 'message': 'ValueError: bad value'},
+                         self.spans()[0]['status'])
+
+    def test_span__nested(self):
+        tracing.configure(self.path)
+        with tracing.span('outer', pr=16):
+            with tracing.span('inner', file='a.py'):
+                pass
+        inner, outer = self.spans()
+        self.assertEqual('inner', inner['name'])
+        self.assertEqual('outer', outer['name'])
+        self.assertEqual(outer['traceId'], inner['traceId'])
+        self.assertEqual(outer['spanId'], inner['parentSpanId'])
+        self.assertNotIn('parentSpanId', outer)
+        self.assertEqual([{'key': 'pr', 'value': {'intValue': '16'}}],
+                         outer['attributes'])
+        self.assertLessEqual(int(outer['startTimeUnixNano']),
+                             int(inner['startTimeUnixNano']))
+
+    def test_span__within(self):
+        current = []
+
+        def work(parent):
+            with tracing.within(parent):
+                with tracing.span('inner'):
+                    pass
+            current.append(tracing.current_span())
+
+        tracing.configure(self.path)
+        with tracing.span('outer') as outer:
+            self.assertIs(outer, tracing.current_span())
+            thread = threading.Thread(target=work,
+                                      args=(tracing.current_span(),))
+            thread.start()
+            thread.join()
+        self.assertEqual([None], current)
+        self.assertIsNone(tracing.current_span())
+        inner, outer = self.spans()
+        self.assertEqual(outer['traceId'], inner['traceId'])
+        self.assertEqual(outer['spanId'], inner['parentSpanId'])
+
+    def test_record_api_response(self):
+        tracing.configure(self.path)
+        response = Struct(elapsed=timedelta(seconds=1), status_code=200,
+                          request=Struct(method='GET', url='https://api.'
+                                         'github.com/repos/a/b/pulls/1'))
+        with tracing.span('handle_pr'):
+            tracing.record_api_response(response)
+        api, handle_pr = self.spans()
+        self.assertEqual('GET /repos/:owner/:repo/pulls/:number', api['name'])
+        self.assertEqual(tracing.KIND_CLIENT, api['kind'])
+        self.assertEqual(handle_pr['spanId'], api['parentSpanId'])
+        self.assertEqual(10 ** 9, int(api['endTimeUnixNano']) -
+                         int(api['startTimeUnixNano']))